@@ -0,0 +1,97 @@
+"""
+Golden-corpus check and benchmark of the vectorized clean_names path against the per-row path.
+
+The corpus mixes realistic company names with the edge cases of the regex steps: nested and
+unbalanced brackets, commas and dashes, every ASCII whitespace character, line breaks,
+non-ASCII names and stopwords next to punctuation. Every name must come out of the Arrow
+kernels byte for byte as it comes out of clean_text.
+
+Usage:
+python -m benchmarks.clean_names_golden --names 1000000
+python -m benchmarks.clean_names_golden --names 1000000 --ascii
+python -m benchmarks.clean_names_golden --names 1000000 --legal-suffixes native
+python -m benchmarks.clean_names_golden --corpus accounts.csv --column AccountName
+"""
+import argparse
+import random
+import time
+
+import pandas as pd
+
+from src.clean_business_name import CleanBusinessName
+
+STOPWORDS = ['the', 'and', 'of', 'group', 'holdings', 'co', 'company', 'services', 'international', 'global']
+COUNTRIES = ['United States', 'United Kingdom', 'Germany', 'France', 'India', 'Japan', 'Brasil', 'España',
+             "Côte d'Ivoire", 'Korea, Republic of', 'USA', 'UK']
+WORDS = ['Acme', 'Blue', 'River', 'North', 'Data', 'Labs', 'Systems', 'Solutions', 'Müller', 'Société',
+         'Générale', 'O\'Brien', 'AT&T', '3M', 'x-ray', 'e.on', 'Straße', 'İstanbul', 'ſtar']
+SUFFIXES = ['Inc', 'Inc.', 'LLC', 'Ltd', 'GmbH', 'S.A.', 'Pty Ltd', 'Corp', '']
+EDGE_CASES = [
+    '', ' ', 'Acme (USA) Inc', 'Acme [Europe] Ltd', 'Acme (Holdings', 'Acme [old', 'Acme ((nested)) Co',
+    'Acme (a) (b) [c] Ltd', 'Acme, Inc.', 'Acme - Germany', 'Acme--Co', 'Acme,,,Group', 'Acme\tData',
+    'Acme\x0bData', 'Acme\x0cData', 'Acme\x1cData', 'Acme\x1fData', 'Acme\nData (x\ny)', 'Acme\r\nData',
+    'The Group of the Groups', 'THE ACME GROUP', 'Group', 'co-op co', 'United States Steel',
+    "Côte d'Ivoire Telecom", 'Acme Data', 'Acme Data', 'Müller (Deutschland) GmbH', 'ǅungla',
+    "they're here", 'x1y2 z3', '(only brackets)', '[]', '()', 'Acme )( Ltd', 'Acme ] [ Ltd',
+]
+
+
+def corpus(count, seed=0, ascii_only=False):
+    """
+    Return count names: the edge cases followed by reproducible random company names, built
+    only from ASCII words with ascii_only (as most account names are).
+    """
+    rng = random.Random(seed)
+    names = list(EDGE_CASES)
+    pieces = WORDS + STOPWORDS + COUNTRIES + ['(', ')', '[', ']', ',', '-', '  ', '\t']
+    if ascii_only:
+        pieces = [piece for piece in pieces if piece.isascii()]
+    while len(names) < count:
+        parts = [rng.choice(pieces) for _ in range(rng.randint(1, 5))]
+        names.append(' '.join(parts + [rng.choice(SUFFIXES)]))
+    return names[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--names', type=int, default=200_000)
+    parser.add_argument('--corpus', help='CSV file with real names to check as well.')
+    parser.add_argument('--column', default='AccountName')
+    parser.add_argument('--ascii', action='store_true', help='Random names from ASCII words only.')
+    parser.add_argument('--legal-suffixes', choices=['cleancorp', 'native'], default='cleancorp')
+    args = parser.parse_args()
+
+    names = corpus(args.names, ascii_only=args.ascii)
+    if args.corpus:
+        names += pd.read_csv(args.corpus, usecols=[args.column])[args.column].dropna().astype(str).tolist()
+    names = list(dict.fromkeys(names))
+
+    per_row = CleanBusinessName(None, stopwords=STOPWORDS, countries=COUNTRIES, memo_size=0, vectorized=False,
+                                legal_suffixes=args.legal_suffixes)
+    vectorized = CleanBusinessName(None, stopwords=STOPWORDS, countries=COUNTRIES, memo_size=0, vectorized=True,
+                                   legal_suffixes=args.legal_suffixes)
+
+    start = time.perf_counter()
+    per_row._strip_legal_suffixes(names)
+    suffix_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    expected = per_row._clean_values(names)
+    per_row_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    actual = vectorized._clean_values(names)
+    vectorized_seconds = time.perf_counter() - start
+
+    mismatches = [(name, want, got) for name, want, got in zip(names, expected, actual) if want != got]
+    for name, want, got in mismatches[:20]:
+        print(f"MISMATCH {name!r}: per-row {want!r}, vectorized {got!r}")
+
+    print(f"{len(names):,} distinct names, {len(mismatches):,} mismatches")
+    print(f"per-row    {per_row_seconds:8.2f}s")
+    print(f"vectorized {vectorized_seconds:8.2f}s ({per_row_seconds / vectorized_seconds:.1f}x)")
+    print(f"of which legal suffixes, per name in both paths {suffix_seconds:8.2f}s")
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Import-time benchmark of the src modules.
+
+Each module is imported in a fresh interpreter with -X importtime. The script reports the
+cumulative import time and fails when a module exceeds the budget or pulls in a notebook or
+heavy optional package at import time.
+
+Usage:
+python -m benchmarks.import_time --max-ms 1500
+"""
+import argparse
+import subprocess
+import sys
+
+MODULES = [
+    'src.big_query', 'src.query_cache', 'src.query_stats', 'src.frame_store', 'src.snapshot_store', 'src.account_sidecar', 'src.query_scheduler', 'src.utilities', 'src.session',
+    'src.record_linkage', 'src.minhash_lsh', 'src.geo_standardisation', 'src.clean_business_name', 'src.legal_suffixes', 'src.data_tables',
+]
+
+# Packages that must only be imported on first use
+LAZY = ['google.colab', 'pandas_gbq', 'plotly', 'pdfplumber', 'recordlinkage', 'google.cloud.bigquery', 'duckdb',
+        'cleancorp']
+
+
+def measure(module):
+    """Return (cumulative import microseconds, lazy packages imported, error) for a module."""
+    check = f"import sys, {module}; print(','.join(m for m in {LAZY!r} if m in sys.modules))"
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', check], capture_output=True, text=True)
+    if result.returncode != 0:
+        return None, [], result.stderr.strip().splitlines()[-1]
+    cumulative = 0
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        parts = [part.strip() for part in line.split('|')]
+        if len(parts) == 3 and parts[2] == module:
+            cumulative = int(parts[1])
+    loaded = [name for name in result.stdout.strip().split(',') if name]
+    return cumulative, loaded, None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--max-ms', type=float, default=None, help='Fail when a module takes longer to import.')
+    parser.add_argument('modules', nargs='*', default=MODULES)
+    args = parser.parse_args()
+
+    failed = False
+    for module in args.modules:
+        cumulative, loaded, error = measure(module)
+        if error is not None:
+            print(f"{module:<28} {'failed':>10}  {error}")
+            failed = True
+            continue
+        ms = cumulative / 1000
+        note = f"  eager: {', '.join(loaded)}" if loaded else ''
+        print(f"{module:<28} {ms:>8.1f}ms{note}")
+        if loaded or (args.max_ms is not None and ms > args.max_ms):
+            failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Regression check and benchmark of the native legal-suffix normalizer against CleanCorp.
+
+Both strip the legal-entity designators from the same corpus: synthetic names built from
+every spelling in the suffix and prefix tables (with and without dots, commas and stacked
+designators), plus optionally a column of real names. The script lists the names where
+the outputs differ and compares one CleanCorp object per name with the batch normalizer.
+Run it on a real account export before switching CleanBusinessName to
+legal_suffixes='native'.
+
+Usage:
+python -m benchmarks.legal_suffixes --names 200000
+python -m benchmarks.legal_suffixes --corpus accounts.csv --column AccountName --max-mismatches 0
+"""
+import argparse
+import random
+import time
+
+import pandas as pd
+
+from src.legal_suffixes import LEGAL_PREFIXES, LEGAL_SUFFIXES, LegalSuffixNormalizer, compare_with_cleancorp
+
+BASES = ['Acme', 'Blue River', 'North Star Data', 'Müller & Söhne', 'Zinc Mining', 'The Limited', 'Amazon.com',
+         'Coca-Cola', 'AT&T', 'Inc Magazine', 'Corp Solutions', 'Société Générale', 'Bank Central Asia']
+
+
+def corpus(count, seed=0):
+    """Return count names: every designator spelling on a base name, then random combinations."""
+    rng = random.Random(seed)
+    suffixes = [spelling for spellings in LEGAL_SUFFIXES.values() for spelling in spellings]
+    names = [f'Acme {suffix}' for suffix in suffixes] + [f'{prefix} Acme' for prefix in LEGAL_PREFIXES]
+    names += [f'Acme, {suffix.replace(".", "")}' for suffix in suffixes] + list(BASES) + suffixes
+    while len(names) < count:
+        suffix = rng.choice(suffixes)
+        if rng.random() < 0.3:
+            suffix = suffix.upper().replace('.', '')
+        separator = rng.choice([' ', ', ', '  '])
+        stacked = f' {rng.choice(suffixes)}' if rng.random() < 0.1 else ''
+        names.append(f'{rng.choice(BASES)} {rng.randint(1, 10_000)}{separator}{suffix}{stacked}')
+    return names[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--names', type=int, default=100_000)
+    parser.add_argument('--corpus', help='CSV file with real names to check as well.')
+    parser.add_argument('--column', default='AccountName')
+    parser.add_argument('--max-mismatches', type=int, default=None,
+                        help='Fail when more names than this differ from CleanCorp.')
+    args = parser.parse_args()
+
+    names = corpus(args.names)
+    if args.corpus:
+        names += pd.read_csv(args.corpus, usecols=[args.column])[args.column].dropna().astype(str).tolist()
+    names = list(dict.fromkeys(names))
+
+    from cleancorp import CleanCorp
+
+    start = time.perf_counter()
+    [CleanCorp(name).clean_name for name in names]
+    cleancorp_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    normalizer = LegalSuffixNormalizer()
+    normalizer.normalize_many(names)
+    native_seconds = time.perf_counter() - start
+
+    mismatches = compare_with_cleancorp(names, normalizer)
+    for row in mismatches.head(30).itertuples():
+        print(f"MISMATCH {row.name!r}: cleancorp {row.cleancorp!r}, native {row.native!r}")
+
+    print(f"{len(names):,} distinct names, {len(mismatches):,} mismatches ({len(mismatches) / len(names):.2%})")
+    print(f"cleancorp {cleancorp_seconds:8.2f}s")
+    print(f"native    {native_seconds:8.2f}s ({cleancorp_seconds / native_seconds:.1f}x)")
+    if args.max_mismatches is not None and len(mismatches) > args.max_mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,175 @@
+"""
+Throughput benchmark of the loaders and reference-data fetches on a local DuckDB stand-in.
+
+Seeds reproducible synthetic Parquet fixtures under the BigQuery table names, then runs the
+pipeline against LocalClient and prints rows/second per stage.
+
+Usage:
+python -m benchmarks.pipeline --accounts 200000 --members 1000000 --fixtures /tmp/dataops_fixtures
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from src import data_tables, geo_standardisation
+from src.local_client import LocalClient
+
+
+def _choice(rng, values, size):
+    return np.asarray(values, dtype=object)[rng.integers(0, len(values), size)]
+
+
+def seed_fixtures(fixtures_dir, n_accounts=100_000, n_opps=50_000, n_campaigns=2_000, n_members=500_000, seed=0):
+    """Write synthetic Parquet fixtures for every table the pipeline reads."""
+    rng = np.random.default_rng(seed)
+    suffixes = ['Inc', 'LLC', 'Ltd', 'GmbH', 'Corp', 'S.A.', 'Pty Ltd', '']
+    words = ['Acme', 'Global', 'Blue', 'River', 'Systems', 'Data', 'North', 'Labs', 'Solutions', 'Group']
+    countries = ['United States', 'Germany', 'France', 'India', 'Australia', 'Canada', 'Japan']
+    dates = pd.Timestamp('2020-01-01') + pd.to_timedelta(rng.integers(0, 1500, max(n_opps, n_members)), unit='D')
+
+    tables = {}
+    account_ids = np.array([f'001{i:012d}' for i in range(n_accounts)], dtype=object)
+    names = (_choice(rng, words, n_accounts) + ' ' + _choice(rng, words, n_accounts) + ' '
+             + _choice(rng, suffixes, n_accounts)).astype(object)
+    tables['AoA_MarketingOps/Account'] = pd.DataFrame({
+        'code': account_ids,
+        'Account_Name': names,
+        'Outreach_Account_Natural_Name': names,
+        'Type': _choice(rng, ['Customer', 'Prospect', 'Partner'], n_accounts),
+        'Website': ['https://www.' + n.split()[0].lower() + str(i) + '.com/about' for i, n in enumerate(names)],
+        'Annual_Revenue': rng.integers(0, 10 ** 9, n_accounts).astype(float),
+        'NumberofEmployees': rng.integers(1, 100_000, n_accounts).astype(float),
+        'SIC_Code': rng.integers(1000, 9999, n_accounts).astype(str),
+        'IndustryProfileFinal': _choice(rng, ['Manufacturing', 'Retail', 'Tech'], n_accounts),
+        'IndustrySubPortfolio_GTMPlanningFinal': _choice(rng, ['A', 'B', 'C'], n_accounts),
+        'Primary_Industry_c': _choice(rng, ['Software', 'Hardware'], n_accounts),
+        'Sub_Industry': _choice(rng, ['SaaS', 'Devices'], n_accounts),
+        'Billing_City': _choice(rng, ['Austin', 'Berlin', 'Paris', 'Pune'], n_accounts),
+        'BillingState': _choice(rng, ['Texas', 'Bavaria', 'Maharashtra'], n_accounts),
+        'BillingPostalCode': rng.integers(10000, 99999, n_accounts).astype(str),
+        'BillingCountry': _choice(rng, countries, n_accounts),
+        'Final_pod': _choice(rng, ['P1', 'P2'], n_accounts),
+        'Final_Geo': _choice(rng, ['AMER', 'EMEA', 'APAC'], n_accounts),
+        'DNBDUNSNumber': rng.integers(10 ** 8, 10 ** 9, n_accounts).astype(str),
+        'DnBCompanyRecord': _choice(rng, ['x', 'y'], n_accounts),
+    })
+
+    opp_dates = dates[:n_opps]
+    opps = {
+        'AccountId': _choice(rng, account_ids, n_opps),
+        'OpportunityId': [f'006{i:012d}' for i in range(n_opps)],
+        'Display_Name': _choice(rng, words, n_opps),
+        'New_Or_Expand': _choice(rng, ['New', 'Expand'], n_opps),
+        'SF_ACV_New_Expand_Converted': rng.integers(0, 10 ** 6, n_opps).astype(float),
+        'StageName': _choice(rng, ['Stage 1', 'Stage 2', 'Stage 3', 'Closed Won', 'Closed Lost'], n_opps),
+        'True_Stage': _choice(rng, ['S1', 'S2', 'S3'], n_opps),
+        'CreatedDate': opp_dates,
+    }
+    for col in ['First_Opp_Created_Date_c', 'Stage1_Date', 'Stage2_Date', 'Stage3_Date', 'Stage4_Date', 'Final_CloseDate',
+                'SQL_Created_Date_c', 'First_MQL_Created_Date_c', 'First_Approved_SDR_Meeting_Date__c']:
+        opps[col] = opp_dates + pd.to_timedelta(rng.integers(0, 200, n_opps), unit='D')
+    for col in ['SQL_Source_Type_c', 'SQL_SourcefromSalesFcst', 'Record_Type_text_c', 'Reason__c', 'Reason_Details__c',
+                'Duplicate_Opportunity_Link__c']:
+        opps[col] = _choice(rng, ['a', 'b', 'c'], n_opps)
+    tables['AoA_MarketingOps/Opportunity'] = pd.DataFrame(opps)
+
+    campaign_ids = np.array([f'701{i:012d}' for i in range(n_campaigns)], dtype=object)
+    tables['AoA_MarketingOps/Campaign'] = pd.DataFrame({
+        'Code': campaign_ids,
+        'Name': _choice(rng, words, n_campaigns),
+        'Campaign_ParentID': _choice(rng, campaign_ids, n_campaigns),
+        'Campaign_ParentName': _choice(rng, words, n_campaigns),
+        'Final_Channel': _choice(rng, ['Email', 'Event', 'Paid Social', 'Webinar'], n_campaigns),
+        'LOB': _choice(rng, ['LOB1', 'LOB2'], n_campaigns),
+        'Industry': _choice(rng, ['Tech', 'Retail'], n_campaigns),
+        'IsActive': rng.integers(0, 2, n_campaigns).astype(bool),
+    })
+
+    contact_ids = np.array([f'003{i:012d}' for i in range(n_members // 2 + 1)], dtype=object)
+    channels = ['Email', 'Event', 'Paid Social', 'Webinar', 'Organic']
+    tables['AoA_MarketingOps/CampaignMember'] = pd.DataFrame({
+        'Code': [f'00v{i:012d}' for i in range(n_members)],
+        'ContactLeadID': _choice(rng, contact_ids, n_members),
+        'Type': _choice(rng, ['Contact', 'Lead'], n_members),
+        'LOB': _choice(rng, ['LOB1', 'LOB2'], n_members),
+        'Final_AccountID': _choice(rng, account_ids, n_members),
+        'Account_Name': _choice(rng, names, n_members),
+        'CampaignId': _choice(rng, campaign_ids, n_members),
+        'Campaign': _choice(rng, words, n_members),
+        'CampaignMember_Status': rng.integers(0, 5, n_members),
+        'HasResponded': rng.integers(0, 2, n_members),
+        'CreatedDate': dates[:n_members],
+        'FirstRespondedDate': dates[:n_members] + pd.to_timedelta(rng.integers(0, 30, n_members), unit='D'),
+        'Channel_Campaign': _choice(rng, channels, n_members),
+        'Channel_Medium': _choice(rng, channels, n_members),
+        'Channel_Source': _choice(rng, channels, n_members),
+        'Channel_Campaign_Final': _choice(rng, channels, n_members),
+        'Final_Campaign_Channel': _choice(rng, channels, n_members),
+        'edw_lead_channel': _choice(rng, channels, n_members),
+        'Campaign_Channels': _choice(rng, channels, n_members),
+    })
+    tables['AoA_MarketingOps/ContactLead'] = pd.DataFrame({
+        'Code': contact_ids,
+        'Name': _choice(rng, words, len(contact_ids)),
+        'Email': [f'user{i}@example.com' for i in range(len(contact_ids))],
+        'Job_Level': _choice(rng, ['C-Level', 'Director', 'Manager', 'VP'], len(contact_ids)),
+        'Job_Function': _choice(rng, ['Finance', 'Marketing', 'Sales'], len(contact_ids)),
+    })
+
+    tables['MaintenanceDB/Stopwords'] = pd.DataFrame({'string_field_0': ['the', 'and', 'of', 'group', 'holdings']})
+    tables['MaintenanceDB/Countries'] = pd.DataFrame({'string_field_0': countries})
+    tables['MaintenanceDB/Geo_Country'] = pd.DataFrame({
+        'id': range(len(countries)), 'name': countries, 'iso3': ['USA', 'DEU', 'FRA', 'IND', 'AUS', 'CAN', 'JPN'],
+        'iso2': ['US', 'DE', 'FR', 'IN', 'AU', 'CA', 'JP'], 'capital': '', 'latitude': 0.0, 'longitude': 0.0,
+        'tld': '', 'native': countries, 'nationality': '',
+    })
+    tables['MaintenanceDB/Geo_States'] = pd.DataFrame({
+        'id': range(3), 'name': ['Texas', 'Bavaria', 'Maharashtra'], 'country_id': [0, 1, 3],
+        'country_code': ['US', 'DE', 'IN'], 'country_name': ['United States', 'Germany', 'India'],
+        'state_code': ['TX', 'BY', 'MH'], 'type': 'state', 'latitude': 0.0, 'longitude': 0.0,
+    })
+
+    for name, df in tables.items():
+        path = os.path.join(fixtures_dir, f'{name}.parquet')
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        df.to_parquet(path, index=False)
+
+
+def _timed(label, func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    rows = len(result) if hasattr(result, '__len__') else 0
+    print(f"{label:<24} {rows:>10,} rows {elapsed:>8.2f}s {rows / elapsed if elapsed else 0:>12,.0f} rows/s")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--fixtures', default='benchmark_fixtures')
+    parser.add_argument('--accounts', type=int, default=100_000)
+    parser.add_argument('--opps', type=int, default=50_000)
+    parser.add_argument('--members', type=int, default=500_000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--reseed', action='store_true', help='Regenerate the fixtures even if they exist.')
+    args = parser.parse_args()
+
+    if args.reseed or not os.path.isdir(args.fixtures):
+        start = time.perf_counter()
+        seed_fixtures(args.fixtures, n_accounts=args.accounts, n_opps=args.opps, n_members=args.members, seed=args.seed)
+        print(f"{'seed fixtures':<24} {time.perf_counter() - start:>24.2f}s")
+
+    client = LocalClient(args.fixtures)
+    _timed('geo reference data', lambda: geo_standardisation.GeoStandardisation(client).df_state)
+    _timed('sf_campaigns', data_tables.sf_campaigns, client)
+    _timed('sf_opps', data_tables.sf_opps, client)
+    _timed('sf_campaign_members', data_tables.sf_campaign_members, client)
+    _timed('sf_accts', data_tables.sf_accts, client)
+    _timed('load_all', lambda: data_tables.load_all(client).campaign_members)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark of website and domain cleaning: the former per-row clean_website_domain against
+utils.clean_website_domain_series.
+
+The URLs mix schemes, www prefixes, ports, paths, queries, user info, multi-label public
+suffixes and missing values. Websites are compared between the two implementations on the URLs
+the former one handled (it did not recognise an upper-case scheme). Both are timed on URLs that
+are all distinct and on URLs repeating --distinct sites, as account and contact website
+columns do; clean_website_domain_series cleans each distinct URL once.
+
+Usage:
+python -m benchmarks.website_domains --urls 1000000 --distinct 100000
+"""
+import argparse
+import random
+import re
+import time
+
+import pandas as pd
+
+from src import utilities as utils
+
+SCHEMES = ['https://www.', 'http://', '', 'www.', 'HTTPS://', 'http://www.']
+SUBDOMAINS = ['', '', 'shop.', 'blog.', 'eu.']
+SUFFIXES = ['com', 'co.uk', 'de', 'com.au', 'io', 'org', 'net', 'co.jp', 'fr', 'com.br']
+PATHS = ['', '/', '/about?utm_source=x', ':8080/path', '/en-us/#contact']
+
+
+def per_row(url):
+    """clean_website_domain as it was before the vectorized version, as the baseline."""
+    if isinstance(url, str) and url:
+        cleaned_url = re.sub(r'^((?:https?://)?(?:www\.)?)|(?:\:\d{2,5})', '', url.strip())
+        website = cleaned_url.split('/', 1)[0]
+        if not website.startswith('www.'):
+            return 'www.' + website, website
+        return website, website.split('www.')
+    return None, None
+
+
+def urls(count, seed=0, distinct=None):
+    """Return count reproducible URLs, every 50th one missing, drawn from distinct sites if given."""
+    rng = random.Random(seed)
+    sites = [f'{rng.choice(SCHEMES)}{rng.choice(SUBDOMAINS)}company{i}.{rng.choice(SUFFIXES)}{rng.choice(PATHS)}'
+             for i in range(distinct or count)]
+    values = sites if distinct is None else [rng.choice(sites) for _ in range(count)]
+    values[::50] = [None] * len(values[::50])
+    return pd.Series(values)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--urls', type=int, default=1_000_000)
+    parser.add_argument('--distinct', type=int, default=100_000)
+    args = parser.parse_args()
+
+    utils.public_suffix_rules()
+    for label, distinct in [('all distinct', None), (f'{args.distinct:,} distinct', args.distinct)]:
+        series = urls(args.urls, distinct=distinct)
+
+        start = time.perf_counter()
+        websites_old, _ = zip(*series.apply(per_row))
+        per_row_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        websites, domains = utils.clean_website_domain_series(series)
+        series_seconds = time.perf_counter() - start
+
+        comparable = ~series.str.startswith('HTTPS://', na=False).to_numpy(dtype=bool)
+        expected = pd.Series(websites_old, dtype=object)[comparable].fillna('')
+        mismatches = (expected.to_numpy() != websites.fillna('')[comparable].to_numpy()).sum()
+
+        print(f"{args.urls:,} URLs, {label}")
+        print(f"  {comparable.sum():,} comparable URLs, {mismatches:,} websites differ from the per-row version")
+        print(f"  per-row {per_row_seconds:8.2f}s")
+        print(f"  series  {series_seconds:8.2f}s ({per_row_seconds / series_seconds:.1f}x)")
+        print(f"  domains {domains.notna().sum():,} registrable, e.g. {domains.dropna().head(3).tolist()}")
+
+
+if __name__ == '__main__':
+    main()
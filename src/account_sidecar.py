@@ -0,0 +1,129 @@
+import os
+import threading
+
+import pandas as pd
+
+from src import frame_store, utilities as utils
+
+# Bump when clean_website_domain_series changes, so websites cleaned by the old rules are redone
+WEBSITE_RULES_VERSION = '2'
+
+# Raw column -> cleaned columns kept in the sidecar for it
+CLEANED_COLUMNS = {
+    'AccountName': ['AccountNameClean'],
+    'Website': ['WebsiteClean', 'DomainClean'],
+}
+
+
+def _hash_values(values):
+    """Return a uint64 hash per value, stable across runs and processes."""
+    return pd.util.hash_pandas_object(values.astype(object), index=False).to_numpy()
+
+
+class AccountSidecar:
+    """
+    Persisted cleaning results of Salesforce accounts, so reloads only clean what changed.
+
+    The sidecar is a Feather file with one row per AccountId holding, for the account name
+    and the website, a hash of the raw value, the version of the rules that cleaned it and
+    the cleaned columns (AccountNameClean, WebsiteClean, DomainClean). On a load, rows whose
+    raw value and rules are unchanged are joined back from the sidecar and only the rest are
+    cleaned, so the cleaning time follows the churn instead of the table size. Accounts that
+    are not part of a load (e.g. filtered out) are kept.
+
+    Args:
+    path (str): Path of the sidecar file, e.g. '/content/drive/MyDrive/sf_accts_clean.feather'.
+
+    Example:
+    sidecar = AccountSidecar('/content/drive/MyDrive/sf_accts_clean.feather')
+    df_sf_accts = data_tables.sf_accts(client, sidecar=sidecar)
+    print(sidecar.stats)
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.stats = {}
+        self._lock = threading.Lock()
+
+    def _read(self):
+        if not os.path.exists(self.path):
+            return pd.DataFrame(index=pd.Index([], name='AccountId'))
+        return frame_store.read_frame(self.path, memory_map=False)
+
+    def apply(self, df, clean_name):
+        """
+        Add the cleaned name, website and domain columns to raw accounts.
+
+        Args:
+        df (pd.DataFrame): Accounts as returned by the sf_accts query, with AccountId and
+            AccountName and/or Website.
+        clean_name (CleanBusinessName): The name cleaner; its rules_version decides whether a
+            stored name is still valid.
+
+        Returns:
+        pd.DataFrame: df with the cleaned columns of the raw columns it has.
+        """
+        raw_columns = [column for column in CLEANED_COLUMNS if column in df.columns]
+        self.stats = {}
+        if not raw_columns:
+            return df
+
+        with self._lock:
+            stored = self._read()
+            ids = pd.Index(df['AccountId'], name='AccountId')
+            updates = []
+            for column in raw_columns:
+                hash_column, rules_column = f'{column}Hash', f'{column}Rules'
+                clean_columns = CLEANED_COLUMNS[column]
+                version = clean_name.rules_version if column == 'AccountName' else WEBSITE_RULES_VERSION
+                hashes = pd.Series(_hash_values(df[column]), index=ids, dtype='UInt64')
+
+                previous = stored.reindex(index=ids, columns=[hash_column, rules_column] + clean_columns)
+                reuse = ((previous[hash_column].astype('UInt64') == hashes).fillna(False)
+                         & (previous[rules_column] == version)).to_numpy(dtype=bool)
+                dirty = ~reuse
+
+                cleaned = previous[clean_columns].astype(object)
+                if dirty.any():
+                    if column == 'AccountName':
+                        cleaned.loc[dirty, 'AccountNameClean'] = clean_name.clean_names(df.loc[dirty, column]).to_numpy()
+                    else:
+                        website, domain = utils.clean_website_domain_series(df.loc[dirty, column])
+                        cleaned.loc[dirty, 'WebsiteClean'] = website.to_numpy(dtype=object, na_value=None)
+                        cleaned.loc[dirty, 'DomainClean'] = domain.to_numpy(dtype=object, na_value=None)
+                # Same dtypes as without a sidecar: clean_names infers them, websites stay object
+                for clean_column in clean_columns:
+                    if column == 'AccountName':
+                        values = pd.Series(cleaned[clean_column].to_numpy(), index=df.index).infer_objects()
+                    else:
+                        values = pd.Series(cleaned[clean_column].to_numpy(dtype=object, na_value=None),
+                                           index=df.index, dtype=object)
+                    df[clean_column] = values
+
+                cleaned[hash_column] = hashes
+                cleaned[rules_column] = version
+                dirty_rows = cleaned.loc[dirty, [hash_column, rules_column] + clean_columns]
+                updates.append((hash_column, dirty_rows[~dirty_rows.index.duplicated(keep='last')]))
+                self.stats[column] = {'reused': int(reuse.sum()), 'cleaned': int(dirty.sum())}
+
+            if any(len(rows) for _, rows in updates):
+                # Overwrite the dirty rows of each column group as a whole, so values that are
+                # now missing replace the stored ones instead of being filled back in
+                stored_ids = stored.index
+                for _, rows in updates:
+                    stored_ids = stored_ids.union(rows.index)
+                stored = stored.reindex(stored_ids)
+                for hash_column, rows in updates:
+                    for name in rows.columns:
+                        stored[name] = stored[name].astype(object) if name in stored.columns else None
+                    stored.loc[rows.index, rows.columns] = rows.to_numpy(dtype=object)
+                    stored[hash_column] = stored[hash_column].astype('UInt64')
+                stored.index.name = 'AccountId'
+                frame_store.write_frame(stored, self.path)
+        return df
+
+    def clear(self):
+        """Remove the sidecar file, so the next load cleans every account."""
+        with self._lock:
+            if os.path.exists(self.path):
+                os.remove(self.path)
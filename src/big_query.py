@@ -1,23 +1,547 @@
+import datetime
+import math
+import numbers
+import re
+import time
+
+from src import query_stats
+
 # @title Big Query Functions
 
-def execute_query(client, query):
+def execute_query(client, query, cache=None, schema=None, label=None, stats=None, fetch='default', max_streams=4,
+                  read_client=None):
     """
     Execute a SQL query using Google BigQuery and return the results as a DataFrame.
 
     Args:
     query (str): The SQL query to be executed.
     client: A Google BigQuery client instance.
+    cache (QueryCache, optional): On-disk result cache. A fresh cached result is returned
+        without running the query; otherwise the result is stored after the query runs.
+    schema (dict, optional): Column types to produce while fetching, mapping a type
+        ('str', 'int', 'float', 'category', 'datetime') to a list of column names.
+        The result is fetched as Arrow and cast before the single conversion to pandas.
+    label (str, optional): Name recorded with the query telemetry, e.g. the loader name.
+    stats (QueryStats, optional): Telemetry registry. Defaults to query_stats.registry.
+    fetch (str): 'default' downloads through the client library's default path, 'storage'
+        reads the result table through the BigQuery Storage Read API in parallel Arrow
+        streams and records per-stream throughput.
+    max_streams (int): Maximum number of parallel streams for fetch='storage'.
+    read_client (optional): A bigquery_storage.BigQueryReadClient for fetch='storage'.
+        One is created when omitted.
 
     Returns:
     DataFrame: The query results as a DataFrame.
     """
-    query_job = client.query(query)
-    df = query_job.to_dataframe()
-    # Remove the index column
+    if fetch not in ('default', 'storage'):
+        raise ValueError("fetch must be 'default' or 'storage'.")
+    stats = stats if stats is not None else query_stats.registry
+    record = stats.new_record(query, label, schema)
+    record['fetch'] = fetch
+    try:
+        if cache is not None:
+            df = cache.get(query, schema)
+            if df is not None:
+                record.update(local_cache_hit=True, rows=len(df), result_bytes=int(df.memory_usage(index=False).sum()))
+                return df
+            record['local_cache_hit'] = False
+
+        _check_byte_budget(client, query, stats, record)
+
+        start = time.perf_counter()
+        query_job = client.query(query)
+        query_job.result()
+        fetched = time.perf_counter()
+        if fetch == 'storage':
+            streams = 1 if _has_final_order_by(query) else max_streams
+            table, record['streams'] = read_storage_streams(client, query_job.destination, streams, read_client)
+            df = arrow_to_dataframe(table, schema)
+        elif schema is None:
+            df = query_job.to_dataframe()
+        else:
+            df = arrow_to_dataframe(query_job.to_arrow(), schema)
+        # Remove the index column
+        df.reset_index(drop=True, inplace=True)
+
+        record.update(
+            bq_cache_hit=getattr(query_job, 'cache_hit', None),
+            bytes_processed=getattr(query_job, 'total_bytes_processed', None),
+            bytes_billed=getattr(query_job, 'total_bytes_billed', None),
+            slot_ms=getattr(query_job, 'slot_millis', None),
+            queue_seconds=query_stats.job_seconds(getattr(query_job, 'created', None), getattr(query_job, 'started', None)),
+            execution_seconds=query_stats.job_seconds(getattr(query_job, 'started', None), getattr(query_job, 'ended', None)),
+            wait_seconds=fetched - start,
+            download_seconds=time.perf_counter() - fetched,
+            rows=len(df),
+            result_bytes=int(df.memory_usage(index=False).sum()),
+        )
+    except Exception as e:
+        record['error'] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        stats.add(record)
+
+    if cache is not None:
+        cache.put(query, df, schema)
+    return df
+
+def _has_final_order_by(query):
+    """Return True when the outermost statement of a query ends with ORDER BY."""
+    query = re.sub(r'\s+', ' ', query)
+    # Drop parenthesized subqueries, window clauses and calls, innermost first
+    while True:
+        stripped = re.sub(r'\([^()]*\)', '', query)
+        if stripped == query:
+            break
+        query = stripped
+    return re.search(r'\bORDER BY\b', query, flags=re.IGNORECASE) is not None
+
+def read_storage_streams(client, table_ref, max_streams=4, read_client=None):
+    """
+    Read a table through the BigQuery Storage Read API in parallel Arrow streams.
+
+    The server splits the table into at most max_streams streams. Each stream is decoded
+    into Arrow record batches on its own thread, and the batches are combined without
+    copying.
+
+    Args:
+    client: A Google BigQuery client instance; its project is billed for the read session.
+    table_ref: The table to read, e.g. query_job.destination.
+    max_streams (int): Maximum number of parallel streams.
+    read_client (optional): A bigquery_storage.BigQueryReadClient, created when omitted.
+
+    Returns:
+    tuple: (pyarrow.Table, list of per-stream dicts with rows, bytes, seconds and rows_per_second).
+    """
+    import pyarrow as pa
+    from concurrent.futures import ThreadPoolExecutor
+
+    if read_client is None:
+        from google.cloud import bigquery_storage
+        read_client = bigquery_storage.BigQueryReadClient()
+
+    session = read_client.create_read_session(request={
+        'parent': f'projects/{client.project}',
+        'read_session': {
+            'table': f'projects/{table_ref.project}/datasets/{table_ref.dataset_id}/tables/{table_ref.table_id}',
+            'data_format': 'ARROW',
+        },
+        'max_stream_count': max_streams,
+    })
+
+    def read_stream(stream):
+        start = time.perf_counter()
+        table = read_client.read_rows(stream.name).to_arrow(session)
+        seconds = time.perf_counter() - start
+        return table, {'rows': table.num_rows, 'bytes': table.nbytes, 'seconds': seconds,
+                       'rows_per_second': table.num_rows / seconds if seconds else None}
+
+    if not session.streams:
+        # An empty result has no streams
+        schema = pa.ipc.read_schema(pa.py_buffer(session.arrow_schema.serialized_schema))
+        return schema.empty_table(), []
+
+    with ThreadPoolExecutor(max_workers=len(session.streams)) as executor:
+        results = list(executor.map(read_stream, session.streams))
+    tables = [table for table, _ in results]
+    return pa.concat_tables(tables), [stream_stats for _, stream_stats in results]
+
+def _check_byte_budget(client, query, stats, record):
+    """
+    Dry-run a query when stats has a byte budget or asks for estimates, recording the
+    estimate, and raise QueryBudgetError when it is over the budget.
+    """
+    if stats.max_bytes is not None or stats.dry_run:
+        record['estimated_bytes'] = estimate_bytes(client, query)
+        if stats.max_bytes is not None and record['estimated_bytes'] > stats.max_bytes:
+            raise query_stats.QueryBudgetError(
+                f"Query would process {record['estimated_bytes']:,} bytes, over the budget of {stats.max_bytes:,} bytes.")
+
+def estimate_bytes(client, query):
+    """
+    Return the number of bytes a query would process, from a dry run.
+
+    Args:
+    client: A Google BigQuery client instance.
+    query (str): The SQL query.
+
+    Returns:
+    int: The estimated bytes processed.
+    """
+    from google.cloud import bigquery
+
+    job_config = bigquery.QueryJobConfig(dry_run=True, use_query_cache=False)
+    return client.query(query, job_config=job_config).total_bytes_processed
+
+def execute_query_iter(client, query, chunk_rows=100_000, schema=None, label=None, stats=None):
+    """
+    Execute a SQL query and yield the results page by page as DataFrames.
+
+    Only one page is held in memory at a time, so memory use does not depend on the size
+    of the result. The chunks carry consecutive index ranges, as if the full result had
+    been split. The byte budget of stats is checked with a dry run before the query is
+    submitted, as in execute_query.
+
+    Args:
+    client: A Google BigQuery client instance.
+    query (str): The SQL query to be executed.
+    chunk_rows (int): Maximum number of rows per chunk (the page size of the result).
+    schema (dict, optional): Column types applied to each chunk, see execute_query.
+    label (str, optional): Name recorded with the query telemetry.
+    stats (QueryStats, optional): Telemetry registry. Defaults to query_stats.registry.
+
+    Yields:
+    DataFrame: The next chunk of the query results.
+    """
+    stats = stats if stats is not None else query_stats.registry
+    record = stats.new_record(query, label, schema)
+    record.update(rows=0, result_bytes=0, download_seconds=0.0)
+    try:
+        _check_byte_budget(client, query, stats, record)
+
+        start = time.perf_counter()
+        query_job = client.query(query)
+        rows = query_job.result(page_size=chunk_rows)
+        record.update(
+            bq_cache_hit=getattr(query_job, 'cache_hit', None),
+            bytes_processed=getattr(query_job, 'total_bytes_processed', None),
+            bytes_billed=getattr(query_job, 'total_bytes_billed', None),
+            slot_ms=getattr(query_job, 'slot_millis', None),
+            queue_seconds=query_stats.job_seconds(getattr(query_job, 'created', None), getattr(query_job, 'started', None)),
+            execution_seconds=query_stats.job_seconds(getattr(query_job, 'started', None), getattr(query_job, 'ended', None)),
+            wait_seconds=time.perf_counter() - start,
+        )
+
+        if schema is None:
+            chunks = rows.to_dataframe_iterable()
+        else:
+            import pyarrow as pa
+            chunks = (arrow_to_dataframe(pa.Table.from_batches([batch]), schema) for batch in rows.to_arrow_iterable())
+
+        start = 0
+        fetch_start = time.perf_counter()
+        for df in chunks:
+            df.index = range(start, start + len(df))
+            start += len(df)
+            record['download_seconds'] += time.perf_counter() - fetch_start
+            record['rows'] += len(df)
+            record['result_bytes'] += int(df.memory_usage(index=False).sum())
+            yield df
+            fetch_start = time.perf_counter()
+    except Exception as e:
+        record['error'] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        stats.add(record)
+
+def _cast_arrow_column(column, data_type):
+    """
+    Cast an Arrow column to a schema type, following the rules of utils.convert_column_types.
+
+    Raises a pyarrow exception when the values cannot be cast (e.g. non-numeric strings in an
+    'int' column); the caller then converts that column with pandas instead.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    if data_type == 'int':
+        if pa.types.is_string(column.type) or pa.types.is_large_string(column.type):
+            column = pc.cast(column, pa.float64())
+        if pa.types.is_floating(column.type):
+            # NaN counts as missing, fractions are truncated as astype(int) does
+            column = pc.trunc(pc.if_else(pc.is_nan(column), None, column))
+        return pc.fill_null(pc.cast(column, pa.int64()), 0)
+    if data_type == 'float':
+        return pc.cast(column, pa.float64())
+    if data_type == 'datetime':
+        if pa.types.is_timestamp(column.type):
+            return column
+        return pc.cast(column, pa.timestamp('ns'))
+    if data_type == 'category':
+        if pa.types.is_dictionary(column.type):
+            return column
+        # Sorted categories, as astype('category') would produce
+        categories = pc.drop_null(pc.unique(column))
+        categories = categories.take(pc.sort_indices(categories))
+        codes = pc.index_in(column, value_set=categories)
+        return pa.chunked_array([pa.DictionaryArray.from_arrays(chunk, categories) for chunk in codes.chunks],
+                                type=pa.dictionary(pa.int32(), categories.type))
+    if data_type == 'str':
+        return pc.cast(column, pa.string())
+    raise ValueError(f"Unknown schema type: {data_type}")
+
+def arrow_to_dataframe(table, schema=None):
+    """
+    Convert an Arrow table to a DataFrame, casting columns to their declared types on the way.
+
+    Categories are dictionary-encoded and numbers and timestamps are cast in Arrow, so the
+    DataFrame is built in one conversion instead of being converted column by column
+    afterwards. Undeclared columns get the same dtypes as QueryJob.to_dataframe().
+
+    Args:
+    table (pyarrow.Table): The query result.
+    schema (dict, optional): Column types, see execute_query.
+
+    Returns:
+    DataFrame: The converted DataFrame.
+    """
+    import pyarrow as pa
+    import pandas as pd
+
+    int_cols = []
+    fallback = {}
+    for data_type, cols in (schema or {}).items():
+        for col in cols:
+            if col not in table.column_names:
+                print(f"Column '{col}' does not exist in the query result.")
+                continue
+            try:
+                column = _cast_arrow_column(table.column(col), data_type)
+            except pa.ArrowException:
+                fallback.setdefault(f'{data_type}_cols', []).append(col)
+                continue
+            table = table.set_column(table.column_names.index(col), col, column)
+            if data_type == 'int':
+                int_cols.append(col)
+
+    # Nullable Int64/boolean for undeclared columns, as in QueryJob.to_dataframe(); declared
+    # int columns have no missing values and are added back as plain int64
+    types_mapper = {pa.int64(): pd.Int64Dtype(), pa.bool_(): pd.BooleanDtype()}.get
+    positions = sorted(table.column_names.index(col) for col in int_cols)
+    df = table.drop_columns(int_cols).to_pandas(types_mapper=types_mapper, split_blocks=True)
+    for position in positions:
+        col = table.column_names[position]
+        df.insert(position, col, table.column(col).to_numpy())
+
+    if fallback:
+        from src import utilities as utils
+        df = utils.convert_column_types(df, **fallback)
+
+    return df
+
+def sql_literal(value):
+    """
+    Format a Python value as a BigQuery SQL literal.
+
+    Args:
+    value: None, bool, number, str, date or datetime (including pd.Timestamp), or the numpy
+        scalar of one of them, e.g. from df['SIC'].unique().
+
+    Returns:
+    str: The SQL literal.
+    """
+    import numpy as np
+
+    if isinstance(value, np.datetime64):
+        import pandas as pd
+        value = None if np.isnat(value) else pd.Timestamp(value).to_pydatetime()
+    elif isinstance(value, np.generic):
+        value = value.item()
+    if value is None:
+        return 'NULL'
+    if isinstance(value, bool):
+        return 'TRUE' if value else 'FALSE'
+    if isinstance(value, numbers.Number):
+        if isinstance(value, float) and not math.isfinite(value):
+            raise ValueError(f"Unsupported filter value: {value!r}")
+        return repr(value)
+    if isinstance(value, datetime.datetime):
+        return f"'{value.isoformat(sep=' ')}'"
+    if isinstance(value, datetime.date):
+        return f"'{value.isoformat()}'"
+    if isinstance(value, str):
+        return "'" + value.replace('\\', '\\\\').replace("'", "\\'") + "'"
+    raise ValueError(f"Unsupported filter value: {value!r}")
+
+def compile_filters(filters, select):
+    """
+    Compile structured filters into SQL conditions on the underlying table columns.
+
+    Conditions are written against the raw column rather than the SELECT expression
+    (CAST(CreatedDate AS DATETIME) is filtered as CreatedDate), so BigQuery can prune
+    partitions and clusters.
+
+    Args:
+    filters (dict): Output column name -> condition:
+        a list or set   -> IN (...)
+        a (start, end) tuple -> start <= column < end, either bound may be None
+        None            -> IS NULL
+        any other value -> equality
+    select (dict): Output column name -> SQL expression of the table.
+
+    Returns:
+    list: SQL conditions to be combined with AND.
+
+    Example:
+    compile_filters({'StageName': ['Closed Won', 'Closed Lost'], 'CreatedDate': ('2024-01-01', None)}, SF_OPPS_COLUMNS)
+    """
+    conditions = []
+    for col, value in filters.items():
+        if col not in select:
+            raise ValueError(f"Unknown filter column: {col}")
+        expr = select[col]
+        cast = re.fullmatch(r'CAST\((.+) AS \w+\)', expr)
+        if cast:
+            expr = cast.group(1)
+
+        if isinstance(value, (list, set)):
+            if not value:
+                conditions.append('FALSE')
+            else:
+                conditions.append(f"{expr} IN ({', '.join(sql_literal(v) for v in value)})")
+        elif isinstance(value, tuple):
+            if len(value) != 2:
+                raise ValueError(f"Range filter on '{col}' must be a (start, end) tuple.")
+            start, end = value
+            if start is not None:
+                conditions.append(f"{expr} >= {sql_literal(start)}")
+            if end is not None:
+                conditions.append(f"{expr} < {sql_literal(end)}")
+        elif value is None:
+            conditions.append(f"{expr} IS NULL")
+        else:
+            conditions.append(f"{expr} = {sql_literal(value)}")
+    return conditions
+
+def build_query(select, from_clause, columns=None, filter_by=None, filters=None, required=None):
+    """
+    Build a SELECT statement from a column map, with optional projection and filters.
+
+    Args:
+    select (dict): Output column name -> SQL expression, in output order.
+    from_clause (str): The FROM clause, without the FROM keyword.
+    columns (list, optional): Output columns to select. None selects every column.
+    filter_by (str, optional): Raw SQL condition, as accepted by the loaders.
+    filters (dict, optional): Structured filters, see compile_filters.
+    required (list, optional): Columns always selected, e.g. the key used as the index.
+
+    Returns:
+    str: The SQL query.
+    """
+    projection = select
+    if columns is not None:
+        unknown = [col for col in columns if col not in select]
+        if unknown:
+            raise ValueError(f"Unknown columns: {unknown}")
+        wanted = set(columns) | set(required or [])
+        projection = {col: expr for col, expr in select.items() if col in wanted}
+
+    select_list = ',\n  '.join(f"{expr} AS {col}" if expr != col else col for col, expr in projection.items())
+    query = f"SELECT\n  {select_list}\nFROM\n  {from_clause}"
+
+    where = build_where(select, filter_by, filters)
+    if where:
+        query = query + "\nWHERE " + where
+    return query
+
+def build_where(select, filter_by=None, filters=None):
+    """
+    Build the WHERE condition of build_query, without the WHERE keyword.
+
+    Args:
+    select (dict): Output column name -> SQL expression.
+    filter_by (str, optional): Raw SQL condition.
+    filters (dict, optional): Structured filters, see compile_filters.
+
+    Returns:
+    str: The conditions combined with AND, or None when there are none.
+    """
+    conditions = []
+    if filter_by is not None:
+        conditions.append(f"({filter_by})" if filters else filter_by)
+    if filters:
+        # Filters may use columns that are not projected
+        conditions.extend(compile_filters(filters, select))
+    return " AND ".join(conditions) if conditions else None
+
+def hash_shards(expr, shards):
+    """
+    Split rows into disjoint shards by a hash of a column.
+
+    FARM_FINGERPRINT of NULL is NULL, so the first shard also takes NULLs and every row
+    falls in exactly one shard.
+
+    Args:
+    expr (str): Raw column (or SQL expression) to hash, ideally the key.
+    shards (int): Number of shards.
+
+    Returns:
+    list: One SQL condition per shard.
+    """
+    conditions = [f"ABS(MOD(FARM_FINGERPRINT(CAST({expr} AS STRING)), {shards})) = {i}" for i in range(shards)]
+    conditions[0] = f"({conditions[0]} OR {expr} IS NULL)"
+    return conditions
+
+def range_shards(client, expr, shards, from_clause, where=None, label=None):
+    """
+    Split rows into disjoint shards by equal-width ranges of a date or timestamp column.
+
+    The bounds come from the MIN and MAX of the column. The first shard is open below and
+    also takes NULLs, the last is open above, so every row falls in exactly one shard.
+
+    Args:
+    client: A Google BigQuery client instance.
+    expr (str): Raw date, datetime or timestamp column.
+    shards (int): Number of shards.
+    from_clause (str): The FROM clause of the query being sharded.
+    where (str, optional): Its WHERE condition, see build_where.
+    label (str, optional): Telemetry label of the bounds query.
+
+    Returns:
+    list: One SQL condition per shard (fewer when the column holds a single value).
+    """
+    import pandas as pd
+
+    query = f"SELECT CAST(MIN({expr}) AS STRING) AS Low, CAST(MAX({expr}) AS STRING) AS High FROM {from_clause}"
+    if where:
+        query = query + " WHERE " + where
+    bounds = execute_query(client, query, label=label).iloc[0]
+    if pd.isna(bounds['Low']) or bounds['Low'] == bounds['High']:
+        return ['TRUE']
+
+    low, high = pd.Timestamp(bounds['Low']), pd.Timestamp(bounds['High'])
+    if low.tzinfo is not None:
+        low, high = low.tz_convert('UTC').tz_localize(None), high.tz_convert('UTC').tz_localize(None)
+    edges = [sql_literal(edge.to_pydatetime()) for edge in pd.date_range(low, high, periods=shards + 1)[1:-1]]
+
+    conditions = [f"({expr} < {edges[0]} OR {expr} IS NULL)"]
+    conditions += [f"{expr} >= {start} AND {expr} < {end}" for start, end in zip(edges, edges[1:])]
+    conditions.append(f"{expr} >= {edges[-1]}")
+    return conditions
+
+def execute_sharded(client, queries, cache=None, schema=None, label=None, max_workers=4):
+    """
+    Run the shards of a query concurrently and concatenate their results.
+
+    Each shard is its own job with its own download stream, so throughput grows with the
+    number of workers. Category columns are recast to the union of the shard categories.
+
+    Args:
+    client: A Google BigQuery client instance.
+    queries (list): One query per shard, e.g. built with hash_shards or range_shards.
+    cache (QueryCache, optional): On-disk result cache, per shard.
+    schema (dict, optional): Column types, see execute_query.
+    label (str, optional): Telemetry label; shards are recorded as '<label>_shard<i>'.
+    max_workers (int): Number of shards running at the same time.
+
+    Returns:
+    DataFrame: The combined query results.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from src import utilities as utils
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(execute_query, client, query, cache=cache, schema=schema,
+                                   label=f'{label}_shard{i}' if label else None)
+                   for i, query in enumerate(queries)]
+        frames = [future.result() for future in futures]
+
+    df = utils.concat_frames(frames)
     df.reset_index(drop=True, inplace=True)
     return df
 
 def df_to_bq(df, project, dataset, table):
+    from pandas_gbq import to_gbq
     to_gbq(df, f'{dataset}.{table}', project_id=project, if_exists='replace')
 
 # Create a BigQuery table from a DataFrame with auto-detected schema
@@ -37,6 +561,8 @@ def create_bigquery_table(df, project_id, dataset_id, table_id):
     Example:
         create_bigquery_table_auto_detect(df, 'your-project-id', 'your-dataset-id', 'your-table-id')
     """
+    from google.cloud import bigquery
+
     client = bigquery.Client(project=project_id)
     table_ref = client.dataset(dataset_id).table(table_id)
     job_config = bigquery.LoadJobConfig(
@@ -46,50 +572,354 @@ def create_bigquery_table(df, project_id, dataset_id, table_id):
     job.result()
     print(f'Table {project_id}.{dataset_id}.{table_id} created from the DataFrame with auto-detected schema.')
 
-def read_csv_from_gcs(gcs_bucket, file_path):
+def _arrow_csv_type(dtype):
+    """Return the pyarrow type for a pandas-style dtype hint."""
+    import numpy as np
+    import pyarrow as pa
+
+    if dtype in (str, object, 'str', 'string', 'object'):
+        return pa.string()
+    if dtype == 'category':
+        return pa.dictionary(pa.int32(), pa.string())
+    if dtype in ('datetime', 'datetime64', 'datetime64[ns]'):
+        return pa.timestamp('ns')
+    if isinstance(dtype, pa.DataType):
+        return dtype
+    return pa.from_numpy_dtype(np.dtype(dtype))
+
+def _open_csv_stream(gcs_bucket, file_path, client):
+    """Open a blob for streaming reads, decompressing .gz files on the fly."""
+    import pyarrow as pa
+
+    if client is None:
+        from google.cloud import storage
+        client = storage.Client()
+    stream = pa.PythonFile(client.bucket(gcs_bucket).blob(file_path).open('rb'), mode='r')
+    if file_path.endswith('.gz'):
+        stream = pa.CompressedInputStream(stream, 'gzip')
+    return stream
+
+def _csv_first_block_schema(gcs_bucket, file_path, client, read_options, convert_options):
+    """Return the schema the Arrow CSV reader infers from the first block of a blob."""
+    from pyarrow import csv
+
+    stream = _open_csv_stream(gcs_bucket, file_path, client)
+    try:
+        return csv.open_csv(stream, read_options=csv.ReadOptions(**read_options),
+                            convert_options=csv.ConvertOptions(**convert_options)).schema
+    finally:
+        stream.close()
+
+def _open_csv_reader(gcs_bucket, file_path, client, read_options, convert_options):
+    """
+    Open a streaming CSV reader on a blob, returning (stream, reader, types).
+
+    The streaming reader fixes column types after the first block, so a column that is
+    numeric there and text later (e.g. postcodes) would fail to convert. Columns without a
+    dtype are therefore read as strings, and types maps each of them to the type inferred
+    from the first block, for _csv_chunks to cast to. Dates, times and timestamps are kept
+    as strings, as pd.read_csv does. Only the first block is read twice.
+    """
+    import pyarrow as pa
+    from pyarrow import csv
+
+    column_types = convert_options['column_types']
+    schema = _csv_first_block_schema(gcs_bucket, file_path, client, read_options, convert_options)
+    types = {field.name: pa.string() if pa.types.is_temporal(field.type) else field.type
+             for field in schema if field.name not in column_types}
+    stream = _open_csv_stream(gcs_bucket, file_path, client)
+    try:
+        reader = csv.open_csv(stream, read_options=csv.ReadOptions(**read_options), convert_options=csv.ConvertOptions(
+            **{**convert_options, 'column_types': {**column_types, **{name: pa.string() for name in types}}}))
+    except BaseException:
+        stream.close()
+        raise
+    return stream, reader, types
+
+def _cast_csv_chunk(table, types):
+    """
+    Cast the string columns of a CSV chunk to their inferred types. A column that does not
+    convert stays a string in this and later chunks, as pd.read_csv would read it.
+    """
+    import pyarrow as pa
+
+    for name, data_type in types.items():
+        if data_type == pa.string():
+            continue
+        try:
+            column = table.column(name).cast(data_type)
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            print(f"Warning: Column '{name}' is not {data_type} throughout the file; reading it as strings.")
+            types[name] = pa.string()
+            continue
+        table = table.set_column(table.schema.get_field_index(name), name, column)
+    return table
+
+def _csv_chunks(reader, chunksize, types):
+    """Re-slice the record batches of a streaming CSV reader into DataFrames of chunksize rows."""
+    import pyarrow as pa
+
+    batches, rows, start = [], 0, 0
+    for batch in reader:
+        batches.append(batch)
+        rows += batch.num_rows
+        while rows >= chunksize:
+            table = pa.Table.from_batches(batches)
+            df = _cast_csv_chunk(table.slice(0, chunksize), types).to_pandas(split_blocks=True)
+            df.index = range(start, start + len(df))
+            start += len(df)
+            rest = table.slice(chunksize)
+            batches, rows = rest.to_batches(), rest.num_rows
+            yield df
+    if rows:
+        table = pa.Table.from_batches(batches, schema=reader.schema)
+        df = _cast_csv_chunk(table, types).to_pandas(split_blocks=True)
+        df.index = range(start, start + len(df))
+        yield df
+
+def _read_csv_table(gcs_bucket, file_path, client, read_options, convert_options):
+    """
+    Read a whole blob with the multithreaded Arrow CSV reader, which infers each column's
+    type from all of its values. Dates, times and timestamps without a dtype are read again
+    as strings, as pd.read_csv keeps them; the first block tells which ones up front.
+    """
+    import pyarrow as pa
+    from pyarrow import csv
+
+    column_types = dict(convert_options['column_types'])
+    schema = _csv_first_block_schema(gcs_bucket, file_path, client, read_options, convert_options)
+    while True:
+        column_types.update({field.name: pa.string() for field in schema
+                             if pa.types.is_temporal(field.type) and field.name not in column_types})
+        stream = _open_csv_stream(gcs_bucket, file_path, client)
+        try:
+            table = csv.read_csv(stream, read_options=csv.ReadOptions(**read_options, use_threads=True),
+                                 convert_options=csv.ConvertOptions(**{**convert_options, 'column_types': column_types}))
+        finally:
+            stream.close()
+        schema = table.schema
+        if not any(pa.types.is_temporal(field.type) and field.name not in column_types for field in schema):
+            return table
+
+def read_csv_from_gcs(gcs_bucket, file_path, chunksize=None, dtype=None, usecols=None, client=None,
+                      block_size=16 * 1024 ** 2):
     """
     Read a CSV file from Google Cloud Storage (GCS) and load it into a Pandas DataFrame.
 
+    The blob is parsed by the Arrow CSV reader: on all cores into one table, or with chunksize
+    streamed block by block on one thread, so the raw text is never held in memory as a
+    whole. Files ending in .gz are decompressed on the fly. Column types are inferred from
+    all values when reading the whole file; chunks use the types of the first block, and a
+    column that stops converting later (e.g. numeric postcodes, then 'AB12 3CD') is read as
+    strings from that chunk on.
+
     Args:
         gcs_bucket (str): The name of the GCS bucket.
         file_path (str): The path to the CSV file in GCS.
+        chunksize (int, optional): Yield DataFrames of this many rows instead of returning
+            one DataFrame. Chunks carry consecutive index ranges.
+        dtype (dict, optional): Column types, e.g. {'DUNS': 'str', 'Employees': 'float64',
+            'Country': 'category'}. Other columns are inferred, except that dates, times and
+            timestamps are kept as strings, as pd.read_csv does, unless given here.
+        usecols (list, optional): Columns to read; the rest are skipped while parsing.
+        client (optional): A storage client, storage.Client() by default. Anything with
+            bucket(name).blob(path).open('rb') works, e.g. local_client.LocalStorageClient.
+        block_size (int): Bytes parsed per block.
 
     Returns:
-        pd.DataFrame: A Pandas DataFrame containing the CSV data.
+        pd.DataFrame: A Pandas DataFrame containing the CSV data, or an iterator of
+            DataFrames when chunksize is given.
+
+    Example:
+        for chunk in read_csv_from_gcs('vendor-drops', 'zoominfo/export.csv.gz', chunksize=500_000, dtype={'DUNS': 'str'}):
+            ...
     """
-    # Download the CSV file from GCS
-    client = storage.Client()
-    bucket = client.get_bucket(gcs_bucket)
-    blob = storage.Blob(file_path, bucket)
-    content = blob.download_as_text()
+    read_options = {'block_size': block_size}
+    convert_options = {
+        'column_types': {col: _arrow_csv_type(col_type) for col, col_type in (dtype or {}).items()},
+        'include_columns': list(usecols) if usecols is not None else None,
+        'strings_can_be_null': True,
+    }
 
-    # Create a DataFrame from the CSV data
-    df = pd.read_csv(StringIO(content))
+    if chunksize is not None:
+        def chunks():
+            stream, reader, types = _open_csv_reader(gcs_bucket, file_path, client, read_options, convert_options)
+            try:
+                yield from _csv_chunks(reader, chunksize, types)
+            finally:
+                stream.close()
+        return chunks()
 
-    return df
+    table = _read_csv_table(gcs_bucket, file_path, client, read_options, convert_options)
+    return table.to_pandas(split_blocks=True, self_destruct=True)
 
 def bigquery_schema(df):
     """
     Generate a BigQuery schema based on the DataFrame's data types.
 
+    Category columns take the type of their categories, timezone-aware and non-nanosecond
+    datetimes map to TIMESTAMP and db-dtypes dates to DATE.
+
     Args:
         df (pandas.DataFrame): The DataFrame for which the schema is generated.
 
     Returns:
         list: A list of dictionaries representing the BigQuery schema with 'name' and 'type' keys.
     """
+    import pandas as pd
+
     dtype_mapping = {
         'object': 'STRING',
+        'string': 'STRING',
+        'str': 'STRING',
         'int64': 'INTEGER',
+        'Int64': 'INTEGER',
+        'int32': 'INTEGER',
+        'Int32': 'INTEGER',
         'float64': 'FLOAT',
+        'Float64': 'FLOAT',
+        'float32': 'FLOAT',
         'bool': 'BOOL',
-        'datetime64[ns]': 'TIMESTAMP'
+        'boolean': 'BOOL',
+        'datetime64[ns]': 'TIMESTAMP',
+        'dbdate': 'DATE',
+        'dbtime': 'TIME',
     }
 
-    schema = [{'name': col_name, 'type': dtype_mapping.get(str(col_type), 'UNKNOWN')} for col_name, col_type in df.dtypes.items()]
+    def bq_type(dtype):
+        if isinstance(dtype, pd.CategoricalDtype):
+            return bq_type(dtype.categories.dtype)
+        if str(dtype).startswith('datetime64'):
+            return 'TIMESTAMP'
+        return dtype_mapping.get(str(dtype), 'UNKNOWN')
+
+    schema = [{'name': col_name, 'type': bq_type(col_type)} for col_name, col_type in df.dtypes.items()]
 
     return schema
 
+def _parquet_chunk(df, schema, compression):
+    """Serialize a DataFrame chunk to an in-memory Parquet file matching a BigQuery schema."""
+    import io
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    for field in schema:
+        # BigQuery rejects nanosecond timestamps and reads naive ones as DATETIME
+        if field['type'] == 'TIMESTAMP':
+            i = table.schema.get_field_index(field['name'])
+            column = table.column(i)
+            if pa.types.is_dictionary(column.type):
+                column = column.cast(column.type.value_type)
+            table = table.set_column(i, field['name'], column.cast(pa.timestamp('us', tz='UTC'), safe=False))
+    table = table.select([field['name'] for field in schema])
+    buffer = io.BytesIO()
+    pq.write_table(table, buffer, compression=compression, row_group_size=len(df) or None)
+    buffer.seek(0)
+    return buffer
+
+def bulk_upload(client, df, table_id, mode='replace', key=None, chunk_rows=500_000, max_workers=4,
+                compression='snappy', schema=None):
+    """
+    Upload a DataFrame to BigQuery as parallel compressed Parquet chunks.
+
+    The frame is serialized chunk by chunk and each chunk is loaded into a staging table
+    with an explicit schema, at most max_workers at a time, so peak memory stays bounded to
+    a few chunks. Once every chunk has loaded, the staging table replaces, is appended to,
+    or is merged into the destination, so a failed upload leaves the destination untouched.
+
+    Args:
+    client: A Google BigQuery client instance.
+    df (pd.DataFrame): The DataFrame to upload. The index is not uploaded.
+    table_id (str): Destination table, 'project.dataset.table'.
+    mode (str): 'replace', 'append' or 'merge'.
+    key (str or list, optional): Key columns matched by 'merge': matching rows are updated
+        and the rest inserted.
+    chunk_rows (int): Rows per Parquet chunk.
+    max_workers (int): Chunks serialized or loading at the same time.
+    compression (str): Parquet compression codec.
+    schema (list, optional): BigQuery schema as returned by bigquery_schema. Derived from
+        the DataFrame dtypes when omitted.
+
+    Returns:
+    int: The number of rows uploaded.
+
+    Example:
+    bulk_upload(client, df_matches, 'ap-marketing-data-ops-prod.AoA_MarketingOps.Matches', mode='merge', key='SF_AccountId')
+    """
+    import uuid
+    from collections import deque
+    from concurrent.futures import ThreadPoolExecutor
+    from google.api_core.exceptions import NotFound
+    from google.cloud import bigquery
+
+    if mode not in ('replace', 'append', 'merge'):
+        raise ValueError("mode must be 'replace', 'append' or 'merge'.")
+    keys = [key] if isinstance(key, str) else list(key or [])
+    if mode == 'merge' and not keys:
+        raise ValueError("mode='merge' requires key.")
+
+    schema = schema if schema is not None else bigquery_schema(df)
+    unknown = [field['name'] for field in schema if field['type'] == 'UNKNOWN']
+    if unknown:
+        raise ValueError(f"No BigQuery type for columns: {unknown}")
+    names = [field['name'] for field in schema]
+    if sorted(names) != sorted(map(str, df.columns)) or len(set(names)) != len(names):
+        raise ValueError(f"Schema columns {names} do not match the DataFrame columns {list(df.columns)}.")
+    missing = [col for col in keys if col not in df.columns]
+    if missing:
+        raise ValueError(f"Key columns {missing} do not exist in the DataFrame.")
+    fields = [bigquery.SchemaField(field['name'], field['type']) for field in schema]
+
+    staging_id = f"{table_id}__staging_{uuid.uuid4().hex[:8]}"
+    client.create_table(bigquery.Table(staging_id, schema=fields))
+
+    job_config = bigquery.LoadJobConfig(
+        source_format=bigquery.SourceFormat.PARQUET,
+        schema=fields,
+        write_disposition=bigquery.WriteDisposition.WRITE_APPEND,
+    )
+
+    def load_chunk(start):
+        buffer = _parquet_chunk(df.iloc[start:start + chunk_rows], schema, compression)
+        client.load_table_from_file(buffer, staging_id, job_config=job_config).result()
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            in_flight = deque()
+            for start in range(0, len(df), chunk_rows):
+                if len(in_flight) >= max_workers:
+                    in_flight.popleft().result()
+                in_flight.append(executor.submit(load_chunk, start))
+            while in_flight:
+                in_flight.popleft().result()
+
+        try:
+            client.get_table(table_id)
+            exists = True
+        except NotFound:
+            exists = False
+
+        if mode == 'merge' and exists:
+            columns = [field['name'] for field in schema]
+            on = ' AND '.join(f'T.`{col}` = S.`{col}`' for col in keys)
+            update = ', '.join(f'`{col}` = S.`{col}`' for col in columns if col not in keys)
+            insert = ', '.join(f'`{col}`' for col in columns)
+            values = ', '.join(f'S.`{col}`' for col in columns)
+            merge = (f"MERGE `{table_id}` T USING `{staging_id}` S ON {on} "
+                     + (f"WHEN MATCHED THEN UPDATE SET {update} " if update else '')
+                     + f"WHEN NOT MATCHED THEN INSERT ({insert}) VALUES ({values})")
+            client.query(merge).result()
+        else:
+            disposition = 'WRITE_APPEND' if mode == 'append' and exists else 'WRITE_TRUNCATE'
+            copy_config = bigquery.CopyJobConfig(write_disposition=disposition)
+            client.copy_table(staging_id, table_id, job_config=copy_config).result()
+    finally:
+        client.delete_table(staging_id, not_found_ok=True)
+
+    print(f'{len(df):,} rows uploaded to {table_id} ({mode}).')
+    return len(df)
+
 # Function to download a DataFrame as a CSV file
 def download(df, fileName):
     """
@@ -102,6 +932,8 @@ def download(df, fileName):
     Returns:
     None
     """
+    from google.colab import files
+
     if df is not None:
       fileName = f'{fileName}.csv'
       filepath = "/content/drive/MyDrive/Colab Downloads/"
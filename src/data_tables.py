@@ -1,43 +1,152 @@
-from src import big_query as bq, utilities as utils, clean_business_name, record_linkage
-
-def sf_accts(client, filter_by=None):
-
-    query = """
-            SELECT
-              aoa.code AS AccountId,
-              aoa.Account_Name AS AccountName,
-              Outreach_Account_Natural_Name AS CleanName,
-              aoa.Type AS AccountType,
-              aoa.Website,
-              aoa.Annual_Revenue AS AnnualRevenue,
-              aoa.NumberofEmployees,
-              aoa.SIC_Code AS SIC,
-              aoa.IndustryProfileFinal AS IndustryProtfolio,
-              aoa.IndustrySubPortfolio_GTMPlanningFinal AS IndustrySubPortfolio,
-              aoa.Primary_Industry_c AS PrimaryIndustry,
-              aoa.Sub_Industry AS SubIndustry,
-              aoa.Billing_City AS BillingCity,
-              aoa.BillingState,
-              aoa.BillingPostalCode,
-              aoa.BillingCountry,
-              aoa.Final_pod AS POD,
-              aoa.Final_Geo AS Geo,
-              aoa.DNBDUNSNumber AS DUNSNumber,
-              aoa.DnBCompanyRecord,
-            FROM
-              `ap-marketing-data-ops-prod.AoA_MarketingOps.Account` AS aoa
-          """
-
-    if filter_by is not None:
-       query = query + " WHERE " + filter_by
-
-    df_sf_accts = bq.execute_query(client, query)
-
-    # Cleanse Website and Domain
-    df_sf_accts['WebsiteClean'], df_sf_accts['DomainClean'] = zip(*df_sf_accts['Website'].apply(utils.clean_website_domain))
-
-    clean_name = clean_business_name.CleanBusinessName(client)
-    df_sf_accts['AccountNameClean'] = clean_name.clean_names(df_sf_accts['AccountName'])
+import json
+import os
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+from src import big_query as bq, utilities as utils, clean_business_name, frame_store
+
+# Output column -> SQL expression and FROM clause of each table; the queries are built from
+# these so loaders can project columns and compile structured filters
+SF_ACCTS_COLUMNS = {
+    'AccountId': 'aoa.code',
+    'AccountName': 'aoa.Account_Name',
+    'CleanName': 'Outreach_Account_Natural_Name',
+    'AccountType': 'aoa.Type',
+    'Website': 'aoa.Website',
+    'AnnualRevenue': 'aoa.Annual_Revenue',
+    'NumberofEmployees': 'aoa.NumberofEmployees',
+    'SIC': 'aoa.SIC_Code',
+    'IndustryProtfolio': 'aoa.IndustryProfileFinal',
+    'IndustrySubPortfolio': 'aoa.IndustrySubPortfolio_GTMPlanningFinal',
+    'PrimaryIndustry': 'aoa.Primary_Industry_c',
+    'SubIndustry': 'aoa.Sub_Industry',
+    'BillingCity': 'aoa.Billing_City',
+    'BillingState': 'aoa.BillingState',
+    'BillingPostalCode': 'aoa.BillingPostalCode',
+    'BillingCountry': 'aoa.BillingCountry',
+    'POD': 'aoa.Final_pod',
+    'Geo': 'aoa.Final_Geo',
+    'DUNSNumber': 'aoa.DNBDUNSNumber',
+    'DnBCompanyRecord': 'aoa.DnBCompanyRecord',
+}
+SF_ACCTS_FROM = '`ap-marketing-data-ops-prod.AoA_MarketingOps.Account` AS aoa'
+
+SF_OPPS_COLUMNS = {
+    'AccountId': 'AccountId',
+    'OpportunityId': 'OpportunityId',
+    'OpportunityName': 'Display_Name',
+    'New_Or_Expand': 'New_Or_Expand',
+    'ACVNewExpandConverted': 'SF_ACV_New_Expand_Converted',
+    'StageName': 'StageName',
+    'True_Stage': 'True_Stage',
+    'CreatedDate': 'CAST(CreatedDate AS DATETIME)',
+    'FirstOppCreatedDate': 'CAST(First_Opp_Created_Date_c AS DATETIME)',
+    'AdustedCreatedDate': 'DATE_SUB(CAST(CreatedDate AS DATETIME), INTERVAL 13 MONTH)',
+    'Stage1Date': 'CAST(Stage1_Date AS DATETIME)',
+    'Stage2Date': 'CAST(Stage2_Date AS DATETIME)',
+    'Stage3Date': 'CAST(Stage3_Date AS DATETIME)',
+    'Stage4Date': 'CAST(Stage4_Date AS DATETIME)',
+    'CloseDate': 'CAST(Final_CloseDate AS DATETIME)',
+    'SQLSourceType': 'SQL_Source_Type_c',
+    'SQLSourcefromSalesFcst': 'SQL_SourcefromSalesFcst',
+    'SQLCreatedDate': 'CAST(SQL_Created_Date_c AS DATETIME)',
+    'FirstMQLCreatedDate': 'CAST(First_MQL_Created_Date_c AS DATETIME)',
+    'FirstApprovedSDRMeetingDate': 'CAST(First_Approved_SDR_Meeting_Date__c AS DATETIME)',
+    'RecordType': 'Record_Type_text_c',
+    'Reason': 'Reason__c',
+    'ReasonDetails': 'Reason_Details__c',
+    'DuplicateOpportunityLink': 'Duplicate_Opportunity_Link__c',
+}
+SF_OPPS_FROM = '`ap-marketing-data-ops-prod.AoA_MarketingOps.Opportunity`'
+
+SF_CAMPAIGNS_COLUMNS = {
+    'CampaignId': 'Code',
+    'CampaignName': 'Name',
+    'CampaignParentId': 'Campaign_ParentID',
+    'CampaignParentName': 'Campaign_ParentName',
+    'CampaignChannel': 'Final_Channel',
+    'CampaignLOB': 'LOB',
+    'CampaignIndustry': 'Industry',
+    'CampaignStatus': 'IsActive',
+}
+SF_CAMPAIGNS_FROM = '`ap-marketing-data-ops-prod.AoA_MarketingOps.Campaign` as cm'
+
+SF_CAMPAIGN_MEMBERS_COLUMNS = {
+    'MemberId': 'cm.Code',
+    'ContactId': 'cm.ContactLeadID',
+    'ContactType': 'cm.Type',
+    'LOB': 'cm.LOB',
+    'AccountId': 'cm.Final_AccountID',
+    'AccountName': 'cm.Account_Name',
+    'CampaignId': 'cm.CampaignId',
+    'Campaign': 'cm.Campaign',
+    'CampaignMemberStatus': 'cm.CampaignMember_Status',
+    'HasResponded': 'cm.HasResponded',
+    'CreatedDate': 'CAST(cm.CreatedDate AS DATETIME)',
+    'FirstRespondedDate': 'CAST(cm.FirstRespondedDate AS DATETIME)',
+    'ChannelCampaign': 'cm.Channel_Campaign',
+    'ChannelMedium': 'cm.Channel_Medium',
+    'ChannelSource': 'cm.Channel_Source',
+    'ChannelCampaignFinal': 'cm.Channel_Campaign_Final',
+    'FinalCampaignChannel': 'cm.Final_Campaign_Channel',
+    'EDWChannel': 'cm.edw_lead_channel',
+    'CampaignChannels': 'cm.Campaign_Channels',
+    'ContactName': 'cnct.Name',
+    'Email': 'cnct.Email',
+    'JobLevel': 'cnct.Job_Level',
+    'JobFunction': 'cnct.Job_Function',
+}
+SF_CAMPAIGN_MEMBERS_FROM = ('`ap-marketing-data-ops-prod.AoA_MarketingOps.CampaignMember` AS cm '
+                            'LEFT JOIN `ap-marketing-data-ops-prod.AoA_MarketingOps.ContactLead` AS cnct '
+                            'ON cnct.Code = cm.ContactLeadID')
+
+# Raw columns used to split sf_campaign_members into shards, by shard_by
+SF_CAMPAIGN_MEMBERS_SHARD_COLUMNS = {'hash': 'cm.Code', 'date': 'cm.CreatedDate'}
+
+# Column types produced while fetching each table, see big_query.execute_query
+SF_ACCTS_SCHEMA = {
+    'int': ['SIC'],
+    'float': ['AnnualRevenue', 'NumberofEmployees'],
+}
+
+SF_OPPS_SCHEMA = {
+    'int': ['ACVNewExpandConverted'],
+    'category': ['New_Or_Expand', 'StageName', 'True_Stage', 'SQLSourceType', 'SQLSourcefromSalesFcst', 'RecordType', 'Reason'],
+    'datetime': ['CreatedDate', 'FirstOppCreatedDate', 'AdustedCreatedDate', 'Stage1Date', 'Stage2Date', 'Stage3Date', 'Stage4Date',
+                 'CloseDate', 'SQLCreatedDate', 'FirstMQLCreatedDate', 'FirstApprovedSDRMeetingDate'],
+}
+
+SF_CAMPAIGNS_SCHEMA = {
+    'category': ['CampaignChannel', 'CampaignLOB', 'CampaignIndustry', 'CampaignStatus'],
+}
+
+SF_CAMPAIGN_MEMBERS_SCHEMA = {
+    'int': ['CampaignMemberStatus', 'HasResponded'],
+    'category': ['ContactType', 'LOB', 'ChannelCampaign', 'ChannelMedium', 'ChannelSource', 'ChannelCampaignFinal',
+                 'FinalCampaignChannel', 'EDWChannel', 'CampaignChannels', 'JobLevel', 'JobFunction'],
+    'datetime': ['CreatedDate', 'FirstRespondedDate'],
+}
+
+def _project_schema(schema, columns):
+    """Restrict a table schema to the projected columns."""
+    if columns is None:
+        return schema
+    return {data_type: [col for col in cols if col in columns] for data_type, cols in schema.items()}
+
+def _sf_accts_query(filter_by=None, columns=None, filters=None):
+    return bq.build_query(SF_ACCTS_COLUMNS, SF_ACCTS_FROM, columns=columns, filter_by=filter_by, filters=filters, required=['AccountId'])
+
+def _prepare_sf_accts(df_sf_accts, clean_name, sidecar=None):
+    if sidecar is not None:
+        # Reuse the cleaned columns of accounts whose name or website did not change
+        df_sf_accts = sidecar.apply(df_sf_accts, clean_name)
+    else:
+        # Cleanse Website and Domain
+        if 'Website' in df_sf_accts.columns:
+            df_sf_accts['WebsiteClean'], df_sf_accts['DomainClean'] = utils.clean_website_domain_series(df_sf_accts['Website'])
+
+        if 'AccountName' in df_sf_accts.columns:
+            df_sf_accts['AccountNameClean'] = clean_name.clean_names(df_sf_accts['AccountName'])
 
 
     df_sf_accts = df_sf_accts.add_prefix("SF_")
@@ -45,56 +154,58 @@ def sf_accts(client, filter_by=None):
     df_sf_accts = df_sf_accts.set_index("SF_Index")
     df_sf_accts.sort_index(inplace=True)
 
-    df_sf_accts = utils.convert_column_types(df_sf_accts, str_cols=[], int_cols=['SF_SIC'], float_cols=['SF_AnnualRevenue', 'SF_NumberofEmployees'], category_cols=[], datetime_cols=[])
-
-
     return df_sf_accts
 
-
-def sf_opps(client, filter_by=None):
-    query = """
-            SELECT
-              AccountId,
-              OpportunityId,
-              Display_Name AS OpportunityName,
-              New_Or_Expand,
-              SF_ACV_New_Expand_Converted AS ACVNewExpandConverted,
-              StageName,
-              True_Stage,
-              CAST(CreatedDate AS DATETIME) AS CreatedDate,
-              CAST(First_Opp_Created_Date_c AS DATETIME) AS FirstOppCreatedDate,
-              DATE_SUB(CAST(CreatedDate AS DATETIME), INTERVAL 13 MONTH) AS AdustedCreatedDate,
-              CAST(Stage1_Date AS DATETIME) AS Stage1Date,
-              CAST(Stage2_Date AS DATETIME) AS Stage2Date,
-              CAST(Stage3_Date AS DATETIME) AS Stage3Date,
-              CAST(Stage4_Date AS DATETIME) AS Stage4Date,
-              CAST(Final_CloseDate AS DATETIME) AS CloseDate,
-              SQL_Source_Type_c AS SQLSourceType,
-              SQL_SourcefromSalesFcst AS SQLSourcefromSalesFcst,
-              CAST(SQL_Created_Date_c AS DATETIME) AS SQLCreatedDate,
-              CAST(First_MQL_Created_Date_c AS DATETIME) AS FirstMQLCreatedDate,
-              CAST(First_Approved_SDR_Meeting_Date__c AS DATETIME) AS FirstApprovedSDRMeetingDate,
-              Record_Type_text_c AS RecordType,
-              Reason__c AS Reason,
-              Reason_Details__c AS ReasonDetails,
-              Duplicate_Opportunity_Link__c AS DuplicateOpportunityLink
-            FROM
-              `ap-marketing-data-ops-prod.AoA_MarketingOps.Opportunity`
-            """
-
-    if filter_by is not None:
-        query = query + " WHERE " + filter_by 
-
-    df_sf_opps = bq.execute_query(client, query)
-
-    df_sf_opps = utils.convert_column_types(
-                    df_sf_opps, str_cols=[], 
-                    int_cols=['ACVNewExpandConverted'], 
-                    float_cols=[], 
-                    category_cols=['New_Or_Expand', 'StageName', 'True_Stage', 'SQLSourceType', 'SQLSourcefromSalesFcst', 'RecordType', 'Reason'], 
-                    datetime_cols=[])
-
-
+def sf_accts(client, filter_by=None, cache=None, columns=None, filters=None, optimize=False, name_cleaner=None,
+             sidecar=None):
+    """
+    Load Salesforce accounts with cleaned names, websites and domains, prefixed with SF_.
+
+    Args:
+    client: A Google BigQuery client instance.
+    filter_by (str, optional): Raw SQL condition appended as the WHERE clause.
+    cache (QueryCache, optional): On-disk result cache.
+    columns (list, optional): Columns of SF_ACCTS_COLUMNS to select; AccountId is always
+        selected. Name and website cleaning only run when their source column is selected.
+    filters (dict, optional): Structured filters compiled into SQL, see bq.compile_filters.
+    optimize (bool): Shrink the column dtypes with utils.optimize_memory.
+    name_cleaner (CleanBusinessName, optional): Cleaner with its reference data loaded, e.g.
+        DataOpsSession.name_cleaner. A new one is built (and fetches its stopwords and
+        countries) when omitted.
+    sidecar (AccountSidecar, optional): Persisted cleaning results; only accounts whose name
+        or website changed since the last load (or whose cleaning rules changed) are cleaned.
+
+    Returns:
+    pd.DataFrame: Accounts indexed by SF_Index (the AccountId).
+
+    Example:
+    df_sf_accts = sf_accts(client, columns=['AccountName', 'Website', 'BillingCity', 'BillingCountry'],
+                           filters={'Geo': ['AMER', 'EMEA']})
+    """
+    df_sf_accts = bq.execute_query(client, _sf_accts_query(filter_by, columns, filters), cache=cache,
+                                   schema=_project_schema(SF_ACCTS_SCHEMA, columns), label='sf_accts')
+    clean_name = name_cleaner or clean_business_name.CleanBusinessName(client)
+    df_sf_accts = _prepare_sf_accts(df_sf_accts, clean_name, sidecar)
+    return utils.optimize_memory(df_sf_accts) if optimize else df_sf_accts
+
+def sf_accts_iter(client, filter_by=None, chunk_rows=100_000, columns=None, filters=None, name_cleaner=None,
+                  sidecar=None):
+    """
+    Stream the output of sf_accts in chunks of at most chunk_rows rows.
+
+    Each chunk is prepared (type conversion, prefixing, indexing) as it arrives, so memory use
+    does not grow with the size of the table. Category columns are encoded per chunk; use
+    utils.concat_frames to combine chunks.
+    """
+    clean_name = name_cleaner or clean_business_name.CleanBusinessName(client)
+    for chunk in bq.execute_query_iter(client, _sf_accts_query(filter_by, columns, filters), chunk_rows=chunk_rows,
+                                       schema=_project_schema(SF_ACCTS_SCHEMA, columns), label='sf_accts'):
+        yield _prepare_sf_accts(chunk, clean_name, sidecar)
+
+def _sf_opps_query(filter_by=None, columns=None, filters=None):
+    return bq.build_query(SF_OPPS_COLUMNS, SF_OPPS_FROM, columns=columns, filter_by=filter_by, filters=filters, required=['OpportunityId'])
+
+def _prepare_sf_opps(df_sf_opps):
     df_sf_opps['Index']= df_sf_opps['OpportunityId']
     df_sf_opps = df_sf_opps.set_index('Index')
     df_sf_opps.sort_index(inplace=True)
@@ -102,34 +213,22 @@ def sf_opps(client, filter_by=None):
 
     return df_sf_opps
 
-def sf_campaigns(client, filter_by=None):
-
-    query = """
-              SELECT
-                Code AS CampaignId,
-                Name AS CampaignName,
-                Campaign_ParentID AS CampaignParentId,
-                Campaign_ParentName AS CampaignParentName,
-                Final_Channel AS CampaignChannel,
-                LOB AS CampaignLOB,
-                Industry AS CampaignIndustry,
-                IsActive AS CampaignStatus,
-              FROM
-                `ap-marketing-data-ops-prod.AoA_MarketingOps.Campaign` as cm
-            """
-
-    if filter_by is not None:
-        query = query + " WHERE " + filter_by 
+def sf_opps(client, filter_by=None, cache=None, columns=None, filters=None, optimize=False):
+    df_sf_opps = bq.execute_query(client, _sf_opps_query(filter_by, columns, filters), cache=cache,
+                                  schema=_project_schema(SF_OPPS_SCHEMA, columns), label='sf_opps')
+    df_sf_opps = _prepare_sf_opps(df_sf_opps)
+    return utils.optimize_memory(df_sf_opps) if optimize else df_sf_opps
 
-    df_sf_campaigns = bq.execute_query(client, query)
+def sf_opps_iter(client, filter_by=None, chunk_rows=100_000, columns=None, filters=None):
+    """Stream the output of sf_opps in chunks of at most chunk_rows rows, see sf_accts_iter."""
+    for chunk in bq.execute_query_iter(client, _sf_opps_query(filter_by, columns, filters), chunk_rows=chunk_rows,
+                                       schema=_project_schema(SF_OPPS_SCHEMA, columns), label='sf_opps'):
+        yield _prepare_sf_opps(chunk)
 
-    df_sf_campaigns = utils.convert_column_types(
-        df_sf_campaigns, str_cols=[], 
-        int_cols=[], 
-        float_cols=[], 
-        category_cols=['CampaignChannel', 'CampaignChannels', 'CampaignLOB', 'CampaignIndustry', 'CampaignStatus'], 
-        datetime_cols=[])
+def _sf_campaigns_query(filter_by=None, columns=None, filters=None):
+    return bq.build_query(SF_CAMPAIGNS_COLUMNS, SF_CAMPAIGNS_FROM, columns=columns, filter_by=filter_by, filters=filters, required=['CampaignId'])
 
+def _prepare_sf_campaigns(df_sf_campaigns):
     df_sf_campaigns['Index']= df_sf_campaigns['CampaignId']
     df_sf_campaigns = df_sf_campaigns.set_index('Index')
     df_sf_campaigns.sort_index(inplace=True)
@@ -137,56 +236,223 @@ def sf_campaigns(client, filter_by=None):
 
     return df_sf_campaigns
 
-def sf_campaign_members(client, filter_by=None):
-
-    query = """
-        SELECT
-          cm.Code AS MemberId,
-          cm.ContactLeadID AS ContactId,
-          cm.Type AS ContactType,
-          cm.LOB,
-          cm.Final_AccountID AS AccountId,
-          cm.Account_Name AS AccountName,
-          cm.CampaignId,
-          cm.Campaign,
-          cm.CampaignMember_Status AS CampaignMemberStatus,
-          cm.HasResponded,
-          CAST(cm.CreatedDate AS DATETIME) AS CreatedDate,
-          CAST(cm.FirstRespondedDate AS DATETIME) AS FirstRespondedDate,
-          cm.Channel_Campaign AS ChannelCampaign,
-          cm.Channel_Medium AS ChannelMedium,
-          cm.Channel_Source AS ChannelSource,
-          cm.Channel_Campaign_Final AS ChannelCampaignFinal,
-          cm.Final_Campaign_Channel AS FinalCampaignChannel,
-          cm.edw_lead_channel AS EDWChannel,
-          cm.Campaign_Channels AS CampaignChannels,
-          cnct.Name AS ContactName,
-          cnct.Email,
-          cnct.Job_Level AS JobLevel,
-          cnct.Job_Function AS JobFunction,
-        FROM
-          `ap-marketing-data-ops-prod.AoA_MarketingOps.CampaignMember` AS cm
-        LEFT JOIN
-          `ap-marketing-data-ops-prod.AoA_MarketingOps.ContactLead` AS cnct
-        ON
-          cnct.Code = cm.ContactLeadID
-        """
-    if filter_by is not None:
-        query = query + " WHERE " + filter_by 
+def sf_campaigns(client, filter_by=None, cache=None, columns=None, filters=None, optimize=False):
+    df_sf_campaigns = bq.execute_query(client, _sf_campaigns_query(filter_by, columns, filters), cache=cache,
+                                       schema=_project_schema(SF_CAMPAIGNS_SCHEMA, columns), label='sf_campaigns')
+    df_sf_campaigns = _prepare_sf_campaigns(df_sf_campaigns)
+    return utils.optimize_memory(df_sf_campaigns) if optimize else df_sf_campaigns
 
-    df_sf_campaign_members = bq.execute_query(client, query)
+def sf_campaigns_iter(client, filter_by=None, chunk_rows=100_000, columns=None, filters=None):
+    """Stream the output of sf_campaigns in chunks of at most chunk_rows rows, see sf_accts_iter."""
+    for chunk in bq.execute_query_iter(client, _sf_campaigns_query(filter_by, columns, filters), chunk_rows=chunk_rows,
+                                       schema=_project_schema(SF_CAMPAIGNS_SCHEMA, columns), label='sf_campaigns'):
+        yield _prepare_sf_campaigns(chunk)
 
-    df_sf_campaign_members = utils.convert_column_types(
-                                  df_sf_campaign_members, str_cols=[], 
-                                  int_cols=['CampaignMemberStatus', 'HasResponded'], 
-                                  float_cols=[], 
-                                  category_cols=['ContactType', 'LOB', 'ChannelCampaign', 'ChannelMedium', 'ChannelSource', 'ChannelCampaignFinal',
-                                    'FinalCampaignChannel', 'EDWChannel', 'CampaignChannels', 'JobLevel', 'JobFunction'], 
-                                  datetime_cols=[])
+def _sf_campaign_members_query(filter_by=None, columns=None, filters=None):
+    return bq.build_query(SF_CAMPAIGN_MEMBERS_COLUMNS, SF_CAMPAIGN_MEMBERS_FROM, columns=columns, filter_by=filter_by, filters=filters, required=['MemberId'])
 
+def _prepare_sf_campaign_members(df_sf_campaign_members):
     df_sf_campaign_members['Index']= df_sf_campaign_members['MemberId']
     df_sf_campaign_members = df_sf_campaign_members.set_index('Index')
     df_sf_campaign_members.sort_index(inplace=True)
     df_sf_campaign_members = df_sf_campaign_members.add_prefix('CM_')
 
     return df_sf_campaign_members
+
+def sf_campaign_members(client, filter_by=None, cache=None, columns=None, filters=None, optimize=False,
+                        shards=None, shard_by='hash', max_workers=4):
+    """
+    Load Salesforce campaign members with their contact details, prefixed with CM_.
+
+    Args:
+    client: A Google BigQuery client instance.
+    filter_by (str, optional): Raw SQL condition appended as the WHERE clause.
+    cache (QueryCache, optional): On-disk result cache.
+    columns (list, optional): Columns of SF_CAMPAIGN_MEMBERS_COLUMNS to select.
+    filters (dict, optional): Structured filters compiled into SQL, see bq.compile_filters.
+    optimize (bool): Shrink the column dtypes with utils.optimize_memory.
+    shards (int, optional): Split the query into this many disjoint shards that run and
+        download concurrently.
+    shard_by (str): 'hash' of the MemberId or 'date' ranges of CreatedDate.
+    max_workers (int): Number of shards running at the same time.
+
+    Returns:
+    pd.DataFrame: Campaign members indexed by CM_Index (the MemberId).
+
+    Example:
+    df_sf_campaign_members = sf_campaign_members(client, shards=8, max_workers=8)
+    """
+    schema = _project_schema(SF_CAMPAIGN_MEMBERS_SCHEMA, columns)
+    if shards is not None and shards > 1:
+        if shard_by not in SF_CAMPAIGN_MEMBERS_SHARD_COLUMNS:
+            raise ValueError(f"shard_by must be one of {list(SF_CAMPAIGN_MEMBERS_SHARD_COLUMNS)}.")
+        expr = SF_CAMPAIGN_MEMBERS_SHARD_COLUMNS[shard_by]
+        if shard_by == 'hash':
+            conditions = bq.hash_shards(expr, shards)
+        else:
+            where = bq.build_where(SF_CAMPAIGN_MEMBERS_COLUMNS, filter_by, filters)
+            conditions = bq.range_shards(client, expr, shards, SF_CAMPAIGN_MEMBERS_FROM, where,
+                                         label='sf_campaign_members_bounds')
+        queries = [_sf_campaign_members_query(f"({filter_by}) AND {condition}" if filter_by else condition, columns, filters)
+                   for condition in conditions]
+        df_sf_campaign_members = bq.execute_sharded(client, queries, cache=cache, schema=schema,
+                                                    label='sf_campaign_members', max_workers=max_workers)
+    else:
+        df_sf_campaign_members = bq.execute_query(client, _sf_campaign_members_query(filter_by, columns, filters), cache=cache,
+                                                  schema=schema, label='sf_campaign_members')
+    df_sf_campaign_members = _prepare_sf_campaign_members(df_sf_campaign_members)
+    return utils.optimize_memory(df_sf_campaign_members) if optimize else df_sf_campaign_members
+
+def sf_campaign_members_iter(client, filter_by=None, chunk_rows=100_000, columns=None, filters=None):
+    """Stream the output of sf_campaign_members in chunks of at most chunk_rows rows, see sf_accts_iter."""
+    for chunk in bq.execute_query_iter(client, _sf_campaign_members_query(filter_by, columns, filters), chunk_rows=chunk_rows,
+                                       schema=_project_schema(SF_CAMPAIGN_MEMBERS_SCHEMA, columns), label='sf_campaign_members'):
+        yield _prepare_sf_campaign_members(chunk)
+
+
+# Named bundle returned by load_all
+SalesforceTables = namedtuple('SalesforceTables', ['accounts', 'opportunities', 'campaigns', 'campaign_members'])
+
+def load_all(client, filters=None, cache=None, max_workers=4, optimize=False, name_cleaner=None, sidecar=None):
+    """
+    Load accounts, opportunities, campaigns and campaign members concurrently.
+
+    All four queries are submitted at once and their downloads and post-processing overlap
+    on a thread pool, so the wall-clock time is close to that of the slowest table.
+
+    Args:
+    client: A Google BigQuery client instance.
+    filters (dict, optional): Filter per table, keyed by the SalesforceTables field names. A
+        string is passed as filter_by, a dict as structured filters, e.g.
+        {'opportunities': {'CreatedDate': ('2024-01-01', None)}}.
+    cache (QueryCache, optional): On-disk result cache shared by the loaders.
+    max_workers (int): Number of loader threads.
+    optimize (bool): Shrink the column dtypes of every table with utils.optimize_memory.
+    name_cleaner (CleanBusinessName, optional): Cleaner used for the accounts, see sf_accts.
+    sidecar (AccountSidecar, optional): Persisted cleaning results of the accounts, see sf_accts.
+
+    Returns:
+    SalesforceTables: Named tuple of the four loaded DataFrames.
+
+    Example:
+    tables = load_all(client, filters={'opportunities': "CreatedDate >= '2024-01-01'"})
+    df_sf_opps = tables.opportunities
+    """
+    filters = filters or {}
+    unknown = set(filters) - set(SalesforceTables._fields)
+    if unknown:
+        raise ValueError(f"Unknown tables in filters: {sorted(unknown)}")
+
+    loaders = {
+        'accounts': sf_accts,
+        'opportunities': sf_opps,
+        'campaigns': sf_campaigns,
+        'campaign_members': sf_campaign_members,
+    }
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {}
+        for name, loader in loaders.items():
+            table_filter = filters.get(name)
+            kwargs = {'cache': cache, 'optimize': optimize}
+            if name == 'accounts':
+                kwargs.update(name_cleaner=name_cleaner, sidecar=sidecar)
+            if isinstance(table_filter, dict):
+                futures[name] = executor.submit(loader, client, filters=table_filter, **kwargs)
+            else:
+                futures[name] = executor.submit(loader, client, filter_by=table_filter, **kwargs)
+        return SalesforceTables(**{name: future.result() for name, future in futures.items()})
+
+
+# Tables that support incremental refresh: the loader and the FROM clause used to read the
+# watermark. There is no default watermark: CreatedDate never changes after an insert, so
+# edits would be missed; the caller names a column set on every change, such as SystemModstamp.
+INCREMENTAL_TABLES = {
+    'sf_accts': {
+        'loader': sf_accts,
+        'from': SF_ACCTS_FROM,
+    },
+    'sf_opps': {
+        'loader': sf_opps,
+        'from': SF_OPPS_FROM,
+    },
+    'sf_campaign_members': {
+        'loader': sf_campaign_members,
+        'from': SF_CAMPAIGN_MEMBERS_FROM,
+    },
+}
+
+def refresh_incremental(client, table, snapshot_path, watermark=None, filter_by=None):
+    """
+    Refresh a local snapshot of a loader's output by fetching only rows past a stored watermark.
+
+    The first call does a full load. Later calls fetch the rows whose watermark column is at
+    or after the watermark stored with the snapshot, and upsert them into the snapshot by the
+    loader's index (AccountId, OpportunityId or MemberId). Rows sharing the stored timestamp
+    are fetched again, so rows written at that same instant after the last refresh are not
+    missed.
+
+    Args:
+    client: A Google BigQuery client instance.
+    table (str): One of INCREMENTAL_TABLES, e.g. 'sf_opps'.
+    snapshot_path (str): Path of the snapshot file (.feather or .parquet). The watermark is
+        stored next to it in '<snapshot_path>.json'.
+    watermark (str): Raw column (or SQL expression) that increases when a row is added or
+        modified, e.g. 'SystemModstamp' or 'LastModifiedDate' ('cm.SystemModstamp' for
+        sf_campaign_members). Required; a creation date would miss edits.
+    filter_by (str, optional): Additional filter, as for the loader.
+
+    Returns:
+    pd.DataFrame: The refreshed snapshot.
+
+    Example:
+    df_sf_opps = refresh_incremental(client, 'sf_opps', 'snapshots/sf_opps.feather', watermark='SystemModstamp')
+    """
+    if table not in INCREMENTAL_TABLES:
+        raise ValueError(f"Unknown table: {table}")
+    spec = INCREMENTAL_TABLES[table]
+    if not watermark:
+        raise ValueError(f"A watermark column that changes when a row is modified (e.g. SystemModstamp) "
+                         f"is required for {table}.")
+
+    state_path = f"{snapshot_path}.json"
+    state = None
+    if os.path.exists(snapshot_path) and os.path.exists(state_path):
+        with open(state_path) as f:
+            state = json.load(f)
+        if state.get('watermark_column') != watermark or state.get('filter_by') != filter_by:
+            print(f"Watermark column or filter changed for {table}, running a full load.")
+            state = None
+
+    # Read the high watermark first so rows written during the load are picked up next time
+    query = f"SELECT CAST(MAX({watermark}) AS STRING) AS Watermark FROM {spec['from']}"
+    if filter_by is not None:
+        query = query + " WHERE " + filter_by
+    high = bq.execute_query(client, query, label=f'{table}_watermark')['Watermark'].iloc[0]
+    if pd.isna(high):
+        print(f"No rows found in {table}.")
+        return frame_store.read_frame(snapshot_path) if state is not None else None
+
+    predicate = f"{watermark} <= '{high}'"
+    if state is None:
+        predicate = f"({predicate} OR {watermark} IS NULL)"
+    else:
+        predicate = f"{watermark} >= '{state['watermark']}' AND {predicate}"
+    if filter_by is not None:
+        predicate = f"({filter_by}) AND {predicate}"
+
+    df_changes = spec['loader'](client, filter_by=predicate)
+
+    if state is None:
+        df = df_changes
+    else:
+        df_snapshot = frame_store.read_frame(snapshot_path)
+        df = utils.concat_frames([df_snapshot[~df_snapshot.index.isin(df_changes.index)], df_changes])
+        df.sort_index(inplace=True)
+
+    frame_store.write_frame(df, snapshot_path)
+    with open(state_path, 'w') as f:
+        json.dump({'table': table, 'watermark_column': watermark, 'watermark': high,
+                   'filter_by': filter_by, 'rows': len(df)}, f, indent=2)
+
+    print(f"{table}: {len(df_changes)} new or changed rows, {len(df)} rows in snapshot.")
+    return df
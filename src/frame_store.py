@@ -0,0 +1,112 @@
+import os
+import tempfile
+
+FEATHER_EXTENSIONS = ('.feather', '.arrow', '.ipc')
+PARQUET_EXTENSIONS = ('.parquet', '.pq')
+
+
+def frame_format(path):
+    """
+    Infer the on-disk format of a frame file from its extension.
+
+    Args:
+    path (str): Path of the frame file.
+
+    Returns:
+    str: 'feather' or 'parquet'.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext in FEATHER_EXTENSIONS:
+        return 'feather'
+    if ext in PARQUET_EXTENSIONS:
+        return 'parquet'
+    raise ValueError(f"Unknown frame file extension: {ext}")
+
+
+def write_frame(df, path, compression=None):
+    """
+    Write a DataFrame to a Feather (Arrow IPC) or Parquet file, keeping dtypes and index.
+
+    The file is written to a temporary name and moved into place, so readers never see a
+    partially written frame. Feather files hold a single record batch, so a mapped column
+    converts to pandas without being stitched together from chunks.
+
+    Args:
+    df (pd.DataFrame): The DataFrame to write.
+    path (str): Destination path; the extension selects the format.
+    compression (str, optional): Compression codec. Feather defaults to 'uncompressed' so the
+        file can be memory-mapped, Parquet defaults to 'snappy'.
+
+    Returns:
+    int: The size of the written file in bytes.
+    """
+    import pyarrow as pa
+
+    file_format = frame_format(path)
+    table = pa.Table.from_pandas(df, preserve_index=True)
+
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    os.close(fd)
+    try:
+        if file_format == 'feather':
+            from pyarrow import feather
+            feather.write_feather(table, tmp_path, compression=compression or 'uncompressed',
+                                  chunksize=max(len(table), 1))
+        else:
+            import pyarrow.parquet as pq
+            pq.write_table(table, tmp_path, compression=compression or 'snappy')
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    return os.path.getsize(path)
+
+
+def read_table(path, columns=None, memory_map=True):
+    """
+    Read a frame file written by write_frame as a pyarrow Table.
+
+    Args:
+    path (str): Path of the frame file.
+    columns (list, optional): Subset of columns to read.
+    memory_map (bool): Memory-map the file instead of reading it into memory.
+
+    Returns:
+    pyarrow.Table: The stored table.
+    """
+    if frame_format(path) == 'feather':
+        from pyarrow import feather
+        return feather.read_table(path, columns=columns, memory_map=memory_map)
+
+    import pyarrow.parquet as pq
+    return pq.read_table(path, columns=columns, memory_map=memory_map)
+
+
+def read_frame(path, columns=None, memory_map=True, arrow_strings=False):
+    """
+    Read a frame file written by write_frame back into a DataFrame with its original dtypes.
+
+    Numeric and datetime columns without nulls are wrapped without a copy. String columns
+    are converted to Python objects, which copies them, unless arrow_strings is set.
+
+    Args:
+    path (str): Path of the frame file.
+    columns (list, optional): Subset of columns to read.
+    memory_map (bool): Memory-map the file instead of reading it into memory.
+    arrow_strings (bool): Return string columns as pd.ArrowDtype(pa.string()) backed by the
+        Arrow buffers instead of object columns.
+
+    Returns:
+    pd.DataFrame: The stored DataFrame.
+    """
+    table = read_table(path, columns=columns, memory_map=memory_map)
+    types_mapper = None
+    if arrow_strings:
+        import pandas as pd
+        import pyarrow as pa
+        types_mapper = {pa.string(): pd.ArrowDtype(pa.string()),
+                        pa.large_string(): pd.ArrowDtype(pa.large_string())}.get
+    return table.to_pandas(split_blocks=True, types_mapper=types_mapper)
@@ -1,15 +1,8 @@
 from unidecode import unidecode
-from src import utilities as utils
+from src import utilities as utils, query_scheduler
 
 
-class GeoStandardisation:
-  def __init__(self, client):
-    self.client = client
-    self._fetch_country()
-    self._fetch_state()
-  
-  def _fetch_country(self):
-      query = """
+COUNTRY_QUERY = """
                   SELECT
                     id AS Id,
                     name AS Name,
@@ -24,11 +17,8 @@ class GeoStandardisation:
                   FROM
                     `ap-marketing-data-ops-prod.MaintenanceDB.Geo_Country`
               """
-      self.df_country = utils.execute_query(self.client, query)
-      self.df_country = fix_country(self.df_country)
 
-  def _fetch_state(self):
-      query = """
+STATE_QUERY = """
         SELECT
           id AS Id,
           name AS Name,
@@ -43,7 +33,28 @@ class GeoStandardisation:
           `ap-marketing-data-ops-prod.MaintenanceDB.Geo_States`
       """
 
-      self.df_state = utils.execute_query(self.client, query)
+
+class GeoStandardisation:
+  def __init__(self, client, df_country=None, df_state=None):
+    # df_country and df_state are the raw results of COUNTRY_QUERY and STATE_QUERY when
+    # already fetched (e.g. by a DataOpsSession)
+    self.client = client
+    queries = {}
+    if df_country is None:
+      queries['geo_country'] = COUNTRY_QUERY
+    if df_state is None:
+      queries['geo_state'] = STATE_QUERY
+    # Missing tables are fetched concurrently
+    results = query_scheduler.execute_queries(client, queries) if queries else {}
+    self.df_country = fix_country(results.get('geo_country', df_country).copy())
+    self.df_state = fix_states(results.get('geo_state', df_state).copy())
+
+  def _fetch_country(self):
+      self.df_country = utils.execute_query(self.client, COUNTRY_QUERY)
+      self.df_country = fix_country(self.df_country)
+
+  def _fetch_state(self):
+      self.df_state = utils.execute_query(self.client, STATE_QUERY)
       self.df_state = fix_states(self.df_state)
   
   def _fetch_city(self):
@@ -0,0 +1,158 @@
+import re
+
+# Bump when the matching changes, so names cleaned with the old matching are not reused
+RULES_VERSION = '2'
+
+# Legal-entity designators stripped from the end of a name, grouped by region. Spellings are
+# written with their usual dots; dots and spaces between the parts are optional when matching,
+# so 'S.A.' also covers 'SA' and 'S. A.'.
+LEGAL_SUFFIXES = {
+    'north_america': ['Inc', 'Incorporated', 'Corp', 'Corporation', 'L.L.C.', 'Limited Liability Company',
+                      'L.L.P.', 'L.P.', 'L.L.L.P.', 'P.L.L.C.', 'Limited Partnership', 'Co. Inc', 'Co. L.L.C.'],
+    'commonwealth': ['Ltd', 'Limited', 'Co. Ltd', 'Co. Limited', 'Company Limited', 'P.L.C.',
+                     'Public Limited Company', 'Pty', 'Pty. Ltd', 'Pty. Limited', 'Pvt. Ltd', 'Private Limited',
+                     'Pte', 'Pte. Ltd'],
+    'dach': ['GmbH', 'mbH', 'GmbH & Co. KG', 'AG', 'AG & Co. KG', 'KG', 'KGaA', 'OHG', 'UG', 'e.V.'],
+    'romance': ['S.A.', 'S.A.S.', 'S.A.S.U.', 'S.A.R.L.', 'E.U.R.L.', 'S.N.C.', 'S.C.A.', 'S.p.A.', 'S.r.l.',
+                'S.r.l.s.', 'S.L.', 'S.L.U.'],
+    'latin_america': ['S.A. de C.V.', 'S.A.B. de C.V.', 'S. de R.L.', 'S. de R.L. de C.V.', 'S.A.C.', 'S.A.A.',
+                      'E.I.R.L.', 'Ltda', 'S/A'],
+    'benelux': ['B.V.', 'N.V.', 'V.O.F.', 'C.V.', 'B.V.B.A.', 'S.P.R.L.'],
+    'nordics': ['AB', 'AB publ', 'ASA', 'AS', 'A/S', 'ApS', 'Oy', 'Oyj', 'hf', 'ehf', 'OÜ'],
+    'central_eastern_europe': ['Sp. z o.o.', 's.r.o.', 'a.s.', 'd.o.o.', 'd.d.', 'Kft', 'Zrt', 'Nyrt', 'JSC',
+                               'OJSC', 'PJSC'],
+    'asia': ['K.K.', 'Kabushiki Kaisha', 'G.K.', 'Godo Kaisha', 'Sdn. Bhd', 'Bhd', 'Berhad', 'Tbk'],
+}
+
+# Designators written in front of the name, e.g. 'PT Bank Central Asia' or 'OOO Gazprom'
+LEGAL_PREFIXES = ['PT', 'OOO', 'ZAO', 'OAO', 'PAO']
+
+
+# Designators with at most this many letters ('AS', 'a.s.', 'AG', 'hf') are also common words
+# or word endings ('Known As'), so they are not matched regardless of case: only upper-case,
+# dotted, or exactly as written in the table
+SHORT_DESIGNATOR = 2
+
+
+def _designator_pattern(spelling, reverse=False, separators=r'[.,\s]*'):
+    """
+    Regex for one spelling, with optional dots and spacing between its parts. With reverse,
+    the regex matches the spelling in a reversed string.
+    """
+    parts = re.findall(r'[^\W_]+|[&/]', spelling)
+    if reverse:
+        parts = [part[::-1] for part in reversed(parts)]
+    return separators.join(re.escape(part) for part in parts)
+
+
+def _short_designator_patterns(spelling, reverse=False):
+    """
+    Regexes for a short designator: the upper-case form and the table spelling case-sensitively,
+    and a dotted spelling in any case as long as the dots are there.
+    """
+    patterns = {f'(?-i:{_designator_pattern(spelling.upper(), reverse)})'}
+    if re.fullmatch(r'[^\W\d_]+(?:\.\s*[^\W\d_]+)+\.?', spelling):
+        patterns.add(_designator_pattern(spelling, reverse, separators=r'\s*\.\s*'))
+    elif '.' not in spelling:
+        patterns.add(f'(?-i:{_designator_pattern(spelling, reverse)})')
+    return patterns
+
+
+def _alternation(spellings, reverse=False):
+    patterns = set()
+    for spelling in spellings:
+        if len(re.findall(r'[^\W\d_]', spelling)) <= SHORT_DESIGNATOR:
+            patterns |= _short_designator_patterns(spelling, reverse)
+        else:
+            patterns.add(_designator_pattern(spelling, reverse))
+    # Longest first, so 'GmbH & Co KG' is tried before 'GmbH'
+    return '|'.join(sorted(patterns, key=lambda pattern: (-len(pattern), pattern)))
+
+
+class LegalSuffixNormalizer:
+    """
+    Strip legal-entity suffixes (Inc, LLC, GmbH, S.A., Pty Ltd, ...) and designator prefixes
+    from business names.
+
+    The suffix and prefix tables are compiled once into one matcher each. The suffix matcher
+    runs anchored on the reversed name, so it only looks at the end of the name instead of
+    scanning it. Stacked suffixes ('Acme Holdings Pty. Ltd.') are removed in one pass,
+    together with the separators and dots before them. A designator that is the whole name
+    is kept.
+
+    Args:
+    suffixes (dict or list, optional): Suffix spellings, grouped by region or flat.
+        Defaults to LEGAL_SUFFIXES.
+    prefixes (list, optional): Prefix spellings. Defaults to LEGAL_PREFIXES.
+
+    Example:
+    normalizer = LegalSuffixNormalizer()
+    normalizer.normalize('Acme Holdings, Inc.')  # 'Acme Holdings'
+    df['Name'] = normalizer.normalize_many(df['Name'])
+    """
+
+    def __init__(self, suffixes=None, prefixes=None):
+        suffixes = LEGAL_SUFFIXES if suffixes is None else suffixes
+        if isinstance(suffixes, dict):
+            suffixes = [spelling for spellings in suffixes.values() for spelling in spellings]
+        prefixes = LEGAL_PREFIXES if prefixes is None else prefixes
+        self.suffixes = list(suffixes)
+        self.prefixes = list(prefixes)
+        self._suffix_pattern = re.compile(r'[\s.,]*(?:\.?(?:' + _alternation(self.suffixes, reverse=True)
+                                          + r')[\s,]+)+(?=[^\s,])', flags=re.IGNORECASE)
+        self._prefix_pattern = (re.compile(r'(?:' + _alternation(self.prefixes) + r')\.?[\s,]+(?=\S)',
+                                           flags=re.IGNORECASE) if self.prefixes else None)
+
+    def normalize(self, name):
+        """Return the name without its legal designators and surrounding whitespace."""
+        name = name.strip()
+        match = self._suffix_pattern.match(name[::-1])
+        if match is not None:
+            name = name[:len(name) - match.end()]
+        if self._prefix_pattern is not None:
+            match = self._prefix_pattern.match(name)
+            if match is not None:
+                name = name[match.end():]
+        return name
+
+    def normalize_many(self, names):
+        """
+        Normalize a list or pandas Series of names.
+
+        Args:
+        names (list or pd.Series): Names; missing values in a Series are kept.
+
+        Returns:
+        list or pd.Series: The normalized names, in the shape of names.
+        """
+        if isinstance(names, list):
+            return [self.normalize(name) for name in names]
+        return names.map(self.normalize, na_action='ignore')
+
+
+def compare_with_cleancorp(names, normalizer=None):
+    """
+    Compare the native normalizer with CleanCorp on a corpus of names.
+
+    Used as the regression check before switching CleanBusinessName to
+    legal_suffixes='native'.
+
+    Args:
+    names (iterable): Names to compare; duplicates and missing values are skipped.
+    normalizer (LegalSuffixNormalizer, optional): Defaults to the built-in tables.
+
+    Returns:
+    pd.DataFrame: One row per name where the outputs differ, with the columns name,
+        cleancorp and native.
+    """
+    import pandas as pd
+    from cleancorp import CleanCorp
+
+    normalizer = normalizer or LegalSuffixNormalizer()
+    rows = []
+    for name in dict.fromkeys(name for name in names if isinstance(name, str)):
+        expected = CleanCorp(name).clean_name
+        actual = normalizer.normalize(name)
+        if expected != actual:
+            rows.append({'name': name, 'cleancorp': expected, 'native': actual})
+    return pd.DataFrame(rows, columns=['name', 'cleancorp', 'native'])
@@ -0,0 +1,340 @@
+import datetime
+import glob
+import os
+import re
+import tempfile
+import threading
+import types
+import uuid
+import weakref
+
+from src import big_query
+
+# Dataset under which query results are exposed to LocalReadClient, like BigQuery's
+# anonymous result tables
+RESULTS_DATASET = '_local_query_results'
+
+
+def _close_paren(text, start):
+    """Return the index of the parenthesis closing the one opened just before start."""
+    depth = 1
+    quote = None
+    i = start
+    while i < len(text):
+        char = text[i]
+        if quote:
+            if char == '\\':
+                i += 1
+            elif char == quote:
+                quote = None
+        elif char in ("'", '"'):
+            quote = char
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+            if depth == 0:
+                return i
+        i += 1
+    raise ValueError("Unbalanced parentheses in query.")
+
+
+def _translate_date_arithmetic(query):
+    """Rewrite DATE_SUB/DATE_ADD(expr, INTERVAL n UNIT) as (expr -/+ INTERVAL n UNIT)."""
+    pattern = re.compile(r'\b(DATE|DATETIME|TIMESTAMP)_(SUB|ADD)\(', flags=re.IGNORECASE)
+    while True:
+        match = pattern.search(query)
+        if match is None:
+            return query
+        end = _close_paren(query, match.end())
+        args = query[match.end():end]
+        interval = re.search(r',\s*(INTERVAL\s+[^,]+)$', args, flags=re.IGNORECASE)
+        if interval is None:
+            raise ValueError(f"Cannot translate {match.group(0)}{args})")
+        operator = '-' if match.group(2).upper() == 'SUB' else '+'
+        expr = args[:interval.start()]
+        query = f"{query[:match.start()]}({expr} {operator} {interval.group(1).strip()}){query[end + 1:]}"
+
+
+def _translate_string_literal(match):
+    """Rewrite a backslash-escaped BigQuery string literal with SQL quote doubling."""
+    body = re.sub(r'\\(.)', lambda m: "''" if m.group(1) == "'" else m.group(1), match.group(0)[1:-1])
+    return f"'{body}'"
+
+
+def translate_query(query):
+    """
+    Translate the BigQuery SQL used in this repo into DuckDB SQL.
+
+    Handles backtick-quoted `project.dataset.table` names, DATE_SUB/DATE_ADD with INTERVAL,
+    FARM_FINGERPRINT and backslash escapes in string literals. DATETIME and STRING are
+    already aliases in DuckDB.
+
+    Args:
+    query (str): BigQuery SQL.
+
+    Returns:
+    str: DuckDB SQL.
+    """
+    query = re.sub(r"'(?:[^'\\]|\\.)*'", _translate_string_literal, query)
+    query = re.sub(r'`(?:[\w-]+\.)?(\w+)\.(\w+)`', r'"\1"."\2"', query)
+    query = re.sub(r'\bFARM_FINGERPRINT\(', 'farm_fingerprint(', query, flags=re.IGNORECASE)
+    return _translate_date_arithmetic(query)
+
+
+class LocalRowIterator:
+    """Stand-in for bigquery.table.RowIterator over an Arrow table."""
+
+    def __init__(self, table, page_size=None):
+        self._table = table
+        self._page_size = page_size
+        self.total_rows = table.num_rows
+
+    def to_arrow_iterable(self):
+        yield from self._table.to_batches(max_chunksize=self._page_size)
+
+    def to_dataframe_iterable(self):
+        import pyarrow as pa
+        for batch in self.to_arrow_iterable():
+            yield big_query.arrow_to_dataframe(pa.Table.from_batches([batch]))
+
+    def to_arrow(self):
+        return self._table
+
+    def to_dataframe(self):
+        return big_query.arrow_to_dataframe(self._table)
+
+
+class LocalQueryJob:
+    """Stand-in for bigquery.QueryJob that runs the translated query on DuckDB."""
+
+    def __init__(self, client, query, dry_run=False):
+        self._client = client
+        self.query = query
+        self.job_id = f'local_{uuid.uuid4().hex}'
+        self.destination = types.SimpleNamespace(project=client.project, dataset_id=RESULTS_DATASET, table_id=self.job_id)
+        self.dry_run = dry_run
+        self.cache_hit = False
+        self.slot_millis = None
+        self.total_bytes_processed = 0 if dry_run else None
+        self.total_bytes_billed = 0 if dry_run else None
+        self.created = datetime.datetime.now(datetime.timezone.utc)
+        self.started = None
+        self.ended = None
+        self._table = None
+
+    def _run(self):
+        if self._table is None:
+            self.started = datetime.datetime.now(datetime.timezone.utc)
+            self._table = self._client.execute(self.query)
+            self._client._results[self.job_id] = self._table
+            self.ended = datetime.datetime.now(datetime.timezone.utc)
+            self.total_bytes_processed = self.total_bytes_billed = self._table.nbytes
+        return self._table
+
+    def done(self):
+        return self._table is not None
+
+    def result(self, page_size=None, **kwargs):
+        return LocalRowIterator(self._run(), page_size)
+
+    def to_arrow(self, **kwargs):
+        return self._run()
+
+    def to_dataframe(self, **kwargs):
+        return big_query.arrow_to_dataframe(self._run())
+
+    def cancel(self):
+        return False
+
+
+class LocalClient:
+    """
+    Drop-in stand-in for bigquery.Client that runs the same SQL on a local DuckDB database.
+
+    Tables are seeded from Parquet fixtures laid out as <fixtures_dir>/<Dataset>/<Table>.parquet
+    (or registered from DataFrames) and are reachable under their BigQuery names, e.g.
+    `ap-marketing-data-ops-prod.AoA_MarketingOps.Account`. Only query(...) and the job
+    methods used by this repo are implemented.
+
+    Args:
+    fixtures_dir (str, optional): Directory of Parquet fixtures to expose as tables.
+    database (str): DuckDB database file, in memory by default.
+
+    Example:
+    client = LocalClient('fixtures')
+    df_sf_accts = data_tables.sf_accts(client)
+    """
+
+    project = 'local'
+
+    def __init__(self, fixtures_dir=None, database=':memory:'):
+        import duckdb
+
+        self._con = duckdb.connect(database)
+        # An INT64 hash like BigQuery's FARM_FINGERPRINT, which unlike hash() is NULL for NULL
+        self._con.execute('CREATE OR REPLACE MACRO farm_fingerprint(value) AS '
+                          'CASE WHEN value IS NULL THEN NULL ELSE CAST(hash(value) >> 1 AS BIGINT) END')
+        self._lock = threading.Lock()
+        self._results = weakref.WeakValueDictionary()
+        if fixtures_dir is not None:
+            self.load_fixtures(fixtures_dir)
+
+    def _schema(self, dataset):
+        self._con.execute(f'CREATE SCHEMA IF NOT EXISTS "{dataset}"')
+
+    def _drop(self, dataset, table, kind):
+        """Drop dataset.table if it exists as a kind ('VIEW' or 'TABLE') relation."""
+        # CREATE OR REPLACE only replaces a relation of its own kind, and DROP ... IF EXISTS
+        # fails on the other kind, so look the existing one up first
+        existing = self._con.execute(
+            'SELECT table_type FROM information_schema.tables '
+            'WHERE lower(table_schema) = lower(?) AND lower(table_name) = lower(?)', [dataset, table]).fetchone()
+        if existing is not None and existing[0].endswith(kind):
+            self._con.execute(f'DROP {kind} "{dataset}"."{table}"')
+
+    def load_fixtures(self, fixtures_dir):
+        """Expose every <Dataset>/<Table>.parquet file under fixtures_dir as a view."""
+        with self._lock:
+            for path in sorted(glob.glob(os.path.join(fixtures_dir, '*', '*.parquet'))):
+                dataset = os.path.basename(os.path.dirname(path))
+                table = os.path.splitext(os.path.basename(path))[0]
+                self._schema(dataset)
+                self._drop(dataset, table, 'TABLE')
+                self._con.execute(f'CREATE OR REPLACE VIEW "{dataset}"."{table}" AS '
+                                  f"SELECT * FROM read_parquet('{os.path.abspath(path)}')")
+
+    def register(self, table_id, df):
+        """
+        Create a table from a DataFrame, replacing a fixture view or table of the same name.
+
+        Args:
+        table_id (str): 'Dataset.Table', optionally prefixed with the project.
+        df (pd.DataFrame): The table contents.
+        """
+        dataset, table = table_id.split('.')[-2:]
+        with self._lock:
+            self._schema(dataset)
+            self._drop(dataset, table, 'VIEW')
+            self._con.register('_register_df', df)
+            self._con.execute(f'CREATE OR REPLACE TABLE "{dataset}"."{table}" AS SELECT * FROM _register_df')
+            self._con.unregister('_register_df')
+
+    def execute(self, query):
+        """Run BigQuery SQL and return the result as a pyarrow Table."""
+        # A cursor per call keeps the connection usable from several threads
+        with self._lock:
+            cursor = self._con.cursor()
+        try:
+            return cursor.execute(translate_query(query)).fetch_arrow_table()
+        finally:
+            cursor.close()
+
+    def query(self, query, job_config=None, **kwargs):
+        """Return a job for the query; it runs when its result is first requested."""
+        dry_run = bool(getattr(job_config, 'dry_run', False))
+        return LocalQueryJob(self, query, dry_run=dry_run)
+
+
+class LocalReadRowsStream:
+    """Stand-in for bigquery_storage ReadRowsStream serving one stream file."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def to_arrow(self, read_session=None):
+        from pyarrow import feather
+        return feather.read_table(self.path, memory_map=True)
+
+
+class LocalReadClient:
+    """
+    Stand-in for bigquery_storage.BigQueryReadClient serving LocalClient query results.
+
+    A read session splits the result of a finished LocalQueryJob into Arrow IPC stream files,
+    which read_rows serves memory-mapped, so the multi-stream fetch of execute_query runs
+    locally.
+
+    Args:
+    client (LocalClient): The client that ran the queries.
+    directory (str, optional): Directory of the stream files, a temporary one by default.
+
+    Example:
+    df = big_query.execute_query(client, query, fetch='storage', read_client=LocalReadClient(client))
+    """
+
+    def __init__(self, client, directory=None):
+        self._client = client
+        self.directory = directory or tempfile.mkdtemp(prefix='local_read_')
+
+    def create_read_session(self, request=None, **kwargs):
+        from pyarrow import feather
+
+        request = request or kwargs
+        table_id = request['read_session']['table'].rsplit('/', 1)[-1]
+        table = self._client._results.get(table_id)
+        if table is None:
+            raise ValueError(f"No local query result for table {table_id}.")
+
+        streams = []
+        if table.num_rows:
+            count = max(1, min(request.get('max_stream_count') or 1, table.num_rows))
+            step = -(-table.num_rows // count)
+            for i, start in enumerate(range(0, table.num_rows, step)):
+                path = os.path.join(self.directory, f'{table_id}_{i}.arrow')
+                feather.write_feather(table.slice(start, step), path, compression='uncompressed')
+                streams.append(types.SimpleNamespace(name=path))
+        schema = types.SimpleNamespace(serialized_schema=table.schema.serialize().to_pybytes())
+        return types.SimpleNamespace(streams=streams, arrow_schema=schema)
+
+    def read_rows(self, name, offset=0, **kwargs):
+        return LocalReadRowsStream(name)
+
+
+class LocalBlob:
+    """Stand-in for storage.Blob backed by a local file."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def open(self, mode='r', **kwargs):
+        if 'w' in mode:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        return open(self.path, mode)
+
+    def download_as_text(self, encoding='utf-8'):
+        with open(self.path, encoding=encoding) as f:
+            return f.read()
+
+
+class LocalBucket:
+    """Stand-in for storage.Bucket backed by a local directory."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def blob(self, blob_name):
+        return LocalBlob(os.path.join(self.path, blob_name))
+
+
+class LocalStorageClient:
+    """
+    Stand-in for storage.Client that serves buckets from <root>/<bucket_name>.
+
+    Args:
+    root (str): Directory holding one subdirectory per bucket.
+
+    Example:
+    df = big_query.read_csv_from_gcs('vendor-drops', 'zoominfo/export.csv', client=LocalStorageClient('fixtures/gcs'))
+    """
+
+    def __init__(self, root):
+        self.root = root
+
+    def bucket(self, bucket_name):
+        return LocalBucket(os.path.join(self.root, bucket_name))
+
+    get_bucket = bucket
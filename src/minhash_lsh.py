@@ -0,0 +1,314 @@
+import numpy as np
+import pandas as pd
+
+# Multipliers of the hash mixing, odd 64-bit constants
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+_MIX = np.uint64(0xBF58476D1CE4E5B9)
+
+# Built on first use, so recordlinkage is only imported when an index is made
+_index_class = None
+
+
+def lsh_params(threshold=0.5, num_perm=128, false_positive_weight=0.5, false_negative_weight=0.5):
+    """
+    Choose the number of bands and rows per band for a Jaccard similarity threshold.
+
+    Two values with Jaccard similarity s share at least one band with probability
+    1 - (1 - s ** rows) ** bands. The bands and rows (with bands * rows <= num_perm) are the ones
+    that minimise the weighted area of that curve below the threshold (false positives) and
+    above it (missed pairs).
+
+    Args:
+    threshold (float): Jaccard similarity of the shingles from which values should be paired.
+    num_perm (int): Number of MinHash permutations available.
+    false_positive_weight (float): Weight of pairs below the threshold.
+    false_negative_weight (float): Weight of missed pairs above the threshold.
+
+    Returns:
+    tuple: (bands, rows).
+
+    Example:
+    bands, rows = lsh_params(0.5, 128)  # (25, 5)
+    """
+    if not 0 < threshold < 1:
+        raise ValueError(f"threshold must be between 0 and 1, got {threshold}")
+    below = np.linspace(0, threshold, 201)
+    above = np.linspace(threshold, 1, 201)
+    best, best_error = None, np.inf
+    for bands in range(1, num_perm + 1):
+        rows = np.arange(1, num_perm // bands + 1)[:, None]
+        false_positives = (1 - (1 - below ** rows) ** bands).mean(axis=1) * threshold
+        false_negatives = ((1 - above ** rows) ** bands).mean(axis=1) * (1 - threshold)
+        error = false_positive_weight * false_positives + false_negative_weight * false_negatives
+        i = int(error.argmin())
+        if error[i] < best_error:
+            best, best_error = (bands, i + 1), error[i]
+    return best
+
+
+def _shingles(values, shingle_size):
+    """
+    Return the row and the integer code of every shingle of the values.
+
+    Shingles are windows of shingle_size bytes of the lower-cased, trimmed UTF-8 value; a
+    shorter value is one shingle. Missing and empty values have none.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    array = pa.array(values, from_pandas=True)
+    array = pc.utf8_trim_whitespace(pc.utf8_lower(array.cast(pa.large_string()))).fill_null('')
+    array = array.combine_chunks() if isinstance(array, pa.ChunkedArray) else array
+    offsets = np.frombuffer(array.buffers()[1], dtype=np.int64)[array.offset:array.offset + len(array) + 1]
+    data = array.buffers()[2]
+    data = np.frombuffer(data, dtype=np.uint8) if data is not None else np.zeros(0, dtype=np.uint8)
+
+    lengths = np.diff(offsets)
+    windows = np.where(lengths > 0, np.maximum(lengths - shingle_size + 1, 1), 0)
+    rows = np.repeat(np.arange(len(lengths)), windows)
+    first = np.zeros(len(windows), dtype=np.int64)
+    np.cumsum(windows[:-1], out=first[1:])
+    starts = np.arange(len(rows)) - np.repeat(first - offsets[:-1], windows)
+    widths = np.minimum(lengths, shingle_size)[rows]
+
+    codes = np.zeros(len(rows), dtype=np.uint64)
+    for j in range(shingle_size):
+        byte = data[np.minimum(starts + j, max(len(data) - 1, 0))].astype(np.uint64) if len(data) else codes
+        codes |= np.where(j < widths, byte, 0).astype(np.uint64) << np.uint64(8 * j)
+    return rows, codes * _GOLDEN
+
+
+def _permutations(num_perm, seed):
+    rng = np.random.default_rng(seed)
+    multipliers = rng.integers(0, 2 ** 63, num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+    increments = rng.integers(0, 2 ** 63, num_perm, dtype=np.uint64)
+    return multipliers, increments
+
+
+def _minhashes(values, num_perm, shingle_size, seed):
+    """
+    Yield the MinHash of every value for one permutation at a time, then the mask of values
+    that have shingles.
+    """
+    if not 1 <= shingle_size <= 8:
+        raise ValueError(f"shingle_size must be between 1 and 8, got {shingle_size}")
+    rows, codes = _shingles(values, shingle_size)
+    group_starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]]) if len(rows) else np.zeros(0, dtype=np.int64)
+    group_rows = rows[group_starts]
+    valid = np.zeros(len(values), dtype=bool)
+    valid[group_rows] = True
+
+    minimum = np.full(len(values), np.iinfo(np.uint32).max, dtype=np.uint32)
+    for multiplier, increment in zip(*_permutations(num_perm, seed)):
+        # Multiply-shift hashing: the high 32 bits of a * x + b
+        hashes = ((codes * multiplier + increment) >> np.uint64(32)).astype(np.uint32)
+        if len(hashes):
+            minimum[group_rows] = np.minimum.reduceat(hashes, group_starts)
+        yield minimum
+    yield valid
+
+
+def minhash_signatures(values, num_perm=128, shingle_size=3, seed=1):
+    """
+    Compute MinHash signatures of the character shingles of values.
+
+    The share of equal columns of two signatures estimates the Jaccard similarity of the
+    shingle sets of the two values.
+
+    Args:
+    values (pd.Series): String values.
+    num_perm (int): Number of permutations, the signature length.
+    shingle_size (int): Shingle length in bytes, from 1 to 8.
+    seed (int): Seed of the permutations; signatures are only comparable with the same seed.
+
+    Returns:
+    np.ndarray: A uint32 array of shape (len(values), num_perm). Rows of missing or empty
+        values are all 2**32 - 1.
+    """
+    minhashes = _minhashes(values, num_perm, shingle_size, seed)
+    return np.column_stack([next(minhashes).copy() for _ in range(num_perm)])
+
+
+def band_keys(values, bands, rows, shingle_size=3, seed=1):
+    """
+    Compute the LSH bucket key of every value in every band.
+
+    The MinHash signature (bands * rows permutations) is cut into bands of rows values, and
+    each band is hashed into one 64-bit key, so two values land in the same bucket of a band
+    when their signatures agree on the whole band.
+
+    Args:
+    values (pd.Series): String values.
+    bands (int): Number of bands.
+    rows (int): Permutations per band.
+    shingle_size (int): Shingle length in bytes, from 1 to 8.
+    seed (int): Seed of the permutations.
+
+    Returns:
+    tuple: A uint64 array of shape (bands, len(values)) and the boolean mask of values that
+        have shingles (missing and empty values are never in a bucket).
+    """
+    minhashes = _minhashes(values, bands * rows, shingle_size, seed)
+    keys = np.zeros((bands, len(values)), dtype=np.uint64)
+    for band in range(bands):
+        for _ in range(rows):
+            keys[band] = (keys[band] ^ next(minhashes)) * _MIX
+    return keys, next(minhashes)
+
+
+class MinHashLSH:
+    """
+    Candidate pairs of similar strings from MinHash signatures and banded LSH buckets.
+
+    Each value is cut into character shingles and summarised by a MinHash signature. The
+    signature is split into bands, and two values are a candidate pair when they fall in the
+    same bucket in at least one band. Pairs are found with a hash join per band, so the work
+    grows with the number of values and of similar pairs instead of with the product of the
+    table sizes, and names that differ in their first characters are still paired, unlike
+    with a sorted neighbourhood. Bands and rows follow from the Jaccard threshold unless
+    they are given.
+
+    Args:
+    threshold (float): Jaccard similarity of the shingle sets from which pairs should be
+        found; used to choose bands and rows, see lsh_params.
+    num_perm (int): Number of MinHash permutations when bands and rows are chosen.
+    bands (int, optional): Number of bands; given together with rows, num_perm is then
+        bands * rows.
+    rows (int, optional): Permutations per band.
+    shingle_size (int): Shingle length in bytes, from 1 to 8.
+    seed (int): Seed of the permutations.
+
+    Example:
+    lsh = MinHashLSH(threshold=0.6)
+    left, right = lsh.pairs(df_sf['SF_AccountNameClean'], df_zi['ZI_AccountNameClean'])
+    """
+
+    def __init__(self, threshold=0.5, num_perm=128, bands=None, rows=None, shingle_size=3, seed=1):
+        if (bands is None) != (rows is None):
+            raise ValueError("Pass both bands and rows, or neither.")
+        if bands is None:
+            bands, rows = lsh_params(threshold, num_perm)
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = rows
+        self.shingle_size = shingle_size
+        self.seed = seed
+
+    def __repr__(self):
+        return f"MinHashLSH(bands={self.bands}, rows={self.rows}, shingle_size={self.shingle_size})"
+
+    def band_keys(self, values):
+        """Return the band keys and the mask of bucketed values, see band_keys."""
+        return band_keys(values, self.bands, self.rows, self.shingle_size, self.seed)
+
+    def pairs(self, left, right=None):
+        """
+        Find the candidate pairs between two columns, or within one.
+
+        Buckets are built on the distinct values, so repeated values are hashed and joined
+        once and only expanded to their rows at the end.
+
+        Args:
+        left (pd.Series): String values.
+        right (pd.Series, optional): String values to pair with left. Without it, pairs
+            within left are returned once, with the left position greater than the right one.
+
+        Returns:
+        tuple: Two int64 arrays of the positions of each pair in left and right, sorted.
+        """
+        left_codes, left_uniques = pd.factorize(left)
+        right_codes, right_uniques = (left_codes, left_uniques) if right is None else pd.factorize(right)
+        left_keys, left_valid = self.band_keys(pd.Series(left_uniques, dtype=object))
+        right_keys, right_valid = ((left_keys, left_valid) if right is None
+                                   else self.band_keys(pd.Series(right_uniques, dtype=object)))
+        left_ids, right_ids = np.flatnonzero(left_valid), np.flatnonzero(right_valid)
+        size = len(right_uniques)
+
+        codes = [np.zeros(0, dtype=np.int64)]
+        for band in range(self.bands):
+            buckets = pd.DataFrame({'key': left_keys[band, left_ids], 'left': left_ids}).merge(
+                pd.DataFrame({'key': right_keys[band, right_ids], 'right': right_ids}), on='key')
+            band_codes = buckets['left'].to_numpy() * size + buckets['right'].to_numpy()
+            if right is None:
+                band_codes = band_codes[buckets['left'].to_numpy() >= buckets['right'].to_numpy()]
+            codes.append(band_codes)
+        codes = np.unique(np.concatenate(codes))
+
+        left_pos, right_pos = _expand(codes // size, codes % size, left_codes, right_codes)
+        if right is None:
+            left_pos, right_pos = np.maximum(left_pos, right_pos), np.minimum(left_pos, right_pos)
+            keep = left_pos > right_pos
+            left_pos, right_pos = left_pos[keep], right_pos[keep]
+        codes = np.unique(left_pos * len(right_codes) + right_pos)
+        return codes // len(right_codes), codes % len(right_codes)
+
+
+def _expand(left_ids, right_ids, left_codes, right_codes):
+    """Return the row positions of every pair of rows holding a pair of distinct values."""
+
+    def groups(codes, ids):
+        order = np.argsort(codes, kind='stable')
+        counts = np.bincount(codes[codes >= 0], minlength=ids.max() + 1 if len(ids) else 0)
+        starts = np.zeros(len(counts), dtype=np.int64)
+        np.cumsum(counts[:-1], out=starts[1:])
+        # Missing values (code -1) sort first
+        return order[np.count_nonzero(codes < 0):], starts[ids], counts[ids]
+
+    left_order, left_starts, left_counts = groups(left_codes, left_ids)
+    right_order, right_starts, right_counts = groups(right_codes, right_ids)
+    sizes = left_counts * right_counts
+    offsets = np.zeros(len(sizes), dtype=np.int64)
+    np.cumsum(sizes[:-1], out=offsets[1:])
+    within = np.arange(sizes.sum()) - np.repeat(offsets, sizes)
+    right_counts = np.repeat(right_counts, sizes)
+    left_pos = left_order[np.repeat(left_starts, sizes) + within // right_counts]
+    right_pos = right_order[np.repeat(right_starts, sizes) + within % right_counts]
+    return left_pos, right_pos
+
+
+def _lsh_index_class():
+    global _index_class
+    if _index_class is None:
+        from recordlinkage.base import BaseIndexAlgorithm
+
+        class MinHashLSHIndex(BaseIndexAlgorithm):
+            """recordlinkage index algorithm pairing records with MinHashLSH on one column each."""
+
+            def __init__(self, left_on, right_on=None, lsh=None, **kwargs):
+                super().__init__(**kwargs)
+                self.left_on = left_on
+                self.right_on = right_on or left_on
+                self.lsh = lsh or MinHashLSH()
+
+            def __repr__(self):
+                return f"<MinHashLSHIndex {self.left_on} ~ {self.right_on} {self.lsh}>"
+
+            def _link_index(self, df_a, df_b):
+                left, right = self.lsh.pairs(df_a[self.left_on], df_b[self.right_on])
+                return pd.MultiIndex.from_arrays([df_a.index[left], df_b.index[right]])
+
+            def _dedup_index(self, df_a):
+                left, right = self.lsh.pairs(df_a[self.left_on])
+                return pd.MultiIndex.from_arrays([df_a.index[left], df_a.index[right]])
+
+        _index_class = MinHashLSHIndex
+    return _index_class
+
+
+def lsh_index(left_on, right_on=None, **params):
+    """
+    Build a recordlinkage index algorithm that pairs records with MinHashLSH.
+
+    Args:
+    left_on (str): Column of the first dataframe.
+    right_on (str, optional): Column of the second dataframe. Defaults to left_on.
+    **params: Arguments of MinHashLSH (threshold, num_perm, bands, rows, shingle_size, seed).
+
+    Returns:
+    recordlinkage.base.BaseIndexAlgorithm: The algorithm, to pass to recordlinkage.Index.add.
+
+    Example:
+    indexer = recordlinkage.Index()
+    indexer.add(lsh_index('SF_AccountNameClean', 'ZI_AccountNameClean', threshold=0.6))
+    """
+    return _lsh_index_class()(left_on, right_on, lsh=MinHashLSH(**params))
@@ -0,0 +1,150 @@
+import hashlib
+import os
+import re
+import time
+
+from src import frame_store
+
+
+def normalize_query(query):
+    """
+    Normalize SQL text so that formatting differences do not change its identity.
+
+    Collapses runs of whitespace and drops trailing semicolons. Case is kept because string
+    literals inside the query are case sensitive.
+
+    Args:
+    query (str): The SQL query.
+
+    Returns:
+    str: The normalized query text.
+    """
+    return re.sub(r'\s+', ' ', query).strip().rstrip(';').strip()
+
+
+def query_fingerprint(query, *parts):
+    """
+    Return a stable hash of the normalized query text and any extra key parts.
+
+    Args:
+    query (str): The SQL query.
+    *parts: Additional values (e.g. a schema) that change the shape of the result.
+
+    Returns:
+    str: A hex digest identifying the query.
+    """
+    key = normalize_query(query)
+    for part in parts:
+        if part is not None:
+            key += '\x00' + repr(part)
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+class QueryCache:
+    """
+    Opt-in on-disk cache of query results stored as Feather (Arrow IPC) or Parquet files.
+
+    Entries are keyed by the normalized query text, expire after `ttl` seconds and the
+    least recently used entries are evicted once the cache grows beyond `max_bytes`.
+    Feather entries are stored uncompressed so a hit is read back memory-mapped.
+
+    Args:
+    cache_dir (str): Directory holding the cached result files.
+    ttl (int, optional): Time to live of an entry in seconds. None disables expiry.
+    max_bytes (int, optional): Size bound of the cache directory. None disables eviction.
+    file_format (str): 'feather' (default) or 'parquet'.
+
+    Example:
+    cache = QueryCache('/content/drive/MyDrive/bq_cache', ttl=12 * 3600)
+    df_sf_accts = data_tables.sf_accts(client, cache=cache)
+    """
+
+    def __init__(self, cache_dir, ttl=24 * 3600, max_bytes=5 * 1024 ** 3, file_format='feather'):
+        if file_format not in ('feather', 'parquet'):
+            raise ValueError(f"Unknown file_format: {file_format}")
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.file_format = file_format
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, query, *parts):
+        return os.path.join(self.cache_dir, f"{query_fingerprint(query, *parts)}.{self.file_format}")
+
+    def _expired(self, path, now):
+        return self.ttl is not None and now - os.path.getmtime(path) > self.ttl
+
+    def get(self, query, *parts):
+        """
+        Return the cached result of a query, or None on a miss or an expired entry.
+
+        Args:
+        query (str): The SQL query.
+        *parts: Extra key parts passed to put().
+
+        Returns:
+        pd.DataFrame or None: The cached result.
+        """
+        path = self._path(query, *parts)
+        now = time.time()
+        if not os.path.exists(path):
+            return None
+        if self._expired(path, now):
+            os.remove(path)
+            return None
+
+        df = frame_store.read_frame(path, memory_map=True)
+        # Record the access time explicitly, it drives LRU eviction
+        os.utime(path, (now, os.path.getmtime(path)))
+        return df
+
+    def put(self, query, df, *parts):
+        """
+        Store the result of a query and evict old entries if the cache is over its size bound.
+
+        Args:
+        query (str): The SQL query.
+        df (pd.DataFrame): The query result.
+        *parts: Extra key parts that change the shape of the result.
+        """
+        frame_store.write_frame(df, self._path(query, *parts))
+        self._evict()
+
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(f'.{self.file_format}'):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            stat = os.stat(path)
+            entries.append((stat.st_atime, stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _evict(self):
+        """Drop expired entries, then least recently used entries until the cache fits max_bytes."""
+        now = time.time()
+        entries = []
+        for atime, mtime, size, path in self._entries():
+            if self.ttl is not None and now - mtime > self.ttl:
+                os.remove(path)
+            else:
+                entries.append((atime, size, path))
+
+        if self.max_bytes is None:
+            return
+
+        total = sum(size for _, size, _ in entries)
+        for atime, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+
+    def size(self):
+        """Return the total size of the cached entries in bytes."""
+        return sum(size for _, _, size, _ in self._entries())
+
+    def clear(self):
+        """Remove every cached entry."""
+        for _, _, _, path in self._entries():
+            os.remove(path)
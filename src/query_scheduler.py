@@ -0,0 +1,255 @@
+import asyncio
+import functools
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from src import big_query
+
+# HTTP status codes of transient BigQuery errors that are worth retrying
+RETRYABLE_CODES = (429, 500, 502, 503, 504)
+
+
+def is_retryable(error):
+    """Return True for errors that are likely to succeed when the query is submitted again."""
+    if isinstance(error, ConnectionError):
+        return True
+    return getattr(error, 'code', None) in RETRYABLE_CODES
+
+
+class _JobTracker:
+    """Client wrapper that remembers the jobs it submits, so they can be cancelled."""
+
+    def __init__(self, client):
+        self._client = client
+        self.jobs = []
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+    def query(self, *args, **kwargs):
+        job = self._client.query(*args, **kwargs)
+        self.jobs.append(job)
+        return job
+
+    def cancel(self):
+        for job in self.jobs:
+            try:
+                if not job.done():
+                    job.cancel()
+            except Exception as e:
+                print(f"Could not cancel job {getattr(job, 'job_id', '')}: {e}")
+
+
+class QueryScheduler:
+    """
+    Run queries concurrently from asyncio with a limit on jobs in flight.
+
+    Each query runs execute_query on a worker thread. Queries that fail with a transient
+    error (HTTP 429/5xx or a connection error) are retried with exponential backoff, queries
+    that exceed their timeout have their BigQuery job cancelled, and cancel() stops every
+    outstanding query and job.
+
+    Args:
+    client: A Google BigQuery client instance.
+    max_in_flight (int): Maximum number of queries running at the same time.
+    timeout (float, optional): Default per-query timeout in seconds, retries included.
+    retries (int): Retries of a query after a transient error.
+    backoff (float): Delay before the first retry in seconds, doubled on every retry.
+    max_backoff (float): Upper bound of the retry delay in seconds.
+
+    Example:
+    scheduler = QueryScheduler(client, max_in_flight=4, timeout=300)
+    results = await scheduler.gather({'stopwords': stopwords_query, 'countries': countries_query})
+    """
+
+    def __init__(self, client, max_in_flight=8, timeout=None, retries=3, backoff=1.0, max_backoff=30.0):
+        self.client = client
+        self.max_in_flight = max_in_flight
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._semaphores = {}
+        self._tasks = set()
+        self._trackers = set()
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _semaphore(self):
+        # A semaphore belongs to one event loop; run_coroutine may use a new loop per call
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if loop not in self._semaphores:
+                self._semaphores = {loop: asyncio.Semaphore(self.max_in_flight)}
+            return self._semaphores[loop]
+
+    def _workers(self):
+        # Not the loop's default executor: asyncio.run waits for that one at shutdown, which
+        # would hold a synchronous caller until a timed-out download finishes
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(thread_name_prefix='query_scheduler')
+            return self._executor
+
+    async def _attempt(self, query, timeout, **kwargs):
+        tracker = _JobTracker(self.client)
+        self._trackers.add(tracker)
+        try:
+            call = functools.partial(big_query.execute_query, tracker, query, **kwargs)
+            return await asyncio.wait_for(asyncio.get_running_loop().run_in_executor(self._workers(), call), timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            tracker.cancel()
+            raise
+        finally:
+            self._trackers.discard(tracker)
+
+    async def run(self, query, timeout=None, **kwargs):
+        """
+        Run one query and return its result.
+
+        Args:
+        query (str): The SQL query.
+        timeout (float, optional): Timeout in seconds, the scheduler's timeout by default.
+        **kwargs: Passed to big_query.execute_query (cache, schema, label, ...).
+
+        Returns:
+        DataFrame: The query results.
+        """
+        timeout = timeout if timeout is not None else self.timeout
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout if timeout is not None else None
+        async with self._semaphore():
+            for attempt in range(self.retries + 1):
+                remaining = deadline - loop.time() if deadline is not None else None
+                if remaining is not None and remaining <= 0:
+                    raise asyncio.TimeoutError(f"Query {kwargs.get('label') or ''} timed out after {timeout}s.")
+                try:
+                    return await self._attempt(query, remaining, **kwargs)
+                except asyncio.TimeoutError:
+                    raise asyncio.TimeoutError(f"Query {kwargs.get('label') or ''} timed out after {timeout}s.") from None
+                except Exception as e:
+                    if attempt == self.retries or not is_retryable(e):
+                        raise
+                    delay = min(self.backoff * 2 ** attempt, self.max_backoff) * random.uniform(0.5, 1.0)
+                    print(f"Retrying {kwargs.get('label') or 'query'} in {delay:.1f}s after: {e}")
+                    await asyncio.sleep(delay)
+
+    def submit(self, query, **kwargs):
+        """Schedule a query on the running event loop and return its task."""
+        task = asyncio.ensure_future(self.run(query, **kwargs))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def gather(self, queries, return_exceptions=False, **kwargs):
+        """
+        Run several queries concurrently.
+
+        Args:
+        queries (dict or list): Queries keyed by name (the name is used as telemetry label),
+            or a list of queries.
+        return_exceptions (bool): Return errors in place of results instead of raising the
+            first one and cancelling the rest.
+        **kwargs: Passed to run for every query.
+
+        Returns:
+        dict or list: The results, in the shape of queries.
+        """
+        if isinstance(queries, dict):
+            tasks = [self.submit(query, **{'label': name, **kwargs}) for name, query in queries.items()]
+        else:
+            tasks = [self.submit(query, **kwargs) for query in queries]
+        try:
+            results = await asyncio.gather(*tasks, return_exceptions=return_exceptions)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        return dict(zip(queries, results)) if isinstance(queries, dict) else results
+
+    def cancel(self):
+        """Cancel every outstanding query and its BigQuery job."""
+        for task in list(self._tasks):
+            task.cancel()
+        for tracker in list(self._trackers):
+            tracker.cancel()
+
+    def close(self):
+        """
+        Release the worker threads without waiting for downloads that are still running,
+        e.g. of queries that timed out; queued queries are dropped.
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def execute_query_async(client, query, scheduler=None, timeout=None, **kwargs):
+    """
+    Execute a SQL query without blocking the event loop and return the results as a DataFrame.
+
+    Args:
+    client: A Google BigQuery client instance.
+    query (str): The SQL query to be executed.
+    scheduler (QueryScheduler, optional): Scheduler enforcing the in-flight limit, retries
+        and cancellation. A single-query scheduler is used when omitted.
+    timeout (float, optional): Timeout in seconds.
+    **kwargs: Passed to big_query.execute_query (cache, schema, label, ...).
+
+    Returns:
+    DataFrame: The query results as a DataFrame.
+
+    Example:
+    df_stopwords, df_countries = await asyncio.gather(
+        execute_query_async(client, stopwords_query, scheduler=scheduler),
+        execute_query_async(client, countries_query, scheduler=scheduler))
+    """
+    if scheduler is not None:
+        return await scheduler.run(query, timeout=timeout, **kwargs)
+    scheduler = QueryScheduler(client, max_in_flight=1)
+    try:
+        return await scheduler.run(query, timeout=timeout, **kwargs)
+    finally:
+        scheduler.close()
+
+
+def run_coroutine(coroutine):
+    """
+    Run a coroutine to completion from synchronous code and return its result.
+
+    Inside a running event loop (a Jupyter or Colab cell) the coroutine runs on its own loop
+    in a helper thread, since the running loop cannot be blocked on.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coroutine).result()
+
+
+def execute_queries(client, queries, max_in_flight=8, timeout=None, retries=3, **kwargs):
+    """
+    Run several queries concurrently from synchronous code.
+
+    Args:
+    client: A Google BigQuery client instance.
+    queries (dict or list): Queries keyed by name, or a list of queries.
+    max_in_flight (int): Maximum number of queries running at the same time.
+    timeout (float, optional): Per-query timeout in seconds.
+    retries (int): Retries of a query after a transient error.
+    **kwargs: Passed to big_query.execute_query.
+
+    Returns:
+    dict or list: The DataFrames, in the shape of queries.
+
+    Example:
+    results = execute_queries(client, {'geo_country': country_query, 'geo_state': state_query})
+    """
+    scheduler = QueryScheduler(client, max_in_flight=max_in_flight, timeout=timeout, retries=retries)
+    try:
+        return run_coroutine(scheduler.gather(queries, **kwargs))
+    finally:
+        scheduler.close()
@@ -0,0 +1,95 @@
+import datetime
+import json
+import threading
+
+from src.query_cache import normalize_query, query_fingerprint
+
+# Fields of a query record, in export order
+FIELDS = [
+    'label', 'fingerprint', 'submitted_at', 'local_cache_hit', 'bq_cache_hit', 'estimated_bytes',
+    'bytes_processed', 'bytes_billed', 'slot_ms', 'queue_seconds', 'execution_seconds',
+    'wait_seconds', 'download_seconds', 'fetch', 'streams', 'rows', 'result_bytes', 'error', 'query',
+]
+
+
+class QueryBudgetError(ValueError):
+    """Raised when the dry-run estimate of a query exceeds the configured byte budget."""
+
+
+class QueryStats:
+    """
+    In-process registry of telemetry for every execute_query call.
+
+    Each record holds the query fingerprint, the dry-run byte estimate (when a dry run was
+    made), bytes processed and billed, cache hits, slot time, queue/execution/download
+    latency and the size of the result.
+
+    Args:
+    max_bytes (int, optional): Byte budget; queries whose dry-run estimate exceeds it are
+        refused with QueryBudgetError before they run.
+    dry_run (bool): Dry-run every query to record its byte estimate, even without a budget.
+
+    Example:
+    query_stats.registry.max_bytes = 50 * 1024 ** 3
+    df_sf_accts = data_tables.sf_accts(client)
+    query_stats.registry.to_frame().sort_values('bytes_processed')
+    """
+
+    def __init__(self, max_bytes=None, dry_run=False):
+        self.max_bytes = max_bytes
+        self.dry_run = dry_run
+        self.records = []
+        self._lock = threading.Lock()
+
+    def new_record(self, query, label=None, schema=None):
+        """Return an empty record for a query about to run."""
+        record = dict.fromkeys(FIELDS)
+        record.update(label=label, fingerprint=query_fingerprint(query, schema)[:16],
+                      submitted_at=datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                      query=normalize_query(query))
+        return record
+
+    def add(self, record):
+        """Add a finished record to the registry."""
+        with self._lock:
+            self.records.append(record)
+
+    def clear(self):
+        """Remove every record."""
+        with self._lock:
+            self.records = []
+
+    def to_frame(self):
+        """Return the records as a DataFrame, one row per query."""
+        import pandas as pd
+        with self._lock:
+            return pd.DataFrame(list(self.records), columns=FIELDS)
+
+    def to_json(self, path=None):
+        """
+        Export the records as JSON.
+
+        Args:
+        path (str, optional): File to write. When omitted the JSON text is returned.
+        """
+        with self._lock:
+            text = json.dumps(self.records, indent=2, default=str)
+        if path is None:
+            return text
+        with open(path, 'w') as f:
+            f.write(text)
+
+    def to_csv(self, path):
+        """Export the records to a CSV file."""
+        self.to_frame().to_csv(path, index=False)
+
+
+def job_seconds(start, end):
+    """Return the seconds between two job timestamps, or None if either is missing."""
+    if start is None or end is None:
+        return None
+    return (end - start).total_seconds()
+
+
+# Default registry used by big_query.execute_query
+registry = QueryStats()
@@ -1,7 +1,6 @@
 import re
 import pandas as pd
-import recordlinkage as rl
-from src import utilities as utils
+from src import minhash_lsh, utilities as utils
 
 class RecordLinkage:
     """
@@ -10,11 +9,18 @@ class RecordLinkage:
     Args:
     df1 (pandas.DataFrame): The first dataframe to match.
     df2 (pandas.DataFrame): The second dataframe to match.
-    match_type (str): Defines the matching criteria.
+    match_type (str or dict): Defines the matching criteria: 'ZoomInfo', 'DNB', 'name', or a
+        rules dict with 'index' and 'compare'. Index rules are 'block', 'sortedneighbour' and
+        'lsh' (MinHash-LSH on character shingles, with optional 'lsh_params' such as
+        {'threshold': 0.6}, see minhash_lsh.MinHashLSH).
 
     Example:
     matcher = RecordLinkage(df1, df2, 'name')
     df_matches = matcher.get_potential_matches()
+
+    rules = {"index": {"lsh": {"SF_AccountNameClean": ["ZI_AccountNameClean"]}, "lsh_params": {"threshold": 0.6}},
+             "compare": {"SF_AccountNameClean": ["ZI_AccountNameClean"]}}
+    df_matches = RecordLinkage(df_sf_accts, df_zi, rules).get_potential_matches()
     """
 
     def __init__(self, df1, df2, match_type, confidence_score=False, secondary=False):
@@ -32,6 +38,8 @@ class RecordLinkage:
         Returns:
         recordlinkage.Index: A recordlinkage indexer object.
         """
+        import recordlinkage as rl
+
         indexer = rl.Index()
         index_rules = self.matching_rules.get('index', {})
 
@@ -47,6 +55,13 @@ class RecordLinkage:
           for col in right_on:
             indexer.sortedneighbourhood(left_on=left_on, right_on=col)
 
+        # Process 'lsh' rules: MinHash-LSH on character shingles, tuned by 'lsh_params'
+        lsh_rules = index_rules.get("lsh", {})
+        lsh_params = index_rules.get("lsh_params", {})
+        for left_on, right_on in lsh_rules.items():
+          for col in right_on:
+            indexer.add(minhash_lsh.lsh_index(left_on, col, **lsh_params))
+
         print(f"Blocks: {indexer.algorithms}.")
         return indexer
 
@@ -60,6 +75,8 @@ class RecordLinkage:
         Returns:
         recordlinkage.Compare: A recordlinkage comparator object.
         """
+        import recordlinkage as rl
+
         comparison = rl.Compare(n_jobs=n_jobs)
         compare_rules = self.matching_rules.get('compare', {})
 
@@ -189,6 +206,9 @@ class RecordLinkage:
 
         def recurse(data_dict):
             for key, value in data_dict.items():
+                # Parameters of an index rule, not columns
+                if key == "lsh_params":
+                    continue
                 # Use recursion to handle nested dictionaries
                 if isinstance(value, dict):
                     recurse(value)
@@ -0,0 +1,177 @@
+import os
+import threading
+import time
+
+from src import (account_sidecar, big_query, clean_business_name, data_tables, frame_store, geo_standardisation,
+                 query_scheduler)
+
+# Reference tables owned by a session
+REFERENCE_QUERIES = {
+    'stopwords': clean_business_name.STOPWORDS_QUERY,
+    'countries': clean_business_name.COUNTRIES_QUERY,
+    'geo_country': geo_standardisation.COUNTRY_QUERY,
+    'geo_state': geo_standardisation.STATE_QUERY,
+}
+
+
+class DataOpsSession:
+    """
+    One BigQuery client together with the reference data, cleaners and caches built on it.
+
+    Reference tables (stopwords, countries, geo countries and states) are fetched once,
+    concurrently, on first use and kept for the life of the session; with reference_dir they
+    are also kept on disk between sessions. The name cleaner, with its compiled stopword and
+    country patterns, and the geo standardiser are built once and handed to the loaders, so
+    repeated loader calls make no reference-data round trips.
+
+    Args:
+    client: A Google BigQuery client instance (or local_client.LocalClient).
+    cache (QueryCache, optional): On-disk result cache used by the loaders.
+    reference_dir (str, optional): Directory where reference tables are persisted as Feather.
+    reference_ttl (int, optional): Age in seconds after which persisted reference tables are
+        fetched again. None keeps them until refresh() is called.
+    max_in_flight (int): Maximum number of reference queries running at the same time.
+    name_cache (str or NameCache, optional): On-disk cache of cleaned names used by the
+        name cleaner.
+    legal_suffixes (str): How the name cleaner strips legal-entity suffixes, 'cleancorp' or
+        'native' (see CleanBusinessName).
+    sidecar (str or AccountSidecar, optional): Persisted cleaning results used by
+        sf_accts and load_all, so reloads only clean changed accounts.
+
+    Example:
+    session = DataOpsSession(client, reference_dir='/content/drive/MyDrive/reference')
+    df_sf_accts = session.sf_accts(filters={'Geo': 'EMEA'})
+    df_geo = session.geo._standardize_country(df_sf_accts, 'SF_BillingCountry')
+    """
+
+    def __init__(self, client, cache=None, reference_dir=None, reference_ttl=7 * 24 * 3600, max_in_flight=4,
+                 name_cache=None, legal_suffixes='cleancorp', sidecar=None):
+        self.client = client
+        self.cache = cache
+        self.reference_dir = reference_dir
+        self.reference_ttl = reference_ttl
+        self.max_in_flight = max_in_flight
+        self.name_cache = name_cache
+        self.legal_suffixes = legal_suffixes
+        self.sidecar = account_sidecar.AccountSidecar(sidecar) if isinstance(sidecar, str) else sidecar
+        self._reference = {}
+        self._name_cleaner = None
+        self._geo = None
+        self._lock = threading.RLock()
+
+    def _reference_path(self, name):
+        return os.path.join(self.reference_dir, f'{name}.feather')
+
+    def _read_persisted(self, name):
+        if self.reference_dir is None:
+            return None
+        path = self._reference_path(name)
+        if not os.path.exists(path):
+            return None
+        if self.reference_ttl is not None and time.time() - os.path.getmtime(path) > self.reference_ttl:
+            return None
+        return frame_store.read_frame(path)
+
+    def prefetch(self, names=None):
+        """
+        Load reference tables that are not loaded yet, from disk or concurrently from BigQuery.
+
+        Args:
+        names (list, optional): Names from REFERENCE_QUERIES. Defaults to all of them.
+        """
+        names = list(names or REFERENCE_QUERIES)
+        unknown = [name for name in names if name not in REFERENCE_QUERIES]
+        if unknown:
+            raise ValueError(f"Unknown reference tables: {unknown}")
+
+        with self._lock:
+            missing = {}
+            for name in names:
+                if name in self._reference:
+                    continue
+                df = self._read_persisted(name)
+                if df is not None:
+                    self._reference[name] = df
+                else:
+                    missing[name] = REFERENCE_QUERIES[name]
+            if not missing:
+                return
+
+            results = query_scheduler.execute_queries(self.client, missing, max_in_flight=self.max_in_flight)
+            for name, df in results.items():
+                self._reference[name] = df
+                if self.reference_dir is not None:
+                    frame_store.write_frame(df, self._reference_path(name))
+
+    def reference(self, name):
+        """Return a reference table, loading it on first use."""
+        self.prefetch([name])
+        return self._reference[name]
+
+    def refresh(self):
+        """Drop the loaded and persisted reference data and the objects built on it."""
+        with self._lock:
+            self._reference = {}
+            self._name_cleaner = None
+            self._geo = None
+            if self.reference_dir is not None:
+                for name in REFERENCE_QUERIES:
+                    if os.path.exists(self._reference_path(name)):
+                        os.remove(self._reference_path(name))
+
+    @property
+    def name_cleaner(self):
+        """CleanBusinessName with the session's stopwords and countries."""
+        with self._lock:
+            if self._name_cleaner is None:
+                self.prefetch(['stopwords', 'countries'])
+                self._name_cleaner = clean_business_name.CleanBusinessName(
+                    self.client,
+                    stopwords=self._reference['stopwords'].string_field_0,
+                    countries=self._reference['countries'].string_field_0,
+                    name_cache=self.name_cache,
+                    legal_suffixes=self.legal_suffixes,
+                )
+            return self._name_cleaner
+
+    @property
+    def geo(self):
+        """GeoStandardisation with the session's geo countries and states."""
+        with self._lock:
+            if self._geo is None:
+                self.prefetch(['geo_country', 'geo_state'])
+                self._geo = geo_standardisation.GeoStandardisation(
+                    self.client, df_country=self._reference['geo_country'], df_state=self._reference['geo_state'])
+            return self._geo
+
+    def execute_query(self, query, **kwargs):
+        """Run a query with the session client and cache, see big_query.execute_query."""
+        kwargs.setdefault('cache', self.cache)
+        return big_query.execute_query(self.client, query, **kwargs)
+
+    def sf_accts(self, **kwargs):
+        """Load Salesforce accounts with the session's name cleaner, see data_tables.sf_accts."""
+        kwargs.setdefault('cache', self.cache)
+        kwargs.setdefault('sidecar', self.sidecar)
+        return data_tables.sf_accts(self.client, name_cleaner=self.name_cleaner, **kwargs)
+
+    def sf_opps(self, **kwargs):
+        """Load Salesforce opportunities, see data_tables.sf_opps."""
+        kwargs.setdefault('cache', self.cache)
+        return data_tables.sf_opps(self.client, **kwargs)
+
+    def sf_campaigns(self, **kwargs):
+        """Load Salesforce campaigns, see data_tables.sf_campaigns."""
+        kwargs.setdefault('cache', self.cache)
+        return data_tables.sf_campaigns(self.client, **kwargs)
+
+    def sf_campaign_members(self, **kwargs):
+        """Load Salesforce campaign members, see data_tables.sf_campaign_members."""
+        kwargs.setdefault('cache', self.cache)
+        return data_tables.sf_campaign_members(self.client, **kwargs)
+
+    def load_all(self, **kwargs):
+        """Load the four Salesforce tables concurrently, see data_tables.load_all."""
+        kwargs.setdefault('cache', self.cache)
+        kwargs.setdefault('sidecar', self.sidecar)
+        return data_tables.load_all(self.client, name_cleaner=self.name_cleaner, **kwargs)
@@ -0,0 +1,215 @@
+import datetime
+import glob
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+
+from src import frame_store
+from src.query_cache import normalize_query, query_fingerprint
+
+MANIFEST = 'manifest.json'
+
+
+def code_version(source_dir=None):
+    """
+    Return a short hash of the source files of the src modules.
+
+    A snapshot built by different code than the running one is reported as stale.
+
+    Args:
+    source_dir (str, optional): Directory of the sources. Defaults to the src package.
+
+    Returns:
+    str: A 12 character hex digest.
+    """
+    source_dir = source_dir or os.path.dirname(os.path.abspath(__file__))
+    digest = hashlib.sha256()
+    for path in sorted(glob.glob(os.path.join(source_dir, '*.py'))):
+        digest.update(os.path.basename(path).encode('utf-8') + b'\x00')
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:12]
+
+
+class SnapshotStore:
+    """
+    Named snapshots of fully prepared DataFrames, reopened memory-mapped after a restart.
+
+    Each snapshot is an uncompressed Feather (Arrow IPC) file, listed in a JSON manifest with
+    the source query, the code version that built it, its row count and creation time. Loading
+    maps the file instead of reading it, so a restarted notebook is ready to analyze in the
+    time it takes to build the DataFrame wrappers, not to re-run the loaders and cleaning.
+    String columns come back as pd.ArrowDtype(pa.string()) over the mapped buffers; call
+    .astype(object) on the ones that need Python strings.
+
+    Args:
+    root (str): Directory holding the snapshot files and the manifest.
+    version (str, optional): Code version recorded with new snapshots and compared on load.
+        Defaults to code_version().
+
+    Example:
+    store = SnapshotStore('/content/drive/MyDrive/snapshots')
+    df_sf_accts = store.get_or_build('sf_accts', lambda: data_tables.sf_accts(client))
+    """
+
+    def __init__(self, root, version=None):
+        self.root = root
+        self.version = version or code_version()
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, name):
+        if not re.fullmatch(r'[\w.-]+', name):
+            raise ValueError(f"Invalid snapshot name: {name!r}")
+        return os.path.join(self.root, f'{name}.feather')
+
+    def _read_manifest(self):
+        path = os.path.join(self.root, MANIFEST)
+        if not os.path.exists(path):
+            return {}
+        with open(path) as f:
+            return json.load(f)
+
+    def _write_manifest(self, manifest):
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, os.path.join(self.root, MANIFEST))
+
+    def save(self, name, df, source_query=None, **metadata):
+        """
+        Persist a DataFrame as a named snapshot, replacing any previous one.
+
+        Args:
+        name (str): Snapshot name, e.g. 'sf_accts'.
+        df (pd.DataFrame): The prepared DataFrame.
+        source_query (str, optional): The query the frame was built from.
+        **metadata: Extra JSON-serializable values stored in the manifest entry.
+
+        Returns:
+        dict: The manifest entry.
+        """
+        path = self._path(name)
+        size = frame_store.write_frame(df, path)
+        entry = {
+            'file': os.path.basename(path),
+            'source_query': normalize_query(source_query) if source_query else None,
+            'query_fingerprint': query_fingerprint(source_query)[:16] if source_query else None,
+            'code_version': self.version,
+            'rows': len(df),
+            'columns': len(df.columns),
+            'bytes': size,
+            'created_at': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            'metadata': metadata,
+        }
+        with self._lock:
+            manifest = self._read_manifest()
+            manifest[name] = entry
+            self._write_manifest(manifest)
+        return entry
+
+    def entry(self, name):
+        """Return the manifest entry of a snapshot, or None if it does not exist."""
+        with self._lock:
+            entry = self._read_manifest().get(name)
+        if entry is None or not os.path.exists(self._path(name)):
+            return None
+        return entry
+
+    def stale_reasons(self, name, source_query=None, max_age=None):
+        """
+        Return why a snapshot no longer matches the running code or the requested query.
+
+        Args:
+        name (str): Snapshot name.
+        source_query (str, optional): Query the caller would build the frame from.
+        max_age (float, optional): Maximum age in seconds.
+
+        Returns:
+        list: Human-readable reasons, empty when the snapshot is current.
+        """
+        entry = self.entry(name)
+        if entry is None:
+            return ['missing']
+        reasons = []
+        if entry['code_version'] != self.version:
+            reasons.append(f"built by code version {entry['code_version']}, running {self.version}")
+        if source_query and entry['query_fingerprint'] != query_fingerprint(source_query)[:16]:
+            reasons.append('source query changed')
+        if max_age is not None:
+            age = time.time() - datetime.datetime.fromisoformat(entry['created_at']).timestamp()
+            if age > max_age:
+                reasons.append(f'{age / 3600:.1f} hours old')
+        return reasons
+
+    def load(self, name, columns=None, source_query=None, max_age=None):
+        """
+        Reopen a snapshot memory-mapped, with string columns backed by the mapped buffers.
+
+        A warning is printed when the snapshot is stale (see stale_reasons), but it is still
+        returned.
+
+        Args:
+        name (str): Snapshot name.
+        columns (list, optional): Subset of columns to read.
+        source_query (str, optional): Query the frame would be built from, checked against
+            the recorded one.
+        max_age (float, optional): Warn when the snapshot is older than this many seconds.
+
+        Returns:
+        pd.DataFrame: The snapshot, or None if it does not exist.
+        """
+        entry = self.entry(name)
+        if entry is None:
+            return None
+        reasons = self.stale_reasons(name, source_query, max_age)
+        if reasons:
+            print(f"Warning: snapshot '{name}' may be stale: {'; '.join(reasons)}.")
+        df = frame_store.read_frame(self._path(name), columns=columns, memory_map=True, arrow_strings=True)
+        if columns is None and len(df) != entry['rows']:
+            print(f"Warning: snapshot '{name}' has {len(df):,} rows, the manifest records {entry['rows']:,}.")
+        return df
+
+    def get_or_build(self, name, build, source_query=None, max_age=None, rebuild_stale=True):
+        """
+        Load a snapshot, or build and save it when it is missing (or stale).
+
+        Args:
+        name (str): Snapshot name.
+        build (callable): Returns the prepared DataFrame.
+        source_query (str, optional): Query the frame is built from.
+        max_age (float, optional): Maximum age in seconds.
+        rebuild_stale (bool): Rebuild a stale snapshot instead of loading it with a warning.
+
+        Returns:
+        pd.DataFrame: The snapshot.
+        """
+        reasons = self.stale_reasons(name, source_query, max_age)
+        if not reasons or (reasons != ['missing'] and not rebuild_stale):
+            return self.load(name, source_query=source_query, max_age=max_age)
+        if reasons != ['missing']:
+            print(f"Rebuilding snapshot '{name}': {'; '.join(reasons)}.")
+        df = build()
+        self.save(name, df, source_query=source_query)
+        return df
+
+    def delete(self, name):
+        """Remove a snapshot and its manifest entry."""
+        path = self._path(name)
+        with self._lock:
+            manifest = self._read_manifest()
+            manifest.pop(name, None)
+            self._write_manifest(manifest)
+            if os.path.exists(path):
+                os.remove(path)
+
+    def list(self):
+        """Return the manifest as a DataFrame, one row per snapshot."""
+        import pandas as pd
+        with self._lock:
+            manifest = self._read_manifest()
+        return pd.DataFrame.from_dict(manifest, orient='index')
@@ -8,36 +8,50 @@ Original file is located at
 """
 
 # @title Import Packages
+import importlib.util
+import os
 import re
 import pandas as pd
 import numpy as np
 from functools import reduce
-from pandas_gbq import to_gbq
 
-from io import StringIO
-from google.colab import auth, data_table, files
+from src import big_query
+
+# Heavy and notebook-only packages (pandas_gbq, google.colab, plotly, pdfplumber) are
+# imported inside the functions that use them, so importing this module stays fast and
+# works outside Colab.
+
+def in_colab():
+    """Return True when running in a Google Colab runtime."""
+    try:
+        return importlib.util.find_spec('google.colab') is not None
+    except ModuleNotFoundError:
+        return False
+
+def _require_colab(feature):
+    """Raise ImportError when a Colab-only helper is used outside Colab."""
+    if not in_colab():
+        raise ImportError(f"{feature} needs the Google Colab runtime (google.colab is not available).")
 
 # @title Big Query Functions
 
 # Function to execute a query and return the results as a DataFrame
-def execute_query(client, query):
+def execute_query(client, query, cache=None):
     """
     Execute a SQL query using Google BigQuery and return the results as a DataFrame.
 
     Args:
     query (str): The SQL query to be executed.
     client: A Google BigQuery client instance.
+    cache (QueryCache, optional): On-disk result cache, see big_query.execute_query.
 
     Returns:
     DataFrame: The query results as a DataFrame.
     """
-    query_job = client.query(query)
-    df = query_job.to_dataframe()
-    # Remove the index column
-    df.reset_index(drop=True, inplace=True)
-    return df
+    return big_query.execute_query(client, query, cache=cache)
 
 def df_to_bq(df, project, dataset, table):
+    from pandas_gbq import to_gbq
     to_gbq(df, f'{dataset}.{table}', project_id=project, if_exists='replace')
 
 # Create a BigQuery table from a DataFrame with auto-detected schema
@@ -57,6 +71,8 @@ def create_bigquery_table(df, project_id, dataset_id, table_id):
     Example:
         create_bigquery_table_auto_detect(df, 'your-project-id', 'your-dataset-id', 'your-table-id')
     """
+    from google.cloud import bigquery
+
     client = bigquery.Client(project=project_id)
     table_ref = client.dataset(dataset_id).table(table_id)
     job_config = bigquery.LoadJobConfig(
@@ -66,31 +82,27 @@ def create_bigquery_table(df, project_id, dataset_id, table_id):
     job.result()
     print(f'Table {project_id}.{dataset_id}.{table_id} created from the DataFrame with auto-detected schema.')
 
-def read_csv_from_gcs(gcs_bucket, file_path):
+def read_csv_from_gcs(gcs_bucket, file_path, chunksize=None, dtype=None, usecols=None, client=None):
     """
-    Read a CSV file from Google Cloud Storage (GCS) and load it into a Pandas DataFrame.
+    Read a CSV file from Google Cloud Storage (GCS) as a stream, see big_query.read_csv_from_gcs.
 
     Args:
         gcs_bucket (str): The name of the GCS bucket.
         file_path (str): The path to the CSV file in GCS.
+        chunksize (int, optional): Yield DataFrames of this many rows instead.
+        dtype (dict, optional): Column types.
+        usecols (list, optional): Columns to read.
+        client (optional): A storage client, storage.Client() by default.
 
     Returns:
         pd.DataFrame: A Pandas DataFrame containing the CSV data.
     """
-    # Download the CSV file from GCS
-    client = storage.Client()
-    bucket = client.get_bucket(gcs_bucket)
-    blob = storage.Blob(file_path, bucket)
-    content = blob.download_as_text()
-
-    # Create a DataFrame from the CSV data
-    df = pd.read_csv(StringIO(content))
-
-    return df
+    return big_query.read_csv_from_gcs(gcs_bucket, file_path, chunksize=chunksize, dtype=dtype, usecols=usecols,
+                                       client=client)
 
 def bigquery_schema(df):
     """
-    Generate a BigQuery schema based on the DataFrame's data types.
+    Generate a BigQuery schema based on the DataFrame's data types, see big_query.bigquery_schema.
 
     Args:
         df (pandas.DataFrame): The DataFrame for which the schema is generated.
@@ -98,17 +110,7 @@ def bigquery_schema(df):
     Returns:
         list: A list of dictionaries representing the BigQuery schema with 'name' and 'type' keys.
     """
-    dtype_mapping = {
-        'object': 'STRING',
-        'int64': 'INTEGER',
-        'float64': 'FLOAT',
-        'bool': 'BOOL',
-        'datetime64[ns]': 'TIMESTAMP'
-    }
-
-    schema = [{'name': col_name, 'type': dtype_mapping.get(str(col_type), 'UNKNOWN')} for col_name, col_type in df.dtypes.items()]
-
-    return schema
+    return big_query.bigquery_schema(df)
 
 # Function to download a DataFrame as a CSV file
 def download(df, fileName):
@@ -122,6 +124,9 @@ def download(df, fileName):
     Returns:
     None
     """
+    _require_colab('download')
+    from google.colab import files
+
     if df is not None:
       fileName = f'{fileName}.csv'
       filepath = "/content/drive/MyDrive/Colab Downloads/"
@@ -278,6 +283,9 @@ def df_description(df, text, columns):
             print(f'\t Unsupported operation "{op}" for column {col}')
 
 def datatable(df):
+    _require_colab('datatable')
+    from google.colab import data_table
+
     df = fillna_custom(df)
     return data_table.DataTable(df)
 
@@ -438,6 +446,136 @@ def convert_dbdates_to_datetime(df):
             df[date_column] = pd.to_datetime(df[date_column], errors='coerce')
     return df
 
+def concat_frames(frames):
+    """
+    Concatenate DataFrames row-wise, keeping category columns as category.
+
+    pd.concat falls back to object dtype when category columns have different categories,
+    so every category column is first recast to the union of the categories of all frames.
+
+    Args:
+    frames (list): The DataFrames to concatenate.
+
+    Returns:
+    pd.DataFrame: The concatenated DataFrame.
+    """
+    frames = list(frames)
+    category_cols = [col for col in dict.fromkeys(col for df in frames for col in df.columns)
+                     if any(col in df.columns and isinstance(df[col].dtype, pd.CategoricalDtype) for df in frames)]
+
+    if category_cols:
+        dtypes = {}
+        for col in category_cols:
+            categories = None
+            for df in frames:
+                if col in df.columns:
+                    col_categories = df[col].astype('category').cat.categories
+                    categories = col_categories if categories is None else categories.union(col_categories)
+            dtypes[col] = pd.CategoricalDtype(categories)
+
+        frames = [df.astype({col: dtype for col, dtype in dtypes.items() if col in df.columns}) for df in frames]
+
+    return pd.concat(frames)
+
+def _narrowest_int_dtype(s, nullable):
+    """Return the narrowest integer dtype that holds every value of an integer Series."""
+    if s.count() == 0:
+        return None
+    low, high = s.min(), s.max()
+    for dtype in (np.int8, np.int16, np.int32):
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            name = np.dtype(dtype).name
+            return name.capitalize() if nullable else name
+    return None
+
+def _sparse_fill_value(s, sparse_ratio):
+    """Return the most common value of a flag Series without nulls if it covers sparse_ratio of the rows."""
+    if sparse_ratio is None or not s.notna().all():
+        return None
+    counts = s.value_counts()
+    if counts.iloc[0] / len(s) < sparse_ratio:
+        return None
+    return counts.index[0]
+
+def optimize_memory(df, report=False, category_ratio=0.5, sparse_ratio=0.95, pyarrow_strings=True):
+    """
+    Convert every column of a DataFrame to the narrowest representation that keeps its values.
+
+    - Text columns with few distinct values (at most category_ratio of the rows) become
+      category, other text columns pyarrow-backed strings.
+    - Integers are downcast to the smallest integer type holding their range, floats to
+      float32 when no value changes.
+    - Flags, boolean or integer columns with at most two values such as 0/1 HasResponded,
+      become sparse when their most common value covers sparse_ratio of the rows.
+
+    Columns that mix strings with other objects are left as they are.
+
+    Args:
+    df (pd.DataFrame): The DataFrame to optimize.
+    report (bool): Also return the bytes per column before and after.
+    category_ratio (float): Maximum distinct-to-rows ratio for a text column to become category.
+    sparse_ratio (float, optional): Minimum share of the most common value for a flag to become
+        sparse. None disables sparse flags.
+    pyarrow_strings (bool): Store the remaining text columns as pyarrow strings.
+
+    Returns:
+    pd.DataFrame: The optimized DataFrame, or (DataFrame, report DataFrame) when report is True.
+
+    Example:
+    df_sf_accts, report = optimize_memory(df_sf_accts, report=True)
+    """
+    before = df.memory_usage(deep=True, index=False)
+    dtypes_before = df.dtypes
+    df = df.copy()
+    rows = len(df)
+
+    for col in df.columns:
+        s = df[col]
+        dtype = s.dtype
+        if isinstance(dtype, (pd.CategoricalDtype, pd.SparseDtype)) or rows == 0:
+            continue
+        if pd.api.types.is_bool_dtype(dtype):
+            fill_value = _sparse_fill_value(s, sparse_ratio)
+            if fill_value is not None:
+                df[col] = s.astype(bool).astype(pd.SparseDtype(bool, bool(fill_value)))
+        elif pd.api.types.is_integer_dtype(dtype):
+            narrow = _narrowest_int_dtype(s, isinstance(dtype, pd.api.extensions.ExtensionDtype))
+            fill_value = _sparse_fill_value(s, sparse_ratio) if s.nunique() <= 2 else None
+            if fill_value is not None:
+                narrow = np.dtype((narrow or 'int64').lower())
+                df[col] = s.astype(narrow).astype(pd.SparseDtype(narrow, narrow.type(fill_value)))
+            elif narrow is not None:
+                df[col] = s.astype(narrow)
+        elif pd.api.types.is_float_dtype(dtype) and dtype == np.float64:
+            narrow = s.astype(np.float32)
+            if ((narrow.astype(np.float64) == s) | s.isna()).all():
+                df[col] = narrow
+        elif dtype == object or pd.api.types.is_string_dtype(dtype):
+            values = s.dropna()
+            if dtype == object and not values.map(type).eq(str).all():
+                continue
+            if s.nunique() <= category_ratio * rows:
+                candidate = s.astype('category')
+                if candidate.memory_usage(deep=True, index=False) < s.memory_usage(deep=True, index=False):
+                    df[col] = candidate
+            elif dtype == object and pyarrow_strings:
+                df[col] = s.astype('string[pyarrow]')
+
+    if not report:
+        return df
+
+    after = df.memory_usage(deep=True, index=False)
+    df_report = pd.DataFrame({
+        'dtype_before': dtypes_before.astype(str),
+        'dtype_after': df.dtypes.astype(str),
+        'bytes_before': before,
+        'bytes_after': after,
+    })
+    df_report['saved_pct'] = (1 - df_report['bytes_after'] / df_report['bytes_before'].where(df_report['bytes_before'] > 0)) * 100
+    df_report.loc['Total'] = ['', '', before.sum(), after.sum(), (1 - after.sum() / before.sum()) * 100 if before.sum() else 0]
+    return df, df_report
+
 def add_suffix_to_duplicates_and_rename(df):
     """
     Add a suffix to duplicate column names in a DataFrame and return the renamed DataFrame.
@@ -1288,39 +1426,164 @@ def get_top_campaigns_by_stage_group(df, out_column, stages, top=5):
     df_campaigns_by_stages.fillna('', inplace=True)
     return df_campaigns_by_stages
 
-def clean_website_domain(url):
+# Public suffix list (https://publicsuffix.org) bundled for offline registrable-domain lookups
+PUBLIC_SUFFIX_LIST = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'public_suffix_list.dat')
+
+# Parsed public suffix rules, keyed by include_private
+_public_suffixes = {}
+
+
+def _idna(host):
+    """Return the ASCII (punycode) form of a host name, or the host itself if it is not valid IDNA."""
+    try:
+        return host.encode('idna').decode('ascii')
+    except UnicodeError:
+        return host
+
+
+def public_suffix_rules(include_private=False, path=None):
     """
-    Clean and extract the website and domain from a URL using vectorized operations.
+    Load the rules of the bundled public suffix list.
 
     Args:
-    url (str): A single URL to be cleaned and processed.
+    include_private (bool): Also use the PRIVATE section (e.g. github.io, blogspot.com), so
+        sites hosted under them are their own registrable domains.
+    path (str, optional): Another copy of the list. Defaults to PUBLIC_SUFFIX_LIST.
 
     Returns:
-    tuple: A tuple containing two strings - the cleaned website and the extracted domain.
+    dict: 'rules', 'wildcards' and 'exceptions' as sets of ASCII suffixes, 'parents', the
+        suffixes that longer rules extend (e.g. 'uk' for 'co.uk'), and 'max_labels', the
+        largest number of labels in a rule.
+    """
+    key = (include_private, path)
+    if key not in _public_suffixes:
+        rules, wildcards, exceptions = set(), set(), set()
+        with open(path or PUBLIC_SUFFIX_LIST, encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line.startswith('// ===BEGIN PRIVATE DOMAINS===') and not include_private:
+                    break
+                if not line or line.startswith('//'):
+                    continue
+                rule = _idna(line.split()[0].lower())
+                if rule.startswith('!'):
+                    exceptions.add(rule[1:])
+                elif rule.startswith('*.'):
+                    wildcards.add(rule[2:])
+                else:
+                    rules.add(rule)
+        parents = set()
+        for rule in rules | exceptions | {f'*.{rule}' for rule in wildcards}:
+            labels = rule.split('.')
+            parents.update('.'.join(labels[i:]) for i in range(1, len(labels)))
+        max_labels = max(rule.count('.') + 1 for rule in rules | exceptions | {f'*.{rule}' for rule in wildcards})
+        _public_suffixes[key] = {'rules': rules, 'wildcards': wildcards, 'exceptions': exceptions,
+                                 'parents': parents, 'max_labels': max_labels}
+    return _public_suffixes[key]
+
+
+# Scheme ('<scheme>://' before the first slash), leading slashes and user info, then the host
+# up to the port, path, query or fragment
+_URL_HOST = re.compile(r'(?:[^/]*://)?/*(?:[^/?#\\]*@)?([^/?#\\:]*)')
+_IPV4 = re.compile(r'[0-9]+(?:\.[0-9]+){3}')
+
+
+def _registrable_domain(host, psl):
+    """
+    Return the registrable domain (public suffix plus one label) of a host, or None when the
+    host is itself a public suffix.
+
+    Labels are matched from the right, only while the suffix so far has longer rules under it
+    (e.g. 'uk', not 'com'). Unlisted TLDs are public suffixes ('*' rule), longer rules win and
+    exceptions win over all.
+    """
+    dot = host.rfind('.')
+    if host[dot + 1:] not in psl['parents'] and host[dot + 1:] not in psl['wildcards']:
+        # Most TLDs (e.g. 'com') have no longer rules under them
+        return host[host.rfind('.', 0, dot) + 1:] if dot >= 0 else None
+    labels = host.split('.')
+    depth = min(len(labels), psl['max_labels'])
+    suffix, exception, k, tail = 1, 0, 1, labels[-1]
+    while k < depth and (tail in psl['parents'] or tail in psl['wildcards']):
+        k += 1
+        parent, tail = tail, f'{labels[-k]}.{tail}'
+        if tail in psl['rules'] or parent in psl['wildcards']:
+            suffix = k
+        if tail in psl['exceptions']:
+            exception = k - 1
+    suffix = exception or suffix
+    return '.'.join(labels[-suffix - 1:]) if len(labels) > suffix else None
+
+
+def _clean_url(url, psl):
+    """Return the cleaned website and registrable domain of one URL, see clean_website_domain_series."""
+    host = _URL_HOST.match(url.strip().lower()).group(1)
+    while host.startswith(('www.', '.')) or host.endswith('.'):
+        start = 4 if len(host) > 4 and host.startswith('www.') else int(host.startswith('.'))
+        stripped = host[start:len(host) - host.endswith('.')]
+        if stripped == host:
+            break
+        host = stripped
+    if not host:
+        return None, None
+    if not host.isascii():
+        host = _idna(host)
+    if host[-1].isdigit() and _IPV4.fullmatch(host):
+        return host, host
+    return 'www.' + host, _registrable_domain(host, psl)
+
+
+def clean_website_domain_series(urls, include_private=False):
     """
-    if url:
-        # Define a regex pattern to match common URL prefixes and ports
-        pattern = r'^((?:https?://)?(?:www\.)?)|(?:\:\d{2,5})'
+    Clean a column of URLs into websites and registrable domains.
 
-        # Use regex-based replacement to clean the URL
-        cleaned_url = re.sub(pattern, '', url.strip())
+    The scheme, user info, port, path, query and fragment are removed, the host is lower-cased,
+    leading 'www.' labels and surrounding dots are dropped, and non-ASCII hosts are converted
+    to IDNA (punycode). The domain is the registrable domain of the host according to the
+    bundled public suffix list, so 'https://shop.acme.co.uk:8080/x' gives the website
+    'www.shop.acme.co.uk' and the domain 'acme.co.uk'. IPv4 addresses are their own domain
+    and website. Empty URLs, and hosts that are a public suffix, give missing values.
 
-        # Split the cleaned URL into website and domain parts
-        parts = cleaned_url.split('/', 1)
+    Each distinct URL is cleaned once and the results are mapped back through the factorized
+    codes, so the cost follows the number of distinct URLs (about 4 microseconds each). On 1M
+    URLs (benchmarks/website_domains.py) that is about 5x faster than the former per-row
+    regex when they repeat 100k sites, and about as fast as it (0.9x) when all are distinct.
 
-        # Extract website and domain
-        website = parts[0]
+    Args:
+    urls (pd.Series): The URLs.
+    include_private (bool): Use the PRIVATE section of the public suffix list as well, see
+        public_suffix_rules.
 
-        if not website.startswith('www.'):
-            domain = website
-            website = 'www.' + website
-        else:
-          domain = website.split('www.')
+    Returns:
+    tuple: Two object Series aligned with urls, the cleaned websites and the domains, with
+        None where missing.
 
-        return website, domain
+    Example:
+    df['WebsiteClean'], df['DomainClean'] = clean_website_domain_series(df['Website'])
+    """
+    psl = public_suffix_rules(include_private)
+    codes, uniques = pd.factorize(urls)
+    pairs = [_clean_url(url, psl) if isinstance(url, str) else (None, None) for url in uniques.tolist()]
+    websites = np.array([website for website, _ in pairs] + [None], dtype=object)
+    domains = np.array([domain for _, domain in pairs] + [None], dtype=object)
+    return (pd.Series(websites[codes], index=urls.index, name=urls.name, dtype=object),
+            pd.Series(domains[codes], index=urls.index, name=urls.name, dtype=object))
 
-    else:
+
+def clean_website_domain(url):
+    """
+    Clean and extract the website and domain from a single URL.
+
+    Args:
+    url (str): A single URL to be cleaned and processed.
+
+    Returns:
+    tuple: The cleaned website and the registrable domain as strings (None when missing),
+        see clean_website_domain_series.
+    """
+    if not isinstance(url, str) or not url:
         return None, None
+    return _clean_url(url, public_suffix_rules())
 
 def fix_job_level(df, column_name, replace):
     job_levels = ['C-Level', 'Director', 'Manager', 'SVP', 'VP']
@@ -1934,6 +2197,9 @@ def create_bar_plot(df, title):
     Returns:
         None
     """
+    import plotly.graph_objects as go
+    import plotly.io as pio
+
     # Transpose the DataFrame for easier plotting
     df = df.transpose()
 
@@ -1959,6 +2225,8 @@ def create_bar_plot(df, title):
 # @title PDF Tables
 
 def extract_tables_from_pdf(file_path):
+    import pdfplumber
+
     dfs = []
     with pdfplumber.open(file_path) as pdf:
         for i, page in enumerate(pdf.pages):
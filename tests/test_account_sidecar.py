@@ -0,0 +1,61 @@
+import pandas as pd
+import pytest
+
+from src import frame_store, utilities as utils
+from src.account_sidecar import AccountSidecar
+
+
+class UpperNames:
+    """Stands in for CleanBusinessName: upper-cases names the way clean_names maps them."""
+
+    rules_version = '1'
+
+    def clean_names(self, names):
+        return pd.Series(names.to_numpy(dtype=object), index=names.index, dtype=object).map(
+            lambda name: name.upper() if isinstance(name, str) else name).infer_objects()
+
+
+def _accounts(websites, names=None):
+    return pd.DataFrame({'AccountId': [f'001{i}' for i in range(len(websites))],
+                         'AccountName': names or [f'Acme {i}' for i in range(len(websites))],
+                         'Website': websites})
+
+
+@pytest.mark.parametrize('website', [None, '', 'co.uk'])
+def test_apply_clears_stale_website_values(tmp_path, website):
+    sidecar = AccountSidecar(str(tmp_path / 'accts.feather'))
+    sidecar.apply(_accounts(['https://shop.acme.co.uk/x', 'beta.com']), UpperNames())
+
+    df = sidecar.apply(_accounts([website, 'beta.com']), UpperNames())
+
+    expected_website = 'www.co.uk' if website == 'co.uk' else None
+    assert df['WebsiteClean'].tolist() == [expected_website, 'www.beta.com']
+    assert df['DomainClean'].tolist() == [None, 'beta.com']
+    assert sidecar.stats['Website'] == {'reused': 1, 'cleaned': 1}
+    stored = frame_store.read_frame(sidecar.path)
+    assert pd.isna(stored.loc['0010', 'DomainClean'])
+    assert stored.loc['0011', 'DomainClean'] == 'beta.com'
+
+
+def test_apply_keeps_accounts_outside_the_load(tmp_path):
+    sidecar = AccountSidecar(str(tmp_path / 'accts.feather'))
+    sidecar.apply(_accounts(['acme.com', 'beta.com']), UpperNames())
+
+    sidecar.apply(_accounts(['gamma.de']), UpperNames())
+
+    stored = frame_store.read_frame(sidecar.path)
+    assert stored['DomainClean'].to_dict() == {'0010': 'gamma.de', '0011': 'beta.com'}
+    assert stored['AccountNameClean'].to_dict() == {'0010': 'ACME 0', '0011': 'ACME 1'}
+
+
+def test_apply_dtypes_match_cleaning_without_sidecar(tmp_path):
+    accounts = _accounts(['acme.com', None, 'co.uk'], names=['Acme', None, 'Beta'])
+    expected = accounts.copy()
+    expected['WebsiteClean'], expected['DomainClean'] = utils.clean_website_domain_series(expected['Website'])
+    expected['AccountNameClean'] = UpperNames().clean_names(expected['AccountName'])
+    sidecar = AccountSidecar(str(tmp_path / 'accts.feather'))
+
+    for _ in range(2):
+        df = sidecar.apply(accounts.copy(), UpperNames())
+        pd.testing.assert_frame_equal(df[expected.columns], expected)
+    assert sidecar.stats['AccountName'] == {'reused': 3, 'cleaned': 0}
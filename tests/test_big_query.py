@@ -0,0 +1,261 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import big_query as bq
+
+
+def test_sql_literal_numpy_scalars():
+    assert bq.sql_literal(np.int64(7)) == '7'
+    assert bq.sql_literal(np.float64(1.5)) == '1.5'
+    assert bq.sql_literal(np.bool_(True)) == 'TRUE'
+    assert bq.sql_literal(np.str_("O'Brien")) == "'O\\'Brien'"
+    assert bq.sql_literal(np.datetime64('2024-01-02T03:04:05')) == "'2024-01-02 03:04:05'"
+
+
+@pytest.mark.parametrize('value', [float('nan'), np.float64('nan'), np.inf, -np.inf])
+def test_sql_literal_rejects_nan_and_inf(value):
+    with pytest.raises(ValueError):
+        bq.sql_literal(value)
+
+
+def test_compile_filters_numpy_values():
+    df = pd.DataFrame({'SIC': [1, 2, 2], 'Closed': [True, False, True]})
+    select = {'SIC': 'aoa.SIC_Code', 'Closed': 'aoa.IsClosed', 'CreatedDate': 'CAST(aoa.CreatedDate AS DATETIME)'}
+    filters = {
+        'SIC': list(df['SIC'].unique()),
+        'Closed': df['Closed'].iloc[0],
+        'CreatedDate': (pd.Timestamp('2024-01-01'), datetime.date(2024, 2, 1)),
+    }
+
+    assert bq.compile_filters(filters, select) == [
+        'aoa.SIC_Code IN (1, 2)',
+        'aoa.IsClosed = TRUE',
+        "aoa.CreatedDate >= '2024-01-01 00:00:00'",
+        "aoa.CreatedDate < '2024-02-01'",
+    ]
+
+
+def test_parquet_chunk_matches_schema_by_name():
+    import pyarrow.parquet as pq
+
+    df = pd.DataFrame({'Name': ['a', 'b'], 'CreatedAt': pd.to_datetime(['2024-01-01', '2024-01-02']), 'Count': [1, 2]})
+    schema = [{'name': 'Count', 'type': 'INTEGER'}, {'name': 'CreatedAt', 'type': 'TIMESTAMP'},
+              {'name': 'Name', 'type': 'STRING'}]
+
+    table = pq.read_table(bq._parquet_chunk(df, schema, 'snappy'))
+
+    assert table.column_names == ['Count', 'CreatedAt', 'Name']
+    assert table.column('Name').to_pylist() == ['a', 'b']
+    assert str(table.schema.field('CreatedAt').type) == 'timestamp[us, tz=UTC]'
+    assert table.column('Count').to_pylist() == [1, 2]
+
+
+def _write_gcs_csv(root, text, name='export.csv'):
+    import gzip
+
+    (root / 'bucket').mkdir()
+    data = text.encode()
+    (root / 'bucket' / name).write_bytes(gzip.compress(data) if name.endswith('.gz') else data)
+
+
+@pytest.mark.parametrize('name', ['export.csv', 'export.csv.gz'])
+def test_read_csv_from_gcs_keeps_dates_as_strings(tmp_path, name):
+    from src.local_client import LocalStorageClient
+
+    _write_gcs_csv(tmp_path, 'Id,Created,At,Amount\n1,2024-01-02,2024-01-02 03:04:05,1.5\n2,2024-02-03,,2\n', name)
+    client = LocalStorageClient(str(tmp_path))
+
+    df = bq.read_csv_from_gcs('bucket', name, client=client)
+    assert df['Created'].tolist() == ['2024-01-02', '2024-02-03']
+    assert df['At'].iloc[0] == '2024-01-02 03:04:05'
+    assert df['Amount'].dtype == 'float64'
+
+    df = bq.read_csv_from_gcs('bucket', name, client=client, dtype={'Created': 'datetime64[ns]'})
+    assert df['Created'].dtype == 'datetime64[ns]'
+
+
+def test_read_csv_from_gcs_closes_partially_read_chunks(tmp_path, monkeypatch):
+    from src.local_client import LocalStorageClient
+
+    _write_gcs_csv(tmp_path, 'Id,Created\n' + ''.join(f'{i},2024-01-02\n' for i in range(100)))
+    streams = []
+    open_csv_stream = bq._open_csv_stream
+
+    def tracking_open(*args):
+        streams.append(open_csv_stream(*args))
+        return streams[-1]
+
+    monkeypatch.setattr(bq, '_open_csv_stream', tracking_open)
+    chunks = bq.read_csv_from_gcs('bucket', 'export.csv', chunksize=10, client=LocalStorageClient(str(tmp_path)))
+    assert next(chunks)['Created'].iloc[0] == '2024-01-02'
+    chunks.close()
+
+    assert streams and all(stream.closed for stream in streams)
+
+
+def test_read_csv_from_gcs_column_turning_to_text_after_first_block(tmp_path):
+    from src.local_client import LocalStorageClient
+
+    rows = [f'{i},{10000 + i},{i}.5\n' for i in range(5000)] + ['5000,AB12 3CD,1.5\n']
+    _write_gcs_csv(tmp_path, 'Id,Postcode,Score\n' + ''.join(rows))
+    client = LocalStorageClient(str(tmp_path))
+
+    df = bq.read_csv_from_gcs('bucket', 'export.csv', client=client, block_size=4096)
+    assert df['Postcode'].iloc[0] == '10000'
+    assert df['Postcode'].iloc[-1] == 'AB12 3CD'
+    assert df['Id'].dtype == 'int64'
+
+    chunks = list(bq.read_csv_from_gcs('bucket', 'export.csv', chunksize=1000, client=client, block_size=4096))
+    df = pd.concat(chunks)
+    assert len(df) == 5001 and df.index.equals(pd.RangeIndex(5001))
+    assert chunks[0]['Postcode'].dtype == 'int64'
+    assert chunks[-1]['Postcode'].iloc[-1] == 'AB12 3CD'
+    assert all(chunk['Id'].dtype == 'int64' and chunk['Score'].dtype == 'float64' for chunk in chunks)
+
+
+@pytest.fixture
+def local_client():
+    from src.local_client import LocalClient
+
+    client = LocalClient()
+    client.register('Ops.Account', pd.DataFrame({
+        'Id': [f'A{i:03d}' for i in range(100)],
+        'Employees': [i if i % 10 else None for i in range(100)],
+        'IsClosed': [i % 3 == 0 for i in range(100)],
+        'Country': ['DE', 'FR', 'US', 'US'] * 25,
+        'CreatedDate': pd.date_range('2024-01-01', periods=100, freq='D'),
+    }))
+    return client
+
+
+def test_execute_query_storage_fetch_matches_default(local_client, tmp_path):
+    from src import query_stats
+    from src.local_client import LocalReadClient
+
+    stats = query_stats.QueryStats()
+    query = 'SELECT * FROM `local.Ops.Account`'
+    expected = bq.execute_query(local_client, query, stats=stats).sort_values('Id', ignore_index=True)
+
+    df = bq.execute_query(local_client, query, stats=stats, fetch='storage', max_streams=4,
+                          read_client=LocalReadClient(local_client, str(tmp_path)))
+
+    pd.testing.assert_frame_equal(df.sort_values('Id', ignore_index=True), expected)
+    record = stats.records[-1]
+    assert record['fetch'] == 'storage' and record['rows'] == 100
+    assert len(record['streams']) == 4 and sum(stream['rows'] for stream in record['streams']) == 100
+
+
+def test_execute_query_storage_fetch_keeps_final_order_by_in_one_stream(local_client, tmp_path):
+    from src import query_stats
+    from src.local_client import LocalReadClient
+
+    stats = query_stats.QueryStats()
+    df = bq.execute_query(local_client, 'SELECT Id FROM `local.Ops.Account` ORDER BY Id DESC', stats=stats,
+                          fetch='storage', read_client=LocalReadClient(local_client, str(tmp_path)))
+
+    assert df['Id'].tolist() == [f'A{i:03d}' for i in reversed(range(100))]
+    assert len(stats.records[-1]['streams']) == 1
+
+
+@pytest.mark.parametrize('expr', ['Id', 'Employees'])
+def test_hash_shards_cover_every_row_once(local_client, expr):
+    from src import query_stats
+
+    query = 'SELECT Id FROM `local.Ops.Account`'
+    queries = [f'{query} WHERE {condition}' for condition in bq.hash_shards(expr, 4)]
+
+    df = bq.execute_sharded(local_client, queries)
+
+    assert sorted(df['Id']) == sorted(bq.execute_query(local_client, query, stats=query_stats.QueryStats())['Id'])
+
+
+def test_range_shards_cover_every_row_once(local_client):
+    from src import query_stats
+
+    local_client.register('Ops.Lead', pd.DataFrame({
+        'Id': [f'L{i:03d}' for i in range(100)],
+        'Country': ['DE', 'FR', 'US', 'US'] * 25,
+        'CreatedDate': [None if i % 7 == 0 else pd.Timestamp('2024-01-01') + pd.Timedelta(hours=5 * i)
+                        for i in range(100)],
+    }))
+    where = "Country = 'US'"
+    conditions = bq.range_shards(local_client, 'CreatedDate', 4, '`local.Ops.Lead`', where=where)
+    queries = [f'SELECT Id FROM `local.Ops.Lead` WHERE {where} AND {condition}' for condition in conditions]
+
+    df = bq.execute_sharded(local_client, queries)
+
+    assert len(conditions) == 4
+    expected = bq.execute_query(local_client, f'SELECT Id FROM `local.Ops.Lead` WHERE {where}',
+                                stats=query_stats.QueryStats())
+    assert sorted(df['Id']) == sorted(expected['Id']) and len(expected) == 50
+
+
+@pytest.mark.parametrize('query, expected', [
+    ('SELECT Id FROM t ORDER BY Id', True),
+    ('SELECT Id FROM t\norder  by Id DESC', True),
+    ('SELECT Id, ROW_NUMBER() OVER (PARTITION BY Country ORDER BY Id) AS n FROM t', False),
+    ('SELECT * FROM (SELECT Id FROM t ORDER BY Id LIMIT 5)', False),
+    ('SELECT Id FROM t', False),
+])
+def test_has_final_order_by(query, expected):
+    assert bq._has_final_order_by(query) is expected
+
+
+def test_execute_query_storage_fetch_empty_result(local_client, tmp_path):
+    from src import query_stats
+    from src.local_client import LocalReadClient
+
+    stats = query_stats.QueryStats()
+    df = bq.execute_query(local_client, "SELECT Id, Employees FROM `local.Ops.Account` WHERE Id = 'none'",
+                          stats=stats, fetch='storage', read_client=LocalReadClient(local_client, str(tmp_path)))
+
+    assert len(df) == 0 and list(df.columns) == ['Id', 'Employees']
+    assert stats.records[-1]['streams'] == [] and stats.records[-1]['rows'] == 0
+
+
+def test_arrow_to_dataframe_dtypes():
+    import pyarrow as pa
+
+    table = pa.table({
+        'Employees': pa.array([1, None, 3], pa.int64()),
+        'Revenue': pa.array(['1.5', None, '2'], pa.string()),
+        'IsClosed': pa.array([True, None, False]),
+        'Country': pa.array(['US', 'DE', 'US']),
+        'Created': pa.array(['2024-01-02', '2024-01-03', None]),
+        'Seats': pa.array([1.0, float('nan'), 2.7]),
+    })
+    schema = {'int': ['Seats'], 'float': ['Revenue'], 'category': ['Country'], 'datetime': ['Created']}
+
+    df = bq.arrow_to_dataframe(table, schema)
+
+    assert list(df.columns) == table.column_names
+    assert str(df['Employees'].dtype) == 'Int64'
+    assert str(df['IsClosed'].dtype) == 'boolean'
+    assert df['Seats'].dtype == 'int64' and df['Seats'].tolist() == [1, 0, 2]
+    assert df['Revenue'].dtype == 'float64'
+    assert df['Country'].dtype == 'category' and list(df['Country'].cat.categories) == ['DE', 'US']
+    assert df['Created'].dtype == 'datetime64[ns]' and pd.isna(df['Created'].iloc[2])
+
+
+def test_execute_query_iter_refuses_queries_over_the_byte_budget(local_client, monkeypatch):
+    from src import query_stats
+
+    submitted = []
+    query_local = local_client.query
+    monkeypatch.setattr(local_client, 'query', lambda query, **kwargs: submitted.append(query) or query_local(query))
+    monkeypatch.setattr(bq, 'estimate_bytes', lambda client, query: 5_000)
+    query = 'SELECT Id FROM `local.Ops.Account`'
+
+    stats = query_stats.QueryStats(max_bytes=1_000)
+    with pytest.raises(query_stats.QueryBudgetError):
+        next(bq.execute_query_iter(local_client, query, chunk_rows=10, stats=stats))
+    assert submitted == []
+    assert stats.records[-1]['estimated_bytes'] == 5_000 and 'QueryBudgetError' in stats.records[-1]['error']
+
+    stats = query_stats.QueryStats(max_bytes=10_000)
+    chunks = list(bq.execute_query_iter(local_client, query, chunk_rows=10, stats=stats))
+    assert sum(len(chunk) for chunk in chunks) == 100 and submitted == [query]
+    assert stats.records[-1]['estimated_bytes'] == 5_000
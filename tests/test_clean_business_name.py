@@ -0,0 +1,39 @@
+import pandas as pd
+import pytest
+
+from benchmarks.clean_names_golden import COUNTRIES, STOPWORDS, corpus
+from src.clean_business_name import CleanBusinessName
+
+
+@pytest.mark.parametrize('ascii_only', [False, True])
+def test_vectorized_matches_per_row_byte_for_byte(ascii_only):
+    names = list(dict.fromkeys(corpus(20_000, ascii_only=ascii_only)))
+    per_row, vectorized = (CleanBusinessName(None, stopwords=STOPWORDS, countries=COUNTRIES, memo_size=0,
+                                             vectorized=flag, legal_suffixes='native') for flag in (False, True))
+
+    expected = per_row._clean_values(names)
+    actual = vectorized._clean_values(names)
+
+    assert len(actual) == len(names)
+    assert list(actual) == list(expected)
+
+
+def test_name_cache_is_invalidated_when_the_rules_change(tmp_path, monkeypatch):
+    path = str(tmp_path / 'names.sqlite')
+    names = pd.Series(['Acme Group Inc', 'The Blue River Company', None])
+
+    def cleaner(stopwords):
+        return CleanBusinessName(None, stopwords=stopwords, countries=COUNTRIES, memo_size=0, name_cache=path,
+                                 legal_suffixes='native')
+
+    first = cleaner(['the', 'company']).clean_names(names)
+    assert first.tolist()[:2] == ['Acme Group', 'Blue River']
+
+    # Same rules: every name comes from the cache, nothing is cleaned again
+    same = cleaner(['the', 'company'])
+    monkeypatch.setattr(same, '_clean_many', lambda values, n_jobs: values and pytest.fail(f'cleaned {values}'))
+    assert same.clean_names(names).tolist()[:2] == ['Acme Group', 'Blue River']
+
+    changed = cleaner(['the', 'company', 'group'])
+    assert changed.rules_version != same.rules_version
+    assert changed.clean_names(names).tolist()[:2] == ['Acme', 'Blue River']
@@ -0,0 +1,65 @@
+import re
+
+import pandas as pd
+import pytest
+
+from src import data_tables
+
+SQL_WORDS = {'CAST', 'AS', 'DATETIME', 'DATE_SUB', 'INTERVAL', 'MONTH'}
+
+
+def _raw_opportunities(rows):
+    """Return an Opportunity table with every raw column sf_opps reads, plus SystemModstamp."""
+    table = {}
+    for expr in data_tables.SF_OPPS_COLUMNS.values():
+        raw = next(word for word in re.findall(r'[A-Za-z_]\w*', expr) if word not in SQL_WORDS)
+        if 'Date' in raw:
+            table[raw] = pd.Timestamp('2024-01-01')
+        elif raw == 'SF_ACV_New_Expand_Converted':
+            table[raw] = 100
+        else:
+            table[raw] = 'x'
+    df = pd.DataFrame([table] * len(rows))
+    for column in ('OpportunityId', 'StageName', 'SystemModstamp'):
+        df[column] = [row[column] for row in rows]
+    df['SystemModstamp'] = pd.to_datetime(df['SystemModstamp'])
+    return df
+
+
+@pytest.fixture
+def client():
+    from src.local_client import LocalClient
+
+    return LocalClient()
+
+
+def test_refresh_incremental_picks_up_edits_and_rows_at_the_watermark(client, tmp_path):
+    path = str(tmp_path / 'sf_opps.feather')
+    rows = [{'OpportunityId': 'O1', 'StageName': 'Stage 1', 'SystemModstamp': '2024-01-01 10:00'},
+            {'OpportunityId': 'O2', 'StageName': 'Stage 1', 'SystemModstamp': '2024-01-02 10:00'}]
+    client.register('AoA_MarketingOps.Opportunity', _raw_opportunities(rows))
+
+    df = data_tables.refresh_incremental(client, 'sf_opps', path, watermark='SystemModstamp')
+    assert df['OPP_StageName'].to_dict() == {'O1': 'Stage 1', 'O2': 'Stage 1'}
+
+    # An edit of an existing opportunity, and a new one written at the same instant as the
+    # stored watermark after the last refresh
+    rows[0].update(StageName='Stage 3', SystemModstamp='2024-01-03 10:00')
+    rows.append({'OpportunityId': 'O3', 'StageName': 'Stage 2', 'SystemModstamp': '2024-01-02 10:00'})
+    client.register('AoA_MarketingOps.Opportunity', _raw_opportunities(rows))
+
+    df = data_tables.refresh_incremental(client, 'sf_opps', path, watermark='SystemModstamp')
+    assert df['OPP_StageName'].to_dict() == {'O1': 'Stage 3', 'O2': 'Stage 1', 'O3': 'Stage 2'}
+
+    rows.append({'OpportunityId': 'O4', 'StageName': 'Stage 1', 'SystemModstamp': '2024-01-03 10:00'})
+    client.register('AoA_MarketingOps.Opportunity', _raw_opportunities(rows))
+
+    df = data_tables.refresh_incremental(client, 'sf_opps', path, watermark='SystemModstamp')
+    assert list(df.index) == ['O1', 'O2', 'O3', 'O4'] and df.index.is_unique
+    assert df['OPP_StageName'].to_dict() == {'O1': 'Stage 3', 'O2': 'Stage 1', 'O3': 'Stage 2', 'O4': 'Stage 1'}
+
+
+@pytest.mark.parametrize('table', ['sf_accts', 'sf_opps', 'sf_campaign_members'])
+def test_refresh_incremental_requires_a_watermark(client, tmp_path, table):
+    with pytest.raises(ValueError, match='SystemModstamp'):
+        data_tables.refresh_incremental(client, table, str(tmp_path / f'{table}.feather'))
@@ -0,0 +1,28 @@
+import pytest
+
+from src.legal_suffixes import LegalSuffixNormalizer
+
+
+@pytest.fixture(scope='module')
+def normalizer():
+    return LegalSuffixNormalizer()
+
+
+@pytest.mark.parametrize('name', [
+    'Known As', 'Known as', 'Gas As', 'Plan Ab', 'Big Bag', 'Silver Ag', 'Casa Sa', 'Acme Ev', 'Acme Kg', 'Acme Lp',
+    'Acme s/a', 'Pay As You Go', 'Open Lab',
+])
+def test_keeps_words_that_look_like_short_designators(normalizer, name):
+    assert normalizer.normalize(name) == name
+
+
+@pytest.mark.parametrize('name, expected', [
+    ('Acme AS', 'Acme'), ('Acme A/S', 'Acme'), ('Acme a.s.', 'Acme'), ('Acme A.S.', 'Acme'), ('Acme a.s', 'Acme'),
+    ('Acme AB', 'Acme'), ('Acme AB publ', 'Acme'), ('Siemens AG', 'Siemens'), ('Acme hf', 'Acme'), ('Acme HF', 'Acme'),
+    ('Ahoy Oy', 'Ahoy'), ('Nokia Oyj', 'Nokia'), ('Acme e.V.', 'Acme'), ('Acme S.A.', 'Acme'), ('Acme SA', 'Acme'),
+    ('Acme S/A', 'Acme'), ('Acme, Inc.', 'Acme'), ('Acme inc', 'Acme'), ('Acme GmbH & Co. KG', 'Acme'),
+    ('Acme Holdings Pty. Ltd.', 'Acme Holdings'), ('Acme S.A. de C.V.', 'Acme'), ('Acme d.o.o.', 'Acme'),
+    ('PT Bank Central Asia', 'Bank Central Asia'),
+])
+def test_strips_designators(normalizer, name, expected):
+    assert normalizer.normalize(name) == expected
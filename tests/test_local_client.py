@@ -0,0 +1,21 @@
+import pandas as pd
+
+from src.local_client import LocalClient
+
+QUERY = 'SELECT Id FROM `ap-marketing-data-ops-prod.AoA_MarketingOps.Account` ORDER BY Id'
+
+
+def test_register_replaces_a_fixture_view_and_fixtures_replace_it_back(tmp_path):
+    (tmp_path / 'AoA_MarketingOps').mkdir()
+    pd.DataFrame({'Id': ['A1', 'A2']}).to_parquet(tmp_path / 'AoA_MarketingOps' / 'Account.parquet')
+    client = LocalClient(str(tmp_path))
+    assert client.query(QUERY).to_dataframe()['Id'].tolist() == ['A1', 'A2']
+
+    client.register('AoA_MarketingOps.account', pd.DataFrame({'Id': ['B1']}))
+    assert client.query(QUERY).to_dataframe()['Id'].tolist() == ['B1']
+
+    client.register('AoA_MarketingOps.Account', pd.DataFrame({'Id': ['C1']}))
+    assert client.query(QUERY).to_dataframe()['Id'].tolist() == ['C1']
+
+    client.load_fixtures(str(tmp_path))
+    assert client.query(QUERY).to_dataframe()['Id'].tolist() == ['A1', 'A2']
@@ -0,0 +1,66 @@
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.minhash_lsh import MinHashLSH
+
+WORDS = ['Acme', 'Blue', 'River', 'North', 'Data', 'Labs', 'Systems', 'Solutions', 'Global', 'Harbor', 'Pixel',
+         'Summit', 'Vertex', 'Cedar', 'Orbit', 'Granite', 'Falcon', 'Quantum', 'Maple', 'Beacon']
+
+
+def _shingles(value, size=3):
+    value = value.lower().strip()
+    return {value[i:i + size] for i in range(max(len(value) - size + 1, 1))}
+
+
+def _jaccard(a, b):
+    a, b = _shingles(a), _shingles(b)
+    return len(a & b) / len(a | b)
+
+
+def _names(count, seed=0):
+    """Return distinct names and a near-duplicate of each: a typo or an appended designator."""
+    rng = random.Random(seed)
+    names = list(dict.fromkeys(' '.join(rng.sample(WORDS, 3)) for _ in range(count * 2)))[:count]
+    duplicates = []
+    for name in names:
+        if rng.random() < 0.5:
+            i = rng.randrange(len(name))
+            duplicates.append(name[:i] + rng.choice('abcdefghijklmnopqrstuvwxyz') + name[i + 1:])
+        else:
+            duplicates.append(name + rng.choice([' Inc', ' Ltd', ' LLC']))
+    return names, duplicates
+
+
+def test_pairs_finds_known_duplicates_between_two_columns():
+    names, duplicates = _names(300)
+    assert min(_jaccard(a, b) for a, b in zip(names, duplicates)) >= 0.6
+
+    left, right = MinHashLSH(threshold=0.5).pairs(pd.Series(names), pd.Series(duplicates[::-1]))
+
+    found = set(zip(left.tolist(), right.tolist()))
+    recall = np.mean([(i, len(names) - 1 - i) in found for i in range(len(names))])
+    assert recall >= 0.98
+    # Candidates are mostly pairs of names sharing their words, not the cross product
+    assert len(found) < 0.05 * len(names) ** 2
+    similar = [_jaccard(names[i], duplicates[::-1][j]) for i, j in found]
+    assert np.mean(np.array(similar) >= 0.3) > 0.5
+
+
+@pytest.mark.parametrize('repeat', [1, 3])
+def test_pairs_within_one_column_are_returned_once(repeat):
+    names, duplicates = _names(200, seed=1)
+    values = pd.Series((names + duplicates) * repeat)
+
+    left, right = MinHashLSH(threshold=0.5).pairs(values)
+
+    assert (left > right).all()
+    assert len(set(zip(left.tolist(), right.tolist()))) == len(left)
+    found = set(zip(left.tolist(), right.tolist()))
+    recall = np.mean([(len(names) + i, i) in found for i in range(len(names))])
+    assert recall >= 0.98
+    if repeat > 1:
+        # Every copy of a value is paired with every other copy of it
+        assert all((2 * len(values) // repeat + i, i) in found for i in range(len(names)))
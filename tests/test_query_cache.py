@@ -0,0 +1,49 @@
+import os
+import time
+
+import pandas as pd
+import pytest
+
+from src.query_cache import QueryCache, query_fingerprint
+
+
+def _result(query):
+    return pd.DataFrame({'query': [query] * 100, 'value': range(100)})
+
+
+@pytest.mark.parametrize('file_format', ['feather', 'parquet'])
+def test_get_returns_what_put_stored_under_the_normalized_query(tmp_path, file_format):
+    cache = QueryCache(str(tmp_path), file_format=file_format)
+    cache.put('SELECT a\nFROM t', _result('a'))
+
+    pd.testing.assert_frame_equal(cache.get('SELECT a   FROM t;'), _result('a'))
+    assert cache.get('SELECT a FROM t', 'other shape') is None
+    assert cache.get('SELECT b FROM t') is None
+
+
+def test_expired_entries_are_misses_and_removed(tmp_path):
+    cache = QueryCache(str(tmp_path), ttl=60)
+    cache.put('SELECT a FROM t', _result('a'))
+    path = os.path.join(str(tmp_path), f"{query_fingerprint('SELECT a FROM t')}.feather")
+    stale = time.time() - 61
+    os.utime(path, (stale, stale))
+
+    assert cache.get('SELECT a FROM t') is None
+    assert not os.path.exists(path)
+
+
+def test_least_recently_used_entries_are_evicted_first(tmp_path):
+    cache = QueryCache(str(tmp_path), ttl=None)
+    cache.put('SELECT a FROM t', _result('a'))
+    cache.max_bytes = 2 * cache.size()
+    cache.put('SELECT b FROM t', _result('b'))
+    past = time.time() - 10
+    for name in os.listdir(str(tmp_path)):
+        os.utime(os.path.join(str(tmp_path), name), (past, past))
+
+    assert cache.get('SELECT a FROM t') is not None
+    cache.put('SELECT c FROM t', _result('c'))
+
+    assert cache.get('SELECT b FROM t') is None
+    assert cache.get('SELECT a FROM t') is not None and cache.get('SELECT c FROM t') is not None
+    assert cache.size() <= cache.max_bytes
@@ -0,0 +1,119 @@
+import asyncio
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from src import query_scheduler, query_stats
+
+
+class FakeJob:
+    """Stand-in for a QueryJob whose result takes `seconds` to download."""
+
+    def __init__(self, query, seconds=0.0, error=None):
+        self.query = query
+        self.seconds = seconds
+        self.error = error
+        self.cancelled = False
+        self._done = threading.Event()
+
+    def result(self, **kwargs):
+        if self.error is not None:
+            raise self.error
+        self._done.wait(self.seconds)
+        self._done.set()
+
+    def to_dataframe(self):
+        return pd.DataFrame({'query': [self.query]})
+
+    def done(self):
+        return self._done.is_set()
+
+    def cancel(self):
+        self.cancelled = True
+        return True
+
+
+class FakeClient:
+    """Stand-in for bigquery.Client; errors are raised by the first jobs, one each."""
+
+    project = 'local'
+
+    def __init__(self, seconds=0.0, errors=()):
+        self.seconds = seconds
+        self.errors = list(errors)
+        self.jobs = []
+
+    def query(self, query, **kwargs):
+        job = FakeJob(query, self.seconds, self.errors.pop(0) if self.errors else None)
+        self.jobs.append(job)
+        return job
+
+
+def test_execute_queries_returns_within_the_timeout():
+    client = FakeClient(seconds=2.0)
+
+    start = time.perf_counter()
+    with pytest.raises(asyncio.TimeoutError):
+        query_scheduler.execute_queries(client, {'slow': 'SELECT 1'}, timeout=0.3, retries=0,
+                                        stats=query_stats.QueryStats())
+
+    assert time.perf_counter() - start < 1.0
+    assert client.jobs[0].cancelled
+
+
+class TransientError(Exception):
+    code = 503
+
+
+class BadRequest(Exception):
+    code = 400
+
+
+def test_run_retries_transient_errors_only():
+    client = FakeClient(errors=[TransientError('busy'), TransientError('busy')])
+    scheduler = query_scheduler.QueryScheduler(client, retries=2, backoff=0.01)
+
+    df = query_scheduler.run_coroutine(scheduler.run('SELECT 1', stats=query_stats.QueryStats()))
+
+    assert df['query'].tolist() == ['SELECT 1']
+    assert len(client.jobs) == 3
+
+    client = FakeClient(errors=[BadRequest('syntax error')])
+    scheduler = query_scheduler.QueryScheduler(client, retries=2, backoff=0.01)
+    with pytest.raises(BadRequest):
+        query_scheduler.run_coroutine(scheduler.run('SELEC 1', stats=query_stats.QueryStats()))
+    assert len(client.jobs) == 1
+
+
+def test_run_gives_up_after_the_retries():
+    client = FakeClient(errors=[TransientError('busy')] * 3)
+    scheduler = query_scheduler.QueryScheduler(client, retries=1, backoff=0.01)
+
+    with pytest.raises(TransientError):
+        query_scheduler.run_coroutine(scheduler.run('SELECT 1', stats=query_stats.QueryStats()))
+    assert len(client.jobs) == 2
+
+
+def test_cancel_stops_outstanding_queries_and_their_jobs():
+    client = FakeClient(seconds=2.0)
+    scheduler = query_scheduler.QueryScheduler(client, max_in_flight=2)
+
+    async def main():
+        tasks = [scheduler.submit(f'SELECT {i}', stats=query_stats.QueryStats()) for i in range(3)]
+        while len(client.jobs) < 2:
+            await asyncio.sleep(0.01)
+        scheduler.cancel()
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+    start = time.perf_counter()
+    try:
+        results = asyncio.run(main())
+    finally:
+        scheduler.close()
+
+    assert time.perf_counter() - start < 1.0
+    assert all(isinstance(result, asyncio.CancelledError) for result in results)
+    # The third query never got a slot, the two running ones had their jobs cancelled
+    assert len(client.jobs) == 2 and all(job.cancelled for job in client.jobs)
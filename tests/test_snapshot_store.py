@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from src import frame_store
+from src.snapshot_store import SnapshotStore
+
+
+def _accounts(count):
+    return pd.DataFrame({
+        'AccountName': np.array([f'Acme {i}' for i in range(count)], dtype=object),
+        'Employees': np.arange(count, dtype='int64'),
+        'ACV': np.arange(count) / 2,
+        'CreatedDate': pd.date_range('2024-01-01', periods=count, freq='h', unit='ns'),
+    }, index=pd.Index(np.array([f'001{i}' for i in range(count)], dtype=object), name='AccountId'))
+
+
+def test_load_maps_strings_without_converting_them(tmp_path):
+    store = SnapshotStore(str(tmp_path), version='test')
+    df = _accounts(200_000)
+    store.save('sf_accts', df)
+
+    before = pa.total_allocated_bytes()
+    loaded = store.load('sf_accts')
+
+    # Nothing is copied out of the mapped file, not even a byte per row
+    assert pa.total_allocated_bytes() - before < len(df)
+    for dtype in (loaded['AccountName'].dtype, loaded.index.dtype):
+        assert isinstance(dtype, pd.ArrowDtype)
+        assert pa.types.is_string(dtype.pyarrow_dtype) or pa.types.is_large_string(dtype.pyarrow_dtype)
+    assert loaded['AccountName'].tolist() == df['AccountName'].tolist()
+    assert loaded.index.tolist() == df.index.tolist()
+    numbers = ['Employees', 'ACV', 'CreatedDate']
+    pd.testing.assert_frame_equal(loaded[numbers].reset_index(drop=True), df[numbers].reset_index(drop=True))
+
+
+def test_read_frame_round_trips_dtypes_by_default(tmp_path):
+    path = str(tmp_path / 'accts.feather')
+    df = _accounts(10)
+    frame_store.write_frame(df, path)
+
+    pd.testing.assert_frame_equal(frame_store.read_frame(path), df)
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+
+from src import utilities as utils
+
+
+def test_clean_website_domain_series_returns_object_columns():
+    urls = pd.Series(['https://shop.Acme.co.uk:8080/x', 'HTTP://Müller.de/?q=1', 'user@192.168.0.1/x',
+                      'www.www.acme.com.', 'co.uk', '.', '', None], index=list('abcdefgh'), dtype=object)
+
+    websites, domains = utils.clean_website_domain_series(urls)
+
+    assert websites.dtype == object and domains.dtype == object
+    assert websites.index.equals(urls.index)
+    assert websites.tolist() == ['www.shop.acme.co.uk', 'www.xn--mller-kva.de', '192.168.0.1', 'www.acme.com',
+                                 'www.co.uk', None, None, None]
+    assert domains.tolist() == ['acme.co.uk', 'xn--mller-kva.de', '192.168.0.1', 'acme.com', None, None, None, None]
+
+
+def test_clean_website_domain_series_accepts_arrow_strings():
+    urls = pd.Series(['https://www.acme.com.au/about', None], dtype='string[pyarrow]')
+
+    websites, domains = utils.clean_website_domain_series(urls)
+
+    assert websites.dtype == object
+    assert websites.tolist() == ['www.acme.com.au', None]
+    assert domains.tolist() == ['acme.com.au', None]
+
+
+def test_clean_website_domain_series_maps_repeated_urls():
+    urls = pd.Series(['acme.com/a', None, 'http://github.io', 'acme.com/a', 'host.s3.amazonaws.com', None] * 2)
+
+    websites, domains = utils.clean_website_domain_series(urls, include_private=True)
+
+    assert domains.tolist() == ['acme.com', None, None, 'acme.com', 'host.s3.amazonaws.com', None] * 2
+    assert [utils.clean_website_domain(url)[0] for url in urls] == websites.tolist()
+
+
+def test_optimize_memory_makes_two_valued_integer_flags_sparse():
+    rows = 1_000
+    responded = np.zeros(rows, dtype=int)
+    responded[::50] = 1
+    df = pd.DataFrame({
+        'CampaignMemberStatus': np.arange(rows) % 7,
+        'HasResponded': responded,
+        'IsPrimary': responded == 0,
+        'Region': np.arange(rows) % 2,
+        'Employees': np.arange(rows) * 1_000,
+    })
+
+    optimized, report = utils.optimize_memory(df, report=True)
+
+    assert optimized['HasResponded'].dtype == pd.SparseDtype(np.int8, 0)
+    assert optimized['IsPrimary'].dtype == pd.SparseDtype(bool, True)
+    assert optimized['CampaignMemberStatus'].dtype == np.int8
+    assert optimized['Region'].dtype == np.int8
+    assert optimized['Employees'].dtype == np.int32
+    # Smaller than the column would be as dense int8
+    assert report.loc['HasResponded', 'bytes_after'] < rows
+    pd.testing.assert_frame_equal(optimized.astype(df.dtypes.to_dict()), df)